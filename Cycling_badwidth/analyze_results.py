@@ -4,12 +4,19 @@ CSV Result Analyzer for CBP Test Results
 Analyze and generate reports from CSV test result files
 """
 
-import pandas as pd
 import sys
 import os
 import glob
 from datetime import datetime
 
+import numpy as np
+
+# pandas is only needed for the one-run report; --compare works without it
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
 # Optional imports for plotting
 try:
     import matplotlib.pyplot as plt
@@ -29,14 +36,52 @@ def find_latest_csv():
     
     return max(csv_files, key=os.path.getctime)
 
+def load_results_db(db_file, run_id=None, campaign=None, solver=None, all_runs=False):
+    """
+    Query the results database (results_db.py) instead of reading CSV files.
+    Without filters only the latest run is loaded, like find_latest_csv.
+    
+    Returns:
+        tuple: (DataFrame, description of the selection)
+    """
+    from results_db import ResultsDB
+    
+    conditions, params = [], []
+    if run_id is not None:
+        conditions.append("results.run_id = ?")
+        params.append(run_id)
+    if campaign:
+        conditions.append("runs.campaign = ?")
+        params.append(campaign)
+    if solver:
+        conditions.append("results.solver = ?")
+        params.append(solver)
+    
+    with ResultsDB(db_file) as db:
+        if not conditions and not all_runs:
+            run_id = db.latest_run_id()
+            conditions.append("results.run_id = ?")
+            params.append(run_id)
+        df = db.to_dataframe(" AND ".join(conditions) or None, params)
+    
+    selection = ", ".join(f"{name}={value}" for name, value in
+                          (('run', run_id), ('campaign', campaign), ('solver', solver)) if value is not None)
+    return df, f"{db_file} ({selection or 'all runs'})"
+
 def analyze_results(csv_file):
     """Analyze results from CSV file"""
+    if pd is None:
+        print("❌ pandas is required for this report: pip install pandas")
+        return
     try:
         df = pd.read_csv(csv_file)
     except Exception as e:
         print(f"❌ Error reading CSV file: {e}")
         return
-    
+    analyze_dataframe(df, csv_file)
+
+def analyze_dataframe(df, csv_file):
+    """Analyze results of a DataFrame (CSV file or results database query)"""
     # Check empty DataFrame
     if df.empty:
         print("❌ CSV file is empty!")
@@ -295,11 +340,363 @@ def create_plots(df, timestamp):
         if 'fig' in locals():
             plt.close(fig)
 
+# Metrics compared between two runs; counts are deterministic, times are noisy
+COUNT_METRICS = ('clauses', 'variables')
+TIME_METRICS = ('encode_sec', 'build_sec', 'solve_sec', 'runtime_sec')
+
+def load_result_rows(spec, db_file):
+    """
+    Result rows (list of dicts) of a CSV file, a run id or a git commit
+    (prefix, every run of that commit) in the results database.
+    """
+    from results_db import ResultsDB, RESULT_COLUMNS, to_db_value
+    
+    if os.path.exists(spec) and spec.endswith('.csv'):
+        import csv
+        with open(spec, 'r', newline='', encoding='utf-8') as f:
+            return [{name: to_db_value(name, value) for name, value in row.items() if name in RESULT_COLUMNS}
+                    for row in csv.DictReader(f)]
+    if not os.path.exists(db_file):
+        raise ValueError(f"{spec} is not a CSV file and database {db_file} does not exist")
+    with ResultsDB(db_file) as db:
+        if spec.isdigit():
+            rows = db.query("results.run_id = ?", (int(spec),))
+        else:
+            rows = db.query("runs.git_commit LIKE ?", (spec + '%',))
+    if not rows:
+        raise ValueError(f"No results for {spec} in {db_file}")
+    return rows
+
+def group_samples(rows, metric):
+    """(file_name, solver) -> list of metric values of the successful rows"""
+    samples = {}
+    for row in rows:
+        value = row.get(metric)
+        if row.get('success') and value is not None:
+            samples.setdefault((row['file_name'], row['solver']), []).append(float(value))
+    return samples
+
+def bootstrap_ci(statistic, samples, rng, n_boot=2000, level=0.95):
+    """Percentile bootstrap interval of statistic over resamples of every array in samples"""
+    estimates = np.empty(n_boot)
+    for b in range(n_boot):
+        estimates[b] = statistic(*[sample[rng.integers(0, len(sample), len(sample))] for sample in samples])
+    alpha = (1 - level) / 2
+    return float(np.quantile(estimates, alpha)), float(np.quantile(estimates, 1 - alpha))
+
+def compare_runs(base_rows, new_rows, threshold=1.1, min_time=0.05, count_threshold=1.0, n_boot=2000, seed=0):
+    """
+    Match rows by (instance, solver) and compare every metric new / base.
+    
+    Per instance the ratio is median(new) / median(base), with a bootstrap
+    interval when both sides have repeated samples. Over all instances the
+    geometric mean ratio gets a bootstrap interval by resampling instances.
+    A metric regresses when its geometric mean exceeds threshold and the
+    interval lies above 1; an instance is flagged when its ratio exceeds
+    threshold (and its interval lies above 1, if it has one). Count metrics
+    are deterministic: they use count_threshold (default: any increase) and
+    a flagged instance is a regression by itself.
+    Times where both medians are below min_time seconds are skipped as noise;
+    otherwise both medians are raised to at least min_time (counts: 1), so a
+    time rounded to 0.00 neither vanishes nor drags the geometric mean to 0.
+    Instances the base run solved and the new run ran without solving
+    (timeout, crash, no answer) are regressions by themselves.
+    
+    Returns:
+        dict: metric -> {'instances', 'geomean', 'ci', 'regression', 'flagged'}
+        plus 'unmatched': keys present on one side only, and 'lost': keys
+        solved in the base run only
+    """
+    rng = np.random.default_rng(seed)
+    report = {}
+    base_keys = set((row['file_name'], row['solver']) for row in base_rows)
+    new_keys = set((row['file_name'], row['solver']) for row in new_rows)
+    report['unmatched'] = sorted(base_keys ^ new_keys)
+    base_solved = set((row['file_name'], row['solver']) for row in base_rows if row.get('success'))
+    new_solved = set((row['file_name'], row['solver']) for row in new_rows if row.get('success'))
+    report['lost'] = sorted((base_solved & new_keys) - new_solved)
+    
+    for metric in COUNT_METRICS + TIME_METRICS:
+        limit = count_threshold if metric in COUNT_METRICS else threshold
+        floor = 1.0 if metric in COUNT_METRICS else min_time
+        base = group_samples(base_rows, metric)
+        new = group_samples(new_rows, metric)
+        ratios, flagged = {}, []
+        for key in sorted(set(base) & set(new)):
+            a, b = np.array(base[key]), np.array(new[key])
+            base_median, new_median = float(np.median(a)), float(np.median(b))
+            if metric in TIME_METRICS and max(base_median, new_median) < min_time:
+                continue
+            ratio = max(new_median, floor) / max(base_median, floor)
+            ratios[key] = ratio
+            ci = None
+            if len(a) > 1 and len(b) > 1:
+                ci = bootstrap_ci(lambda x, y: max(np.median(y), floor) / max(np.median(x), floor),
+                                  [a, b], rng, n_boot)
+            if ratio > limit and (ci is None or ci[0] > 1):
+                flagged.append({'instance': key[0], 'solver': key[1], 'base': base_median,
+                                'new': new_median, 'ratio': ratio, 'ci': ci})
+        
+        entry = {'instances': len(ratios), 'geomean': None, 'ci': None, 'regression': False,
+                 'flagged': flagged}
+        if ratios:
+            logs = np.log(np.array(list(ratios.values())))
+            entry['geomean'] = float(np.exp(logs.mean()))
+            if len(logs) > 1:
+                low, high = bootstrap_ci(lambda x: np.mean(x), [logs], rng, n_boot)
+                entry['ci'] = (float(np.exp(low)), float(np.exp(high)))
+            else:
+                entry['ci'] = (entry['geomean'], entry['geomean'])
+            entry['regression'] = entry['geomean'] > limit and entry['ci'][0] > 1
+        if metric in COUNT_METRICS and flagged:
+            entry['regression'] = True
+        report[metric] = entry
+    return report
+
+def print_comparison(report, base_label, new_label, threshold):
+    """Print the compare_runs report; returns True if any metric regressed"""
+    print(f"📊 Comparing {new_label} against {base_label} (threshold {threshold:.2f}x)")
+    print("=" * 60)
+    regressed = False
+    for metric in COUNT_METRICS + TIME_METRICS:
+        entry = report[metric]
+        if not entry['instances']:
+            print(f"   {metric:12s}: no matched data")
+            continue
+        low, high = entry['ci']
+        status = "❌ REGRESSION" if entry['regression'] else "✅"
+        print(f"   {metric:12s}: geomean ratio {entry['geomean']:.3f} "
+              f"[{low:.3f}, {high:.3f}] over {entry['instances']} instances {status}")
+        for item in entry['flagged']:
+            ci = f" [{item['ci'][0]:.2f}, {item['ci'][1]:.2f}]" if item['ci'] else ""
+            print(f"      - {item['instance']} ({item['solver']}): {item['base']:.4g} -> {item['new']:.4g} "
+                  f"({item['ratio']:.2f}x{ci})")
+        regressed |= entry['regression']
+    if report['lost']:
+        print(f"   ❌ {len(report['lost'])} instance(s) solved in {base_label} but not in {new_label}")
+        for instance, solver in report['lost']:
+            print(f"      - {instance} ({solver})")
+        regressed = True
+    if report['unmatched']:
+        print(f"   {len(report['unmatched'])} (instance, solver) pairs present in one run only")
+    print("=" * 60)
+    print("❌ Performance regression detected" if regressed else "✅ No significant regression")
+    return regressed
+
+def run_timeout(row, default_timeout=None):
+    """Timeout of a result row, from its config ('timeout=600;...') or the default"""
+    for part in str(row.get('config') or '').split(';'):
+        if part.startswith('timeout='):
+            try:
+                return float(part.split('=', 1)[1])
+            except ValueError:
+                break
+    return default_timeout
+
+def build_configurations(result_sets, default_timeout=600):
+    """
+    Per-configuration outcomes: a configuration is one solver of one result
+    set (label 'solver' or 'set:solver' with several sets). Repeated rows of
+    an instance keep the median runtime of the solved ones.
+    
+    Every configuration is scored against one common cutoff, the smallest
+    timeout of any row (from its config, default_timeout when it has none):
+    a run solved after the cutoff counts as unsolved, so a set run with a
+    longer timeout neither pays a larger penalty nor gains from the extra time.
+    
+    Returns:
+        tuple: (configurations {label: {instance: (time, solved)}}, cutoff)
+    """
+    configurations = {}
+    recorded = set()
+    for spec, rows in result_sets:
+        for row in rows:
+            label = row['solver'] if len(result_sets) == 1 else f"{spec}:{row['solver']}"
+            recorded.add(run_timeout(row, default_timeout))
+            runs = configurations.setdefault(label, {}).setdefault(row['file_name'], [])
+            if row.get('success') and row.get('runtime_sec') is not None:
+                runs.append(float(row['runtime_sec']))
+            else:
+                runs.append(None)
+    cutoff = min(recorded) if recorded else default_timeout
+    if len(recorded) > 1:
+        print(f"⚠️  Mixed timeouts {sorted(recorded)}: every configuration is cut off at {cutoff:g}s")
+    outcomes = {}
+    for label, instances in configurations.items():
+        outcomes[label] = {}
+        for instance, runs in instances.items():
+            solved = [t for t in runs if t is not None and t <= cutoff]
+            outcomes[label][instance] = (float(np.median(solved)), True) if solved else (None, False)
+    return outcomes, cutoff
+
+def par2_times(outcomes, instances, timeout):
+    """Instance -> PAR-2 time (runtime if solved, else 2 x timeout; missing counts as unsolved)"""
+    return {instance: outcomes[instance][0] if outcomes.get(instance, (None, False))[1] else 2 * timeout
+            for instance in instances}
+
+def virtual_best(configurations, instances, timeout):
+    """
+    Virtual best solver: for every instance the fastest configuration.
+    
+    Returns:
+        dict: {'par2', 'solved', 'times', 'best_count' (label -> instances
+        where it is fastest), 'unique' (label -> instances only it solves)}
+    """
+    times = {label: par2_times(outcomes, instances, timeout) for label, outcomes in configurations.items()}
+    vbs_times, best_count, unique = {}, dict.fromkeys(configurations, 0), dict.fromkeys(configurations, 0)
+    for instance in instances:
+        label = min(times, key=lambda name: times[name][instance])
+        vbs_times[instance] = times[label][instance]
+        solvers = [name for name in configurations if configurations[name].get(instance, (None, False))[1]]
+        if solvers:
+            best_count[label] += 1
+        if len(solvers) == 1:
+            unique[solvers[0]] += 1
+    solved = sum(1 for t in vbs_times.values() if t < 2 * timeout)
+    par2 = float(np.mean(list(vbs_times.values()))) if vbs_times else 0.0
+    return {'par2': par2, 'solved': solved, 'times': vbs_times, 'best_count': best_count, 'unique': unique}
+
+def portfolio_report(configurations, timeout):
+    """Print PAR-2 per configuration and the virtual best solver gain"""
+    instances = sorted(set(instance for outcomes in configurations.values() for instance in outcomes))
+    print(f"📊 PAR-2 over {len(instances)} instances, {len(configurations)} configurations (timeout {timeout:g}s)")
+    print("=" * 60)
+    scores = {}
+    for label, outcomes in configurations.items():
+        times = par2_times(outcomes, instances, timeout)
+        solved = sum(1 for instance in instances if outcomes.get(instance, (None, False))[1])
+        scores[label] = (float(np.mean(list(times.values()))), solved)
+    for label, (par2, solved) in sorted(scores.items(), key=lambda item: item[1][0]):
+        print(f"   {label:30s} solved {solved:4d}/{len(instances)}  PAR-2 {par2:10.2f}")
+    
+    vbs = virtual_best(configurations, instances, timeout)
+    best_label = min(scores, key=lambda label: scores[label][0])
+    best_par2 = scores[best_label][0]
+    gain = best_par2 / vbs['par2'] if vbs['par2'] > 0 else float('inf')
+    print("-" * 60)
+    print(f"   {'virtual best solver':30s} solved {vbs['solved']:4d}/{len(instances)}  PAR-2 {vbs['par2']:10.2f}")
+    print(f"   Portfolio gain over the best single configuration ({best_label}): {gain:.2f}x")
+    for label in sorted(configurations):
+        print(f"   - {label}: fastest on {vbs['best_count'][label]}, only solver on {vbs['unique'][label]}")
+    return scores, vbs
+
+def create_portfolio_plots(configurations, timeout, scatter=None, timestamp=None):
+    """Cactus, survival and per-instance scatter plots of several configurations"""
+    if not PLOTTING_AVAILABLE:
+        print("💡 Install matplotlib to create charts: pip install matplotlib seaborn")
+        return
+    timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+    instances = sorted(set(instance for outcomes in configurations.values() for instance in outcomes))
+    labels = sorted(configurations)
+    if scatter is None and len(labels) >= 2:
+        scatter = labels[:2]
+    
+    fig, axes = plt.subplots(1, 3 if scatter else 2, figsize=(18 if scatter else 12, 5))
+    fig.suptitle('CBP Solver Configurations', fontsize=16)
+    
+    # 1. Cactus: instances solved within a time budget
+    # 2. Survival: fraction of instances still unsolved after t seconds
+    for label in labels:
+        solved_times = sorted(t for t, ok in configurations[label].values() if ok)
+        axes[0].plot(solved_times, range(1, len(solved_times) + 1), marker='.', label=label)
+        if solved_times:
+            unsolved = [1 - (i + 1) / len(instances) for i in range(len(solved_times))]
+            axes[1].step(solved_times, unsolved, where='post', label=label)
+    axes[0].set_xlabel('Runtime (seconds)')
+    axes[0].set_ylabel('Instances solved')
+    axes[0].set_title('Cactus Plot')
+    axes[0].set_xscale('log')
+    axes[0].legend(fontsize=8)
+    axes[1].set_xlabel('Runtime (seconds)')
+    axes[1].set_ylabel('Fraction unsolved')
+    axes[1].set_title('Survival')
+    axes[1].set_xscale('log')
+    axes[1].set_ylim(0, 1)
+    
+    # 3. Per-instance scatter (PAR-2 times, unsolved on the 2 x timeout line)
+    if scatter:
+        first, second = scatter
+        x = par2_times(configurations[first], instances, timeout)
+        y = par2_times(configurations[second], instances, timeout)
+        axes[2].scatter([x[i] for i in instances], [y[i] for i in instances], alpha=0.6)
+        low = max(min(min(x.values()), min(y.values())), 1e-3)
+        axes[2].plot([low, 2 * timeout], [low, 2 * timeout], color='gray', linestyle='--')
+        axes[2].set_xscale('log')
+        axes[2].set_yscale('log')
+        axes[2].set_xlabel(f'{first} (s)')
+        axes[2].set_ylabel(f'{second} (s)')
+        axes[2].set_title('Per-instance PAR-2')
+    
+    plt.tight_layout()
+    plot_file = f"cbp_portfolio_plots_{timestamp}.png"
+    plt.savefig(plot_file, dpi=300, bbox_inches='tight')
+    plt.close(fig)
+    print(f"📊 Charts saved to: {plot_file}")
+
 def main():
-    if len(sys.argv) > 1:
-        csv_file = sys.argv[1]
-    else:
-        csv_file = find_latest_csv()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Analyze CBP test results (CSV file or results database).")
+    parser.add_argument('csv_file', nargs='?', help='CSV result file (default: query the database)')
+    parser.add_argument('--db', default='cbp_benchmarks.sqlite', help='results database (results_db.py)')
+    parser.add_argument('--run', type=int, help='only this run id')
+    parser.add_argument('--campaign', help='only runs of this campaign')
+    parser.add_argument('--solver', help='only this solver')
+    parser.add_argument('--all', action='store_true', help='every run in the database')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'),
+                        help='compare two runs (run id, git commit or CSV file), exit 1 on a regression')
+    parser.add_argument('--threshold', type=float, default=1.1, help='slowdown ratio counted as a regression')
+    parser.add_argument('--count-threshold', type=float, default=1.0,
+                        help='clause/variable count ratio counted as a regression (default: any increase)')
+    parser.add_argument('--min-time', type=float, default=0.05,
+                        help='ignore times where both runs are below this many seconds')
+    parser.add_argument('--portfolio', nargs='+', metavar='SET',
+                        help='PAR-2, virtual best solver and cactus plots over result sets '
+                             '(run ids, git commits or CSV files)')
+    parser.add_argument('--timeout', type=float, default=600,
+                        help='timeout for PAR-2 when the rows do not record one')
+    parser.add_argument('--scatter', nargs=2, metavar=('CONFIG_A', 'CONFIG_B'),
+                        help='configurations of the per-instance scatter plot')
+    args = parser.parse_args()
+    
+    if args.portfolio:
+        try:
+            result_sets = [(spec, load_result_rows(spec, args.db)) for spec in args.portfolio]
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(2)
+        configurations, timeout = build_configurations(result_sets, args.timeout)
+        if args.scatter and not all(label in configurations for label in args.scatter):
+            print(f"❌ Unknown configuration in --scatter, choose from: {', '.join(sorted(configurations))}")
+            sys.exit(2)
+        portfolio_report(configurations, timeout)
+        create_portfolio_plots(configurations, timeout, args.scatter)
+        return
+    
+    if args.compare:
+        base_spec, new_spec = args.compare
+        try:
+            base_rows = load_result_rows(base_spec, args.db)
+            new_rows = load_result_rows(new_spec, args.db)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(2)
+        report = compare_runs(base_rows, new_rows, args.threshold, args.min_time, args.count_threshold)
+        sys.exit(1 if print_comparison(report, base_spec, new_spec, args.threshold) else 0)
+    
+    # The database holds every run; CSV files are still accepted. Without
+    # filters the newer of the database and the latest CSV (e.g. from a
+    # --no-db run) is analyzed, and the choice is printed
+    csv_file = args.csv_file or find_latest_csv()
+    db_filters = args.run is not None or args.campaign or args.solver or args.all
+    if not args.csv_file and os.path.exists(args.db) and (
+            db_filters or csv_file is None or os.path.getmtime(args.db) >= os.path.getmtime(csv_file)):
+        df, source = load_results_db(args.db, args.run, args.campaign, args.solver, args.all)
+        print(f"📂 Source: database {source}" + (f" (newer than {csv_file})" if csv_file and not db_filters else ""))
+        analyze_dataframe(df, source)
+        return
+    if not args.csv_file and csv_file and os.path.exists(args.db):
+        print(f"📂 Source: {csv_file} (newer than database {args.db})")
     
     if not csv_file or not os.path.exists(csv_file):
         print("❌ CSV result file not found!")
@@ -5,13 +5,40 @@ Run tests on multiple .mtx files and output results to CSV
 """
 
 import os
+import io
 import sys
+import json
+import contextlib
 import subprocess
+import tempfile
+import threading
 import time
 import csv
 import glob
+import argparse
 from datetime import datetime
 
+try:
+    import resource  # POSIX only: per-job memory limit
+except ImportError:
+    resource = None
+
+# ru_maxrss is in kilobytes on Linux, in bytes on macOS
+MAXRSS_PER_MB = 2**20 if sys.platform == 'darwin' else 1024
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from cbp_events import EVENTS_ENV, parse_events, read_events, set_event_sink, summarize_events
+from graph_generators import known_optimum
+from solve_profile import rounded
+
+# auto_test solver name -> python -m cbp solver name, for --in-process runs
+IN_PROCESS_SOLVERS = {
+    'ver_2': 'ver_2',
+    'ver_2_5': 'ver_2_5',
+    'core_cbp': 'core',
+    'maxsat_cbp': 'maxsat',
+}
+
 def find_mtx_files(directory):
     """Find all .mtx and .mtx.gz files in directory and subdirectories"""
     patterns = ['*.mtx', '*.mtx.gz']
@@ -20,16 +47,76 @@ def find_mtx_files(directory):
         files.extend(glob.glob(os.path.join(directory, '**', pattern), recursive=True))
     return sorted(list(set(files)))
 
-def run_cbp_solver(script_path, mtx_file, timeout=600):
+def wait_child(process, timeout):
+    """
+    Wait for a child with os.wait4 so its own CPU time and peak memory are
+    known (not those of every child, as RUSAGE_CHILDREN would report when
+    several jobs run at once). Kills the child at the timeout.
+
+    Returns:
+        tuple: (return_code, cpu_seconds, max_rss_mb, timed_out)
+    """
+    if not hasattr(os, 'wait4'):
+        try:
+            return process.wait(timeout=timeout), None, None, False
+        except subprocess.TimeoutExpired:
+            process.kill()
+            return process.wait(), None, None, True
+
+    deadline = time.time() + timeout
+    timed_out = False
+    delay = 0.01
+    while True:
+        pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+        if pid:
+            break
+        if time.time() >= deadline:
+            process.kill()
+            timed_out = True
+            pid, status, usage = os.wait4(process.pid, 0)
+            break
+        time.sleep(delay)
+        delay = min(delay * 2, 0.05)
+    # Reaped here, so Popen must not wait for it again
+    process.returncode = os.waitstatus_to_exitcode(status)
+    cpu_time = usage.ru_utime + usage.ru_stime
+    return process.returncode, cpu_time, usage.ru_maxrss / MAXRSS_PER_MB, timed_out
+
+
+def child_limits(cpu=None, memory_limit_mb=None):
+    """
+    preexec_fn that pins the child to one CPU and caps its address space
+    before the solver is exec'd, so no part of the job runs unlimited
+    (None when there is nothing to apply). It only makes two system calls,
+    nothing that could wait on a lock held by another worker thread.
+    """
+    pin = cpu is not None and hasattr(os, 'sched_setaffinity')
+    limit = int(memory_limit_mb) * 1024 * 1024 if memory_limit_mb and resource is not None else None
+    if not pin and limit is None:
+        return None
+
+    def apply_limits():
+        if pin:
+            os.sched_setaffinity(0, {cpu})
+        if limit is not None:
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    return apply_limits
+
+
+def run_cbp_solver(script_path, mtx_file, timeout=600, cpu=None, memory_limit_mb=None):
     """
     Run CBP solver with timeout and capture output.
     This version forces unbuffered output to prevent data loss on timeout.
+    cpu pins the job to one core, memory_limit_mb caps its address space
+    (RLIMIT_AS), so parallel jobs stay comparable with sequential ones.
     """
     start_time = time.time()
     output = ""
     stderr = ""
     timed_out = False
     return_code = 0
+    cpu_time = None
+    max_rss_mb = None
 
     def parse_output(output_text):
         """Parse solver output to extract results"""
@@ -40,6 +127,7 @@ def run_cbp_solver(script_path, mtx_file, timeout=600):
         current_testing_w = None
         w_to_clauses = {}
         w_to_vars = {}
+        core_sizes = None
 
         lines = output_text.split('\n')
 
@@ -51,6 +139,8 @@ def run_cbp_solver(script_path, mtx_file, timeout=600):
                     pass
             elif "No solution found." in line:
                 bandwidth = "NO_SOLUTION"
+            elif "UNSAT core sizes:" in line:
+                core_sizes = line.split("UNSAT core sizes:")[-1].strip()
             elif "Testing with bandwidth w =" in line or "===== Testing with bandwidth w =" in line:
                 try:
                     current_testing_w = int(line.split("w =")[-1].strip().replace("=====", "").strip())
@@ -94,39 +184,61 @@ def run_cbp_solver(script_path, mtx_file, timeout=600):
             vars_count = w_to_vars.get(last_w)
 
         return (bandwidth, last_successful_w, last_successful_clauses, 
-                last_successful_vars, timeout_at_w, clauses_count, vars_count)
+                last_successful_vars, timeout_at_w, clauses_count, vars_count, core_sizes)
 
+    # Solvers write their JSON-lines event stream here (see cbp_events.py)
+    events_fd, events_path = tempfile.mkstemp(prefix='cbp_events_', suffix='.jsonl')
+    os.close(events_fd)
     try:
-        try:
-            # *** FIX: Added '-u' flag to force unbuffered output from the child script.
-            # This is the critical change to prevent losing the last "SAT" message before a timeout.
-            result = subprocess.run(
+        # Output goes to temporary files: no pipe to drain while polling for the exit
+        with tempfile.TemporaryFile() as out_file, tempfile.TemporaryFile() as err_file:
+            # '-u' keeps stdout complete on a timeout kill, only needed by the
+            # stdout fallback for scripts that do not write the event stream
+            process = subprocess.Popen(
                 [sys.executable, '-u', script_path, mtx_file],
-                capture_output=True,
-                text=True,
-                encoding='utf-8',
-                errors='ignore',
-                timeout=timeout
+                stdout=out_file,
+                stderr=err_file,
+                env=dict(os.environ, **{EVENTS_ENV: events_path}),
+                preexec_fn=child_limits(cpu, memory_limit_mb)
             )
-            output = result.stdout
-            stderr = result.stderr
-            return_code = result.returncode
-        except subprocess.TimeoutExpired as e:
-            output = e.stdout if e.stdout else ""
-            stderr = e.stderr if e.stderr else ""
-            timed_out = True
-            return_code = -1  # Custom code for timeout
-
-        runtime = time.time() - start_time
-
-        (bandwidth, last_w, last_clauses, last_vars,
-         timeout_w, final_clauses, final_vars) = parse_output(output)
+            return_code, cpu_time, max_rss_mb, timed_out = wait_child(process, timeout)
+            runtime = time.time() - start_time
+            if timed_out:
+                return_code = -1  # Custom code for timeout
+            out_file.seek(0)
+            err_file.seek(0)
+            output = out_file.read().decode('utf-8', errors='ignore')
+            stderr = err_file.read().decode('utf-8', errors='ignore')
+
+        events = read_events(events_path)
+        summary = summarize_events(events, timed_out) if events else {}
+        if events:
+            bandwidth, last_w, last_clauses, last_vars = (
+                summary['bandwidth'], summary['last_successful_w'],
+                summary['last_successful_clauses'], summary['last_successful_vars'])
+            timeout_w, final_clauses, final_vars, core_sizes = (
+                summary['timeout_at_w'], summary['clauses'], summary['variables'], summary['core_sizes'])
+        else:
+            (bandwidth, last_w, last_clauses, last_vars,
+             timeout_w, final_clauses, final_vars, core_sizes) = parse_output(output)
 
         return {
             'success': return_code == 0 and bandwidth is not None and bandwidth != "NO_SOLUTION",
             'return_code': return_code,
             'bandwidth': bandwidth,
             'runtime': runtime,
+            'cpu_time': cpu_time,
+            'max_rss_mb': max_rss_mb,
+            'encode_time': summary.get('encode_time'),
+            'solve_time': summary.get('solve_time'),
+            'conflicts': summary.get('conflicts'),
+            'build_time': summary.get('build_time'),
+            'decisions': summary.get('decisions'),
+            'propagations': summary.get('propagations'),
+            'restarts': summary.get('restarts'),
+            'families': summary.get('families'),
+            'amo_encoding': summary.get('amo_encoding'),
+            'profile': summary.get('profile'),
             'clauses': final_clauses,
             'variables': final_vars,
             'output': output,
@@ -134,16 +246,101 @@ def run_cbp_solver(script_path, mtx_file, timeout=600):
             'last_successful_w': last_w,
             'last_successful_clauses': last_clauses,
             'last_successful_vars': last_vars,
-            'timeout_at_w': timeout_w
+            'timeout_at_w': timeout_w,
+            'core_sizes': core_sizes
         }
 
     except Exception as e:
         return {
             'success': False, 'return_code': -99, 'bandwidth': None,
-            'runtime': time.time() - start_time, 'clauses': None, 'variables': None,
+            'runtime': time.time() - start_time, 'cpu_time': None, 'max_rss_mb': None,
+            'encode_time': None, 'solve_time': None, 'conflicts': None,
+            'clauses': None, 'variables': None,
             'output': "", 'error': str(e), 'last_successful_w': None,
-            'last_successful_clauses': None, 'last_successful_vars': None, 'timeout_at_w': None
+            'last_successful_clauses': None, 'last_successful_vars': None, 'timeout_at_w': None,
+            'core_sizes': None
         }
+    finally:
+        if os.path.exists(events_path):
+            os.remove(events_path)
+
+
+def load_in_process_solver(solver_name):
+    """Callable (n, edges) -> w for an in-process run, or None if the solver has no module entry."""
+    from cbp import SOLVERS, get_solver
+
+    name = IN_PROCESS_SOLVERS.get(solver_name, solver_name)
+    if name not in SOLVERS:
+        return None
+    return get_solver(name)
+
+
+def run_cbp_solver_in_process(solver_name, mtx_file, timeout=600):
+    """
+    Run one solver inside this interpreter: no process start-up or import in
+    the measurement. Phase times come from the event stream (perf_counter in
+    the drivers); the timeout interrupts the SAT call (solver_deadline.py).
+    runtime covers the solve only, loading the graph is reported as load_time.
+    A file that cannot be read is a failed job (return code -99), like a
+    solver error.
+    """
+    from dataset_loader import load_graph
+    from solver_deadline import SolveTimeout, solve_deadline
+
+    result = {
+        'success': False, 'return_code': 0, 'bandwidth': None, 'runtime': 0.0, 'load_time': None,
+        'cpu_time': None, 'max_rss_mb': None, 'encode_time': None, 'solve_time': None,
+        'conflicts': None, 'clauses': None, 'variables': None, 'output': "", 'error': "",
+        'last_successful_w': None, 'last_successful_clauses': None, 'last_successful_vars': None,
+        'timeout_at_w': None, 'core_sizes': None
+    }
+    run = load_in_process_solver(solver_name)
+    if run is None:
+        result.update(return_code=-99, error=f"Solver '{solver_name}' cannot run in-process")
+        return result
+
+    start_time = time.perf_counter()
+    try:
+        n, graph = load_graph(mtx_file)
+    except Exception as e:
+        result.update(return_code=-99, error=f"Cannot read {mtx_file}: {type(e).__name__}: {e}")
+        return result
+    result['load_time'] = time.perf_counter() - start_time
+    if n is None:
+        result.update(return_code=-99, error=f"Cannot read {mtx_file}")
+        return result
+
+    events_buffer = io.StringIO()
+    output = io.StringIO()
+    set_event_sink(events_buffer)
+    timed_out = False
+    cpu_start = time.process_time()
+    start_time = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(output), solve_deadline(timeout):
+            bandwidth = run(n, graph)
+    except SolveTimeout:
+        timed_out = True
+        result['return_code'] = -1  # Same code as a killed subprocess
+    except Exception as e:
+        result.update(return_code=-99, error=f"{type(e).__name__}: {e}")
+    finally:
+        result['runtime'] = time.perf_counter() - start_time
+        result['cpu_time'] = time.process_time() - cpu_start
+        set_event_sink(None)
+
+    summary = summarize_events(parse_events(events_buffer.getvalue().splitlines()), timed_out)
+    for key in ('bandwidth', 'last_successful_w', 'last_successful_clauses', 'last_successful_vars',
+                'timeout_at_w', 'clauses', 'variables', 'core_sizes', 'encode_time', 'solve_time',
+                'build_time', 'conflicts', 'decisions', 'propagations', 'restarts', 'amo_encoding', 'families', 'profile'):
+        result[key] = summary[key]
+    if result['bandwidth'] is None and not timed_out and result['return_code'] == 0:
+        result['bandwidth'] = bandwidth  # Solver without an answer event
+    result['output'] = output.getvalue()
+    result['success'] = (result['return_code'] == 0 and result['bandwidth'] is not None
+                         and result['bandwidth'] != "NO_SOLUTION")
+    return result
+
 
 def get_graph_stats(mtx_file):
     """Get basic graph information"""
@@ -151,113 +348,348 @@ def get_graph_stats(mtx_file):
         script_dir = os.path.dirname(os.path.abspath(__file__))
         if script_dir not in sys.path:
             sys.path.append(script_dir)
-        from dataset_loader import load_mtx_graph
-
-        n_vertices, graph_edges = load_mtx_graph(mtx_file)
-        if n_vertices is None or graph_edges is None:
-            return None, None, None
+        from dataset_loader import load_graph_stats
 
-        if n_vertices == 0:
-            return 0, 0, 0
-        degree = [0] * n_vertices
-        for u, v in graph_edges:
-            degree[u] += 1
-            degree[v] += 1
-        max_degree = max(degree) if degree else 0
-
-        return n_vertices, len(graph_edges), max_degree
+        # Binary cache next to the file: parsed once, shared with the solver runs
+        stats = load_graph_stats(mtx_file)
+        return stats['n_vertices'], stats['n_edges'], stats['max_degree']
     except Exception as e:
         print(f"Error getting stats for {mtx_file}: {e}")
         return None, None, None
 
-def main():
+def estimate_job_size(vertices, edges):
+    """Rough cost of one job for longest-first ordering (encoding grows with n * |E|)."""
+    if not vertices or not edges:
+        return 0
+    return vertices * edges
+
+
+class ResultWriter:
+    """
+    CSV writer shared by the worker threads: one lock, one row at a time,
+    flushed and fsynced so a finished job survives a crash or a reboot.
+    """
+
+    def __init__(self, csvfile, fieldnames, write_header=True, results_db=None, run_id=None):
+        self.csvfile = csvfile
+        self.results_db = results_db
+        self.run_id = run_id
+        self.writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
+        self.lock = threading.Lock()
+        self.done = 0
+        if write_header:
+            self.writer.writeheader()
+            self.sync()
+
+    def sync(self):
+        self.csvfile.flush()
+        os.fsync(self.csvfile.fileno())
+
+    def write(self, row, message):
+        with self.lock:
+            self.done += 1
+            self.writer.writerow(row)
+            self.sync()
+            if self.results_db is not None:
+                self.results_db.add_result(self.run_id, row)
+            print(message.format(done=self.done), flush=True)
+
+
+def job_config(timeout, in_process, memory_limit_mb):
+    """Settings that change a job's result, part of its campaign key."""
+    mode = 'in-process' if in_process else 'subprocess'
+    return f"timeout={timeout};mode={mode};memory={memory_limit_mb or 'none'}"
+
+
+def load_campaign(csv_file, fieldnames):
+    """
+    Rows already in a campaign file: (fieldnames, set of finished
+    (file_path, solver, config) keys). A last row cut off by a crash is
+    removed from the file so appending starts on a clean line. A header
+    written by an older auto_test is extended with the missing columns
+    (rewriting the file), so new rows never lose a column; earlier rows
+    without file_path or config have no key and are run again.
+
+    Returns:
+        tuple: (fieldnames or None for a new/empty file, finished keys)
+    """
+    if not os.path.exists(csv_file) or os.path.getsize(csv_file) == 0:
+        return None, set()
+    with open(csv_file, 'rb+') as f:
+        data = f.read()
+        if not data.endswith(b'\n'):
+            f.truncate(data.rfind(b'\n') + 1)
+
+    with open(csv_file, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+        header = list(reader.fieldnames or [])
+
+    missing = [name for name in fieldnames if name not in header]
+    if missing:
+        header += missing
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(csv_file)), suffix='.csv')
+        with os.fdopen(fd, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=header)
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(tmp_path, csv_file)
+        print(f"Campaign {csv_file}: added column(s) {', '.join(missing)} to its header")
+        if 'file_path' in missing or 'config' in missing:
+            print(f"   => its {len(rows)} earlier row(s) have no job key and will be run again")
+
+    finished = set()
+    for row in rows:
+        if row.get('file_path') and row.get('config') is not None and row.get('success') in ('True', 'False'):
+            finished.add((row['file_path'], row['solver'], row['config']))
+    return header, finished
+
+
+def result_message(solver_name, file_name, result, timeout):
+    """One progress line for a finished job (same wording as the sequential runner)."""
+    if result['success']:
+        text = f"SUCCESS w={result['bandwidth']} ({result['runtime']:.1f}s)"
+    elif result.get('return_code') == -1:
+        text = f"TIMEOUT ({timeout}s)"
+        if result.get('timeout_at_w'):
+            text += f" at w={result['timeout_at_w']}"
+        if result.get('last_successful_w'):
+            text += f" | Last SAT: w={result['last_successful_w']}"
+    else:
+        text = f"FAILED (code: {result.get('return_code')})"
+        if result['error']:
+            text += f"\n      Error: {result['error'].strip().splitlines()[-1]}"
+    return f"{file_name} {solver_name}... {text}"
+
+
+def is_crash(return_code):
+    """Killed by a signal (negative code), excluding the timeout kill (-1) and in-process errors (-99)."""
+    return return_code is not None and return_code < 0 and return_code not in (-1, -99)
+
+
+def write_job_error(job, config, writer, total_tests, error, status):
+    """Failed row of a job that produced no solver result."""
+    mtx_file, _, solver_name, vertices, edges, max_degree = job
+    file_name = os.path.basename(mtx_file)
+    writer.write({
+        'file_name': file_name, 'solver': solver_name,
+        'vertices': vertices, 'edges': edges, 'max_degree': max_degree,
+        'success': False, 'error_msg': error[:200],
+        'file_path': mtx_file, 'config': config, 'attempt': 1
+    }, f"  [{{done}}/{total_tests}] {file_name} {solver_name}... {status}")
+
+
+def run_job(job, timeout, cpu, memory_limit_mb, writer, total_tests, in_process=False):
+    """
+    Run one (file, solver) job and write its CSV row. A job that crashed
+    (killed by a signal other than the timeout kill) is retried once; only
+    the last attempt is written. Outcomes that would repeat (no solution,
+    a solver error, a refused formula) are not retried.
+    """
+    mtx_file, solver_script, solver_name, vertices, edges, max_degree = job
+    file_name = os.path.basename(mtx_file)
+    prefix = f"  [{{done}}/{total_tests}]"
+    config = job_config(timeout, in_process, memory_limit_mb)
+
+    if not in_process and not os.path.exists(solver_script):
+        write_job_error(job, config, writer, total_tests, f"Solver script '{solver_script}' not found",
+                        "SKIP (file not found)")
+        return
+
+    for attempt in (1, 2):
+        if in_process:
+            result = run_cbp_solver_in_process(solver_name, mtx_file, timeout)
+        else:
+            result = run_cbp_solver(solver_script, mtx_file, timeout, cpu, memory_limit_mb)
+        if result['success'] or not is_crash(result.get('return_code')):
+            break
+        if attempt == 1:
+            print(f"  {file_name} {solver_name}... FAILED (code: {result.get('return_code')}), retrying once",
+                  flush=True)
+
+    # Synthetic graphs (graph_generators.py) carry their optimum: a different answer is a wrong result
+    expected = known_optimum(mtx_file)
+    if result['success'] and expected is not None and str(result['bandwidth']) != str(expected):
+        result['success'] = False
+        result['error'] = f"Wrong answer: bandwidth {result['bandwidth']} != known optimum {expected}"
+    writer.write({
+        'file_name': file_name,
+        'solver': solver_name,
+        'vertices': vertices,
+        'edges': edges,
+        'max_degree': max_degree,
+        'success': result['success'],
+        'bandwidth': result['bandwidth'],
+        'mode': 'in-process' if in_process else 'subprocess',
+        'runtime_sec': round(result['runtime'], 2),
+        'load_sec': round(result['load_time'], 3) if result.get('load_time') is not None else None,
+        'cpu_sec': round(result['cpu_time'], 2) if result.get('cpu_time') is not None else None,
+        'encode_sec': round(result['encode_time'], 3) if result.get('encode_time') is not None else None,
+        'solve_sec': round(result['solve_time'], 3) if result.get('solve_time') is not None else None,
+        'build_sec': round(result['build_time'], 3) if result.get('build_time') is not None else None,
+        'conflicts': result.get('conflicts'),
+        'decisions': result.get('decisions'),
+        'propagations': result.get('propagations'),
+        'restarts': result.get('restarts'),
+        'encode_families': json.dumps(rounded(result['families'], 4)) if result.get('families') else None,
+        'probe_profile': json.dumps(rounded(result['profile']['probes'], 4))
+                         if result.get('profile') and result['profile']['probes'] else None,
+        'max_rss_mb': round(result['max_rss_mb'], 1) if result.get('max_rss_mb') is not None else None,
+        'clauses': result['clauses'],
+        'variables': result['variables'],
+        'amo_encoding': result.get('amo_encoding'),
+        'timeout': result.get('return_code') == -1,
+        'timeout_at_w': result.get('timeout_at_w'),
+        'last_successful_w': result.get('last_successful_w'),
+        'last_successful_clauses': result.get('last_successful_clauses'),
+        'last_successful_vars': result.get('last_successful_vars'),
+        'core_sizes': result.get('core_sizes'),
+        'error_msg': result['error'][:200] if result['error'] else "",
+        'file_path': mtx_file,
+        'config': config,
+        'attempt': attempt
+    }, f"{prefix} {result_message(solver_name, file_name, result, timeout)}")
+
+
+def available_cpus():
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def run_jobs(jobs, workers, timeout, memory_limit_mb, writer, pin=True, in_process=False):
+    """
+    Run jobs on a pool of worker threads, each driving one solver process at
+    a time. Worker i pins its processes to the i-th available CPU, so jobs
+    never share a core; with pinning on, workers is capped at the number of
+    available CPUs. Jobs are taken from a shared list in the given order.
+    """
+    cpus = available_cpus()
+    workers = max(1, min(workers, len(jobs)))
+    if pin and workers > len(cpus):
+        print(f"   => {workers} workers > {len(cpus)} available CPUs: using {len(cpus)} workers, "
+              f"one per core (--no-pin to oversubscribe)")
+        workers = len(cpus)
+    pending = list(reversed(jobs))
+    lock = threading.Lock()
+
+    def worker(index):
+        cpu = cpus[index % len(cpus)] if pin and workers > 1 else None
+        while True:
+            with lock:
+                if not pending:
+                    return
+                job = pending.pop()
+            try:
+                run_job(job, timeout, cpu, memory_limit_mb, writer, len(jobs), in_process)
+            except Exception as e:
+                # One broken job must not end this worker and the jobs behind it
+                write_job_error(job, job_config(timeout, in_process, memory_limit_mb), writer, len(jobs),
+                                f"{type(e).__name__}: {e}", f"ERROR ({type(e).__name__})")
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def main(argv=None):
     # Configuration
     test_directory = "Dataset"
     solvers = [
         ("ver_2.py", "ver_2"),
         ("ver_2_5.py", "ver_2_5"),
+        ("core_cbp.py", "core_cbp"),
     ]
     timeout = 600
 
-    mtx_files = find_mtx_files(test_directory)
+    parser = argparse.ArgumentParser(description="Run every CBP solver on every test file, results to CSV.")
+    parser.add_argument('--directory', default=test_directory, help='folder searched for .mtx/.mtx.gz files')
+    parser.add_argument('--timeout', type=int, default=timeout, help='seconds per (file, solver) job')
+    parser.add_argument('--workers', type=int, default=1, help='jobs run at the same time')
+    parser.add_argument('--memory-limit', type=int, default=None, metavar='MB',
+                        help='address-space limit (RLIMIT_AS) of every solver process')
+    parser.add_argument('--no-pin', action='store_true', help='do not pin each worker to its own CPU')
+    parser.add_argument('--in-process', action='store_true',
+                        help='call solve_cbp in this interpreter instead of one subprocess per job')
+    parser.add_argument('--campaign', metavar='CSV',
+                        help='resumable results file: finished (file, solver, config) jobs are skipped')
+    parser.add_argument('--db', default='cbp_benchmarks.sqlite',
+                        help='results database that collects every run (see results_db.py)')
+    parser.add_argument('--no-db', action='store_true', help='write the CSV file only')
+    args = parser.parse_args(argv)
+    timeout = args.timeout
+
+    if args.in_process:
+        # Solvers share the interpreter (and the GIL): one job at a time, and
+        # their modules plus PySAT imported up front, outside every measurement
+        if args.workers > 1:
+            print("--in-process runs one job at a time, ignoring --workers")
+        args.workers = 1
+        import pysat.solvers  # noqa: F401
+        for _, solver_name in solvers:
+            load_in_process_solver(solver_name)
+
+    mtx_files = find_mtx_files(args.directory)
     print(f"Found {len(mtx_files)} test files.")
     if not mtx_files:
         print("No .mtx files found!")
         return
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    csv_file = f"cbp_test_results_{timestamp}.csv"
+    csv_file = args.campaign or f"cbp_test_results_{timestamp}.csv"
 
     fieldnames = [
         'file_name', 'solver', 'vertices', 'edges', 'max_degree',
-        'success', 'bandwidth', 'runtime_sec', 'clauses', 'variables',
+        'success', 'bandwidth', 'mode', 'runtime_sec', 'load_sec', 'cpu_sec', 'max_rss_mb',
+        'encode_sec', 'build_sec', 'solve_sec', 'conflicts', 'decisions', 'propagations', 'restarts',
+        'encode_families', 'probe_profile', 'clauses', 'variables', 'amo_encoding',
         'timeout', 'timeout_at_w', 'last_successful_w', 'last_successful_clauses', 'last_successful_vars',
-        'error_msg'
+        'core_sizes', 'error_msg', 'file_path', 'config', 'attempt'
     ]
 
-    print(f"\nStarting test with {len(solvers)} solver(s)...")
+    # A campaign file keeps its own header, finished jobs are not run again
+    existing_fieldnames, finished = load_campaign(csv_file, fieldnames) if args.campaign else (None, set())
+    config = job_config(timeout, args.in_process, args.memory_limit)
+
+    # Longest first: the big graphs start early instead of finishing the run alone
+    jobs = []
+    for mtx_file in mtx_files:
+        pending_solvers = [(script, name) for script, name in solvers
+                           if (mtx_file, name, config) not in finished]
+        if not pending_solvers:
+            continue
+        vertices, edges, max_degree = get_graph_stats(mtx_file)
+        for solver_script, solver_name in pending_solvers:
+            jobs.append((mtx_file, solver_script, solver_name, vertices, edges, max_degree))
+    jobs.sort(key=lambda job: -estimate_job_size(job[3], job[4]))
+
+    if args.campaign and existing_fieldnames:
+        print(f"\nResuming campaign {csv_file}: {len(mtx_files) * len(solvers) - len(jobs)} job(s) already done")
+    if not jobs:
+        print("Nothing left to run.")
+        return
+
+    print(f"\nStarting test with {len(solvers)} solver(s), {len(jobs)} jobs on {args.workers} worker(s)...")
     print(f"Results will be saved to: {csv_file}")
 
-    with open(csv_file, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-
-        total_tests = len(mtx_files) * len(solvers)
-        current_test = 0
-
-        for mtx_file in mtx_files:
-            file_name = os.path.basename(mtx_file)
-            print(f"\nTesting file: {file_name}")
-            vertices, edges, max_degree = get_graph_stats(mtx_file)
-
-            for solver_script, solver_name in solvers:
-                current_test += 1
-                print(f"  [{current_test}/{total_tests}] {solver_name}... ", end="", flush=True)
-
-                if not os.path.exists(solver_script):
-                    print("SKIP (file not found)")
-                    writer.writerow({
-                        'file_name': file_name, 'solver': solver_name,
-                        'vertices': vertices, 'edges': edges, 'max_degree': max_degree,
-                        'success': False, 'error_msg': f"Solver script '{solver_script}' not found"
-                    })
-                    continue
-
-                result = run_cbp_solver(solver_script, mtx_file, timeout)
-                is_timeout = result.get('return_code') == -1
-
-                if result['success']:
-                    print(f"SUCCESS w={result['bandwidth']} ({result['runtime']:.1f}s)")
-                elif is_timeout:
-                    timeout_info = f"TIMEOUT ({timeout}s)"
-                    if result.get('timeout_at_w'):
-                        timeout_info += f" at w={result['timeout_at_w']}"
-                    if result.get('last_successful_w'):
-                        timeout_info += f" | Last SAT: w={result['last_successful_w']}"
-                    print(timeout_info)
-                else:
-                    print(f"FAILED (code: {result.get('return_code')})")
-                    if result['error']:
-                        print(f"      Error: {result['error'].strip().splitlines()[-1]}")
-
-                writer.writerow({
-                    'file_name': file_name,
-                    'solver': solver_name,
-                    'vertices': vertices,
-                    'edges': edges,
-                    'max_degree': max_degree,
-                    'success': result['success'],
-                    'bandwidth': result['bandwidth'],
-                    'runtime_sec': round(result['runtime'], 2),
-                    'clauses': result['clauses'],
-                    'variables': result['variables'],
-                    'timeout': is_timeout,
-                    'timeout_at_w': result.get('timeout_at_w'),
-                    'last_successful_w': result.get('last_successful_w'),
-                    'last_successful_clauses': result.get('last_successful_clauses'),
-                    'last_successful_vars': result.get('last_successful_vars'),
-                    'error_msg': result['error'][:200] if result['error'] else ""
-                })
+    results_db, run_id = None, None
+    if not args.no_db:
+        from results_db import ResultsDB
+        results_db = ResultsDB(args.db)
+        from results_db import collect_environment
+        run_id = results_db.start_run(os.path.basename(csv_file), config,
+                                      collect_environment([name for _, name in solvers]))
+        print(f"Results database: {args.db} (run {run_id})")
+
+    with open(csv_file, 'a' if existing_fieldnames else 'w', newline='', encoding='utf-8') as csvfile:
+        writer = ResultWriter(csvfile, existing_fieldnames or fieldnames, write_header=not existing_fieldnames,
+                              results_db=results_db, run_id=run_id)
+        run_jobs(jobs, args.workers, timeout, args.memory_limit, writer, pin=not args.no_pin,
+                 in_process=args.in_process)
+    if results_db is not None:
+        results_db.close()
 
     print(f"\nCompleted! Results saved to {csv_file}")
 
@@ -0,0 +1,206 @@
+"""
+Micro-benchmarks of the CNF encoders, separate from any SAT solving.
+
+Benchmarked encoders, each swept over its parameter grid:
+    - nsc.encode_nsc_at_most_k / at_least_k / exactly_k          (n, k)
+    - pysat.card.CardEnc.atmost with every EncType                (n, k)
+    - generate_clauses_for_cbp of ver_1, ver_1_1, ver_2, ver_2_5  (n, w, density)
+    - sequential.generate_clauses (N-queens, sequential AMO)       (n)
+
+Every case is run `warmup` times unmeasured, then `repeat` times timed with
+perf_counter (median and IQR reported), then once more under tracemalloc
+for the peak Python memory. Clause and variable counts are recorded too.
+The JSON output (environment from results_db.collect_environment) is meant
+to be kept and compared over time.
+
+    python bench_encoders.py [--quick] [--only ver_2] [--repeat 7] [--output bench.json]
+"""
+import contextlib
+import gc
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+# nsc.py and sequential.py live one level up
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+CARD_GRID = [(n, k) for n in (50, 200, 1000) for k in (1, 5, 25)]
+CBP_GRID = [(n, w, density) for n in (20, 40, 80) for w in (2, 5) for density in (0.05, 0.2)]
+QUEENS_GRID = [8, 16, 32, 64]
+QUICK_CARD_GRID = [(50, 1), (200, 5)]
+QUICK_CBP_GRID = [(20, 2, 0.2), (40, 5, 0.05)]
+QUICK_QUEENS_GRID = [8, 16]
+
+# EncTypes that only encode k = 1
+AMO_ONLY = ('pairwise', 'ladder', 'bitwise')
+
+
+def random_graph(n, density, seed=0):
+    """Erdos-Renyi edge list, fixed seed so every run encodes the same graph."""
+    rng = random.Random(seed * 1_000_003 + n)
+    return [(u, v) for u in range(n) for v in range(u + 1, n) if rng.random() < density]
+
+
+def nsc_cases(grid):
+    import nsc
+    from pysat.formula import IDPool
+
+    for name in ('encode_nsc_at_most_k', 'encode_nsc_at_least_k', 'encode_nsc_exactly_k'):
+        encode = getattr(nsc, name)
+        for n, k in grid:
+            if k > n:
+                continue
+
+            def run(encode=encode, n=n, k=k):
+                pool = IDPool(start_from=n + 1)
+                clauses = encode(list(range(1, n + 1)), k, pool)
+                return clauses, max(pool.top, n)
+            yield f"nsc.{name}", {'n': n, 'k': k}, run
+
+
+def cardenc_cases(grid):
+    from pysat.card import CardEnc, EncType
+
+    for enc_name in ('pairwise', 'seqcounter', 'sortnetwrk', 'cardnetwrk', 'bitwise', 'ladder',
+                     'totalizer', 'mtotalizer', 'kmtotalizer'):
+        encoding = getattr(EncType, enc_name)
+        for n, k in grid:
+            if k > 1 and enc_name in AMO_ONLY:
+                continue
+
+            def run(encoding=encoding, n=n, k=k):
+                cnf = CardEnc.atmost(lits=list(range(1, n + 1)), bound=k, top_id=n, encoding=encoding)
+                return cnf.clauses, cnf.nv
+            yield f"CardEnc.atmost[{enc_name}]", {'n': n, 'k': k}, run
+
+
+def cbp_cases(grid):
+    import importlib
+
+    for module_name in ('ver_1', 'ver_1_1', 'ver_2', 'ver_2_5'):
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError as e:
+            print(f"   => Skipping {module_name}: {e}")
+            continue
+        for n, w, density in grid:
+            edges = random_graph(n, density)
+
+            def run(module=module, n=n, w=w, edges=edges, pooled=module_name == 'ver_1'):
+                if pooled:
+                    # ver_1 takes an explicit pool, auxiliaries after the n*n label variables
+                    vpool = module.VPool(start_from=n * n + 1)
+                    return module.generate_clauses_for_cbp(n, edges, w, vpool), vpool.top
+                clauses, n_vars = module.generate_clauses_for_cbp(n, edges, w)
+                return clauses, n_vars
+            yield f"{module_name}.generate_clauses_for_cbp", {'n': n, 'w': w, 'density': density}, run
+
+
+def sequential_cases(grid):
+    # sequential.py solves and prints an 8-queens board when imported
+    with contextlib.redirect_stdout(io.StringIO()):
+        import sequential
+
+    for n in grid:
+        def run(n=n):
+            # The module keeps n and its auxiliary counter as globals
+            sequential.n = n
+            sequential.new_variables_count = 0
+            clauses = sequential.generate_clauses(n, sequential.generate_variables(n))
+            return clauses, n * n + sequential.new_variables_count
+        yield "sequential.generate_clauses", {'n': n}, run
+
+
+def measure(run, warmup=1, repeat=5):
+    """
+    Time one encoder call.
+
+    Returns:
+        dict: {'times', 'median', 'iqr', 'min', 'clauses', 'variables', 'peak_kb'}
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            run()
+        times = []
+        for _ in range(repeat):
+            gc.collect()
+            start_time = time.perf_counter()
+            clauses, n_vars = run()
+            times.append(time.perf_counter() - start_time)
+
+        # Separate call: tracemalloc slows the encoder down
+        gc.collect()
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    if len(times) > 1:
+        quartiles = statistics.quantiles(times, n=4, method='inclusive')
+        iqr = quartiles[2] - quartiles[0]
+    else:
+        iqr = 0.0
+    return {'times': times, 'median': statistics.median(times), 'iqr': iqr, 'min': min(times),
+            'clauses': len(clauses), 'variables': n_vars, 'peak_kb': peak / 1024}
+
+
+def run_benchmarks(quick=False, only=None, warmup=1, repeat=5):
+    """Run every case (filtered by substring only) and return the result records."""
+    suites = (
+        nsc_cases(QUICK_CARD_GRID if quick else CARD_GRID),
+        cardenc_cases(QUICK_CARD_GRID if quick else CARD_GRID),
+        cbp_cases(QUICK_CBP_GRID if quick else CBP_GRID),
+        sequential_cases(QUICK_QUEENS_GRID if quick else QUEENS_GRID),
+    )
+    results = []
+    for suite in suites:
+        for name, params, run in suite:
+            if only and only not in name:
+                continue
+            record = {'benchmark': name, 'params': params}
+            try:
+                record.update(measure(run, warmup, repeat))
+            except Exception as e:
+                record['error'] = f"{type(e).__name__}: {e}"
+                print(f"{name:45s} {json.dumps(params):40s} ERROR {record['error']}")
+                results.append(record)
+                continue
+            print(f"{name:45s} {json.dumps(params):40s} {record['median'] * 1000:9.3f} ms "
+                  f"(IQR {record['iqr'] * 1000:.3f})  {record['clauses']:9d} clauses "
+                  f"{record['variables']:8d} vars  {record['peak_kb']:9.1f} KB", flush=True)
+            results.append(record)
+    return results
+
+
+if __name__ == '__main__':
+    import argparse
+    from results_db import collect_environment
+
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of the CNF encoders.")
+    parser.add_argument('--quick', action='store_true', help='small grids, for a smoke run')
+    parser.add_argument('--only', help='run benchmarks whose name contains this text')
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='JSON file (default bench_encoders_<timestamp>.json)')
+    args = parser.parse_args()
+
+    started = datetime.now()
+    results = run_benchmarks(args.quick, args.only, args.warmup, args.repeat)
+    output = args.output or f"bench_encoders_{started.strftime('%Y%m%d_%H%M%S')}.json"
+    report = {
+        'started': started.isoformat(timespec='seconds'),
+        'settings': {'quick': args.quick, 'only': args.only, 'warmup': args.warmup, 'repeat': args.repeat},
+        'environment': collect_environment(),
+        'results': results,
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+    print(f"\n[*] {len(results)} benchmarks written to {output}")
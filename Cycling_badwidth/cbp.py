@@ -0,0 +1,123 @@
+"""
+Unified command line for the CBP solvers, many graphs per invocation.
+
+    python -m cbp [--solver NAME] [--quiet] [--no-cache] [--result-cache PATH] [--json PATH] FILE [FILE ...]
+
+Every file is read with dataset_loader.iter_graphs (any supported format,
+JSON-lines batches expanded), then solved in this same process, so the
+interpreter and the imports are paid once for the whole batch instead of
+once per graph. Solver modules are imported only when selected.
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import sys
+import time
+
+# name -> (module, function, extra keyword arguments)
+SOLVERS = {
+    'ver_2_5': ('ver_2_5', 'solve_cbp', {}),
+    'ver_2': ('ver_2', 'solve_cbp', {}),
+    'core': ('core_cbp', 'solve_cbp_cores', {}),
+    'reduced': ('graph_reduction', 'solve_cbp_reduced', {}),
+    'maxsat': ('maxsat_cbp', 'solve_cbp_maxsat', {'engine': 'rc2'}),
+    'maxsat_lsu': ('maxsat_cbp', 'solve_cbp_maxsat', {'engine': 'lsu'}),
+}
+
+
+# Solvers that consult a result cache themselves (lookup, bound seeding, store)
+NATIVE_RESULT_CACHE = ('ver_2_5',)
+
+# Solvers that record per-probe timing in a solve_profile.SolveProfile
+PROFILED_SOLVERS = ('ver_2_5', 'ver_2')
+
+
+def get_solver(name, result_cache=None):
+    """
+    Import the solver module on demand and return a callable
+    (n, edges, profile=None) -> w. With a result_cache, solved graphs are
+    looked up before and stored after; a profile is filled by the solvers in
+    PROFILED_SOLVERS and ignored by the others.
+    """
+    module_name, function_name, kwargs = SOLVERS[name]
+    solve = getattr(importlib.import_module(module_name), function_name)
+    if result_cache is not None and name in NATIVE_RESULT_CACHE:
+        kwargs = dict(kwargs, result_cache=result_cache)
+
+    def run(n, edges, profile=None):
+        extra = {'profile': profile} if profile is not None and name in PROFILED_SOLVERS else {}
+        result = solve(n, edges, **kwargs, **extra)
+        return result['bandwidth'] if isinstance(result, dict) else result
+
+    if result_cache is None or name in NATIVE_RESULT_CACHE:
+        return run
+    from result_cache import cached_solve
+    return lambda n, edges, profile=None: cached_solve(
+        n, edges, lambda n_, edges_: run(n_, edges_, profile), result_cache, name)
+
+
+def solve_graphs(paths, solver='ver_2_5', quiet=False, use_cache=True, result_cache=None):
+    """
+    Solve every graph found in paths with one solver.
+
+    Returns:
+        list: one dict {'name', 'vertices', 'edges', 'bandwidth', 'runtime',
+        'profile'} per graph, profile as solve_profile.SolveProfile.to_dict()
+    """
+    from dataset_loader import iter_graphs
+    from solve_profile import SolveProfile
+
+    run = get_solver(solver, result_cache)
+    results = []
+    for name, n, graph in iter_graphs(paths, use_cache=use_cache):
+        if not quiet:
+            print(f"\n===== {name}: {n} vertices, {len(graph)} edges =====")
+        profile = SolveProfile(solver)
+        start_time = time.perf_counter()
+        if quiet:
+            with contextlib.redirect_stdout(io.StringIO()):
+                bandwidth = run(n, graph, profile)
+        else:
+            bandwidth = run(n, graph, profile)
+        runtime = time.perf_counter() - start_time
+        results.append({'name': name, 'vertices': n, 'edges': len(graph),
+                        'bandwidth': bandwidth, 'runtime': runtime, 'profile': profile.to_dict()})
+        if quiet:
+            print(f"{name}\tn={n}\tE={len(graph)}\tw={bandwidth}\t{runtime:.3f}s")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m cbp',
+                                     description='Solve the Cyclic Bandwidth Problem for many graphs in one process.')
+    parser.add_argument('files', nargs='+', help='graph files (.mtx[.gz], .graph, .rua, edge lists, .jsonl batches)')
+    parser.add_argument('--solver', choices=sorted(SOLVERS), default='ver_2_5')
+    parser.add_argument('--quiet', action='store_true', help='one result line per graph, solver output hidden')
+    parser.add_argument('--no-cache', action='store_true', help='do not read or write the binary graph cache')
+    parser.add_argument('--result-cache', metavar='PATH',
+                        help='SQLite store of solved graphs, consulted before solving (see result_cache.py)')
+    parser.add_argument('--json', metavar='PATH',
+                        help='write the results with their per-probe timing profiles as JSON')
+    args = parser.parse_args(argv)
+
+    result_cache = None
+    if args.result_cache:
+        from result_cache import ResultCache
+        result_cache = ResultCache(args.result_cache)
+
+    start_time = time.perf_counter()
+    results = solve_graphs(args.files, args.solver, args.quiet, not args.no_cache, result_cache)
+    total_time = time.perf_counter() - start_time
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'solver': args.solver, 'total_time': total_time, 'results': results}, f, indent=1)
+
+    solved = sum(1 for result in results if result['bandwidth'] is not None)
+    print(f"\n[*] Solved {solved}/{len(results)} graphs with {args.solver} in {total_time:.3f}s")
+    return 0 if results and solved == len(results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Machine-readable event stream of the CBP solver drivers (JSON lines).
+
+Each event is one JSON object per line with at least 'event', 'solver' and
+'t' (seconds since the stream was opened):
+    - probe_start:  {'w'}
+    - encode_done:  {'w', 'clauses', 'variables', 'encode_time', 'families',
+                    'amo_encoding'}
+                    families: {clause family: seconds}, amo_encoding: label
+                    at-most-one encoding used (ver_2, ver_2_5)
+    - solve_done:   {'w', 'result' ('SAT', 'UNSAT' or None), 'build_time',
+                    'solve_time', 'stats'}; build_time is solver construction
+                    and clause loading (ver_2, ver_2_5)
+    - core:         {'w', 'size', 'raw_size'}                (core_cbp only)
+    - answer:       {'bandwidth', 'lower_bound', 'upper_bound', 'source'}
+                    source is 'class', 'cache' or 'search'
+
+The sink is the file named by the CBP_EVENTS environment variable (opened in
+append mode, every line flushed), so a harness can start a solver script
+with CBP_EVENTS set and read the events back even after killing it. An unset
+CBP_EVENTS, or one of '', '0', 'false', 'no', disables the stream; with no
+sink configured emit() returns at once.
+"""
+import json
+import os
+import time
+
+from solve_profile import STAT_KEYS, SolveProfile
+
+EVENTS_ENV = 'CBP_EVENTS'
+EVENTS_DISABLED = ('', '0', 'false', 'no')
+
+_sink = None
+_sink_opened = False
+_start_time = time.perf_counter()
+
+
+def set_event_sink(sink):
+    """Send events to an open text file (or None to disable), overriding CBP_EVENTS."""
+    global _sink, _sink_opened, _start_time
+    _sink = sink
+    _sink_opened = True
+    _start_time = time.perf_counter()
+
+
+def _get_sink():
+    global _sink, _sink_opened
+    if not _sink_opened:
+        _sink_opened = True
+        path = os.environ.get(EVENTS_ENV)
+        if path is not None and path.strip().lower() not in EVENTS_DISABLED:
+            _sink = open(path, 'a', encoding='utf-8', buffering=1)
+    return _sink
+
+
+def events_enabled():
+    return _get_sink() is not None
+
+
+def emit(event, solver=None, **fields):
+    """Write one event line (no-op without a sink)."""
+    sink = _get_sink()
+    if sink is None:
+        return
+    record = {'event': event, 'solver': solver, 't': round(time.perf_counter() - _start_time, 6)}
+    record.update(fields)
+    sink.write(json.dumps(record, default=int) + '\n')
+    sink.flush()
+
+
+def solver_stats(solver, since=None):
+    """
+    Accumulated statistics of a PySAT solver (conflicts, decisions, ...), {}
+    if unsupported. since (an earlier result) turns them into the counts of
+    one call on an incremental solver.
+    """
+    try:
+        stats = dict(solver.accum_stats() or {})
+    except (AttributeError, NotImplementedError):
+        return {}
+    if since:
+        stats = {key: value - since.get(key, 0) for key, value in stats.items()}
+    return stats
+
+
+def parse_events(lines):
+    """Events of JSON lines; a line cut off by a kill is skipped."""
+    events = []
+    for line in lines:
+        try:
+            events.append(json.loads(line))
+        except ValueError:
+            continue
+    return events
+
+
+def read_events(path):
+    """Events of a stream file ([] if it does not exist)."""
+    if not path or not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        return parse_events(f)
+
+
+def summarize_events(events, timed_out=False):
+    """
+    Result fields of one run from its events, the same fields that
+    auto_test.py used to scrape from stdout.
+
+    Returns:
+        dict: {'bandwidth', 'last_successful_w', 'last_successful_clauses',
+        'last_successful_vars', 'timeout_at_w', 'clauses', 'variables',
+        'core_sizes', 'solve_time', 'encode_time', 'build_time', 'conflicts',
+        'decisions', 'propagations', 'restarts', 'amo_encoding', 'families',
+        'profile'} with families the encoding seconds summed per clause family and
+        profile the per-probe records (solve_profile.SolveProfile.to_dict)
+    """
+    summary = {'bandwidth': None, 'last_successful_w': None, 'last_successful_clauses': None,
+               'last_successful_vars': None, 'timeout_at_w': None, 'clauses': None,
+               'variables': None, 'core_sizes': None, 'solve_time': 0.0, 'encode_time': 0.0,
+               'conflicts': 0, 'amo_encoding': None}
+    encoded = {}
+    current_w = None
+    core_sizes = []
+    for event in events:
+        kind = event.get('event')
+        if kind == 'probe_start':
+            current_w = event.get('w')
+        elif kind == 'encode_done':
+            encoded[event['w']] = (event.get('clauses'), event.get('variables'))
+            summary['encode_time'] += event.get('encode_time') or 0.0
+            summary['amo_encoding'] = event.get('amo_encoding') or summary['amo_encoding']
+        elif kind == 'solve_done':
+            current_w = None
+            summary['solve_time'] += event.get('solve_time') or 0.0
+            summary['conflicts'] += (event.get('stats') or {}).get('conflicts', 0)
+            if event.get('result') == 'SAT':
+                w = event['w']
+                summary['last_successful_w'] = w
+                summary['last_successful_clauses'], summary['last_successful_vars'] = \
+                    encoded.get(w, (None, None))
+        elif kind == 'core':
+            core_sizes.append(event.get('size'))
+        elif kind == 'answer':
+            summary['bandwidth'] = event.get('bandwidth')
+            if summary['bandwidth'] is None:
+                summary['bandwidth'] = "NO_SOLUTION"
+
+    if timed_out:
+        summary['timeout_at_w'] = current_w
+    if encoded:
+        # Largest w probed (a single-call encoding such as MaxSAT has w None)
+        summary['clauses'], summary['variables'] = encoded[max(encoded, key=lambda w: -1 if w is None else w)]
+    if core_sizes or any(event.get('solver') == 'core_cbp' for event in events):
+        summary['core_sizes'] = str(core_sizes)
+
+    profile = SolveProfile.from_events(events).to_dict()
+    totals = profile['totals']
+    summary['build_time'] = totals['build_sec']
+    for key in STAT_KEYS[1:]:
+        summary[key] = totals[key]
+    summary['families'] = totals['families']
+    summary['profile'] = profile
+    return summary
@@ -0,0 +1,139 @@
+"""
+Immutable CSR graph shared by the loader, the encoders, the bounds and the
+verifiers.
+
+The graph is built once from canonical edges (u < v, no self-loops, no
+duplicates) and stores NumPy indptr/indices arrays, so degrees, neighbour
+slices and BFS never need another Python pass over the edge list. It still
+behaves like the [(u, v), ...] lists the rest of the package was written
+for: iterating it yields plain int tuples, len() is the number of edges and
+indexing/slicing works on the edge list.
+"""
+import numpy as np
+
+
+def canonical_edge_keys(rows, cols):
+    """
+    Sorted unique int64 keys (u << 32) | v, u < v, of the undirected edges
+    given by COO row/col indices (self-loops dropped).
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    mask = rows != cols
+    lo = np.minimum(rows[mask], cols[mask])
+    hi = np.maximum(rows[mask], cols[mask])
+    return np.unique((lo << 32) | hi)
+
+
+def edge_keys_to_array(keys):
+    return np.stack((keys >> 32, keys & 0xFFFFFFFF), axis=1)
+
+
+def canonical_edge_array(rows, cols):
+    """
+    Build the undirected edge array from COO row/col indices in O(E log E):
+    drop self-loops, order each pair as (min, max) and remove duplicates with
+    np.unique on packed int64 keys.
+
+    Returns:
+        np.ndarray: shape (E, 2), dtype int64, sorted by (u, v)
+    """
+    return edge_keys_to_array(canonical_edge_keys(rows, cols))
+
+
+class CBPGraph:
+    """Undirected graph on vertices 0..n-1 in CSR form (read-only)."""
+
+    __slots__ = ('n', 'edge_array', 'indptr', 'indices', 'degrees', '_edge_list')
+
+    def __init__(self, n, edge_array):
+        """edge_array must be canonical, see canonical_edge_array / from_edges."""
+        edge_array = np.asarray(edge_array, dtype=np.int64).reshape(-1, 2)
+        if len(edge_array) and (edge_array.min() < 0 or edge_array.max() >= n):
+            raise ValueError(f"Edge endpoint out of range for n = {n}")
+
+        # Both orientations, grouped by source vertex
+        sources = np.concatenate((edge_array[:, 0], edge_array[:, 1]))
+        targets = np.concatenate((edge_array[:, 1], edge_array[:, 0]))
+        order = np.lexsort((targets, sources))
+        degrees = np.bincount(sources, minlength=n)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(degrees, out=indptr[1:])
+
+        for name, value in (('n', int(n)), ('edge_array', edge_array), ('indptr', indptr),
+                            ('indices', targets[order]), ('degrees', degrees), ('_edge_list', None)):
+            if isinstance(value, np.ndarray) and value.flags.writeable:
+                value.setflags(write=False)
+            object.__setattr__(self, name, value)
+
+    @classmethod
+    def from_edges(cls, n, edges):
+        """Build from any iterable of (u, v) pairs (self-loops and duplicates dropped)."""
+        edge_array = np.asarray(list(edges), dtype=np.int64).reshape(-1, 2)
+        return cls(n, canonical_edge_array(edge_array[:, 0], edge_array[:, 1]))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CBPGraph is immutable")
+
+    @property
+    def edges(self):
+        """Edge list [(u, v), ...] of plain ints, u < v (built once)."""
+        if self._edge_list is None:
+            object.__setattr__(self, '_edge_list', list(map(tuple, self.edge_array.tolist())))
+        return self._edge_list
+
+    def __iter__(self):
+        return iter(self.edges)
+
+    def __len__(self):
+        return len(self.edge_array)
+
+    def __getitem__(self, index):
+        return self.edges[index]
+
+    def __repr__(self):
+        return f"CBPGraph(n={self.n}, edges={len(self)})"
+
+    @property
+    def n_edges(self):
+        return len(self.edge_array)
+
+    @property
+    def max_degree(self):
+        return int(self.degrees.max()) if self.n else 0
+
+    def neighbors(self, v):
+        """Neighbours of v as a read-only slice of the CSR indices."""
+        return self.indices[self.indptr[v]:self.indptr[v + 1]]
+
+    def adjacency_sets(self):
+        """Adjacency as a list of Python sets, for algorithms that mutate or intersect."""
+        indices = self.indices.tolist()
+        indptr = self.indptr.tolist()
+        return [set(indices[indptr[v]:indptr[v + 1]]) for v in range(self.n)]
+
+    def gather_neighbors(self, vertices):
+        """Concatenated neighbour slices of an array of vertices (with repeats)."""
+        counts = self.degrees[vertices]
+        starts = np.repeat(self.indptr[vertices] - (np.cumsum(counts) - counts), counts)
+        return self.indices[starts + np.arange(counts.sum())]
+
+    def bfs(self, source):
+        """BFS distances from source, level by level (-1 for unreachable)."""
+        dist = np.full(self.n, -1, dtype=np.int64)
+        dist[source] = 0
+        frontier = np.array([source], dtype=np.int64)
+        level = 0
+        while len(frontier):
+            level += 1
+            reached = self.gather_neighbors(frontier)
+            frontier = np.unique(reached[dist[reached] < 0])
+            dist[frontier] = level
+        return dist
+
+
+def as_graph(n, edges):
+    """Return edges unchanged if it already is a CBPGraph on n vertices, else build one."""
+    if isinstance(edges, CBPGraph) and edges.n == n:
+        return edges
+    return CBPGraph.from_edges(n, edges)
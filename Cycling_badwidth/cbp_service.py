@@ -0,0 +1,396 @@
+"""
+Long-lived CBP solver service on localhost HTTP.
+
+Jobs are queued by priority and dispatched to a pool of warm worker
+processes (solver modules and PySAT already imported), so a graph costs one
+solve instead of one interpreter start. Endpoints (JSON in, JSON out):
+
+    POST   /jobs              submit {"n", "edges"} or {"path"}, with optional
+                              "name", "solver", "priority" (higher runs first)
+                              and "deadline" (seconds from submission)
+    GET    /jobs/<id>         job record
+    DELETE /jobs/<id>         cancel a queued or running job
+    GET    /status            queue length, running jobs, workers
+    GET    /stream            finished jobs as JSON lines, as they complete
+                              (?until_idle=1 closes once nothing is pending)
+
+A running job is stopped at its deadline or on cancellation by terminating
+its worker process, which is replaced by a fresh warm one. Only the last
+--keep-finished finished jobs are kept; older ids answer 404.
+
+    python cbp_service.py [--port 8765] [--workers 4] [--solver ver_2_5]
+                          [--keep-finished 1000]
+"""
+import argparse
+import collections
+import contextlib
+import heapq
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from cbp import SOLVERS
+
+DEFAULT_PORT = 8765
+# How often a busy worker slot checks its job's deadline and cancel flag (s)
+POLL_INTERVAL = 0.05
+# States after which a job never changes again
+FINAL_STATES = ('done', 'failed', 'cancelled', 'timeout')
+# Finished job records kept for GET /jobs/<id>; older ones are dropped
+KEEP_FINISHED = 1000
+
+
+def worker_main(conn, warm_solvers):
+    """Worker process: import solvers once, then solve jobs received on conn."""
+    from cbp import get_solver
+    from cbp_graph import CBPGraph
+    from dataset_loader import load_graph
+
+    runners = {name: get_solver(name) for name in warm_solvers}
+    import pysat.solvers  # noqa: F401  (warm: first solve pays no import)
+
+    while True:
+        job = conn.recv()
+        if job is None:
+            break
+        start_time = time.perf_counter()
+        try:
+            if job.get('path'):
+                n, graph = load_graph(job['path'])
+            else:
+                n = job['n']
+                graph = CBPGraph.from_edges(n, job.get('edges', []))
+            if job['solver'] not in runners:
+                runners[job['solver']] = get_solver(job['solver'])
+            with contextlib.redirect_stdout(io.StringIO()):
+                bandwidth = runners[job['solver']](n, graph)
+            conn.send({'state': 'done', 'bandwidth': bandwidth, 'vertices': n, 'edges': len(graph),
+                       'runtime': time.perf_counter() - start_time})
+        except Exception as e:
+            conn.send({'state': 'failed', 'error': f"{type(e).__name__}: {e}",
+                       'runtime': time.perf_counter() - start_time})
+
+
+class JobQueue:
+    """Priority queue of job ids: higher priority first, FIFO among equals."""
+
+    def __init__(self):
+        self.heap = []
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+        self.closed = False
+
+    def push(self, job_id, priority):
+        with self.condition:
+            heapq.heappush(self.heap, (-priority, next(self.counter), job_id))
+            self.condition.notify()
+
+    def pop(self):
+        """Next job id, blocking; None once the queue is closed."""
+        with self.condition:
+            while not self.heap and not self.closed:
+                self.condition.wait()
+            if self.closed:
+                return None
+            return heapq.heappop(self.heap)[2]
+
+    def __len__(self):
+        return len(self.heap)
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+class WorkerSlot(threading.Thread):
+    """Owns one warm worker process and feeds it jobs from the service queue."""
+
+    def __init__(self, service, index):
+        super().__init__(name=f"cbp-worker-{index}", daemon=True)
+        self.service = service
+        self.process = None
+        self.conn = None
+
+    def spawn(self):
+        ctx = multiprocessing.get_context('spawn')
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=worker_main, args=(child_conn, self.service.warm_solvers),
+                                   daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join()
+            self.conn.close()
+            self.process = None
+
+    def run(self):
+        self.spawn()
+        while True:
+            job_id = self.service.queue.pop()
+            if job_id is None:
+                break
+            job = self.service.start_job(job_id)
+            if job is None:
+                continue  # Cancelled or expired while queued
+            self.conn.send(job['spec'])
+            outcome = self.wait(job)
+            if outcome['state'] in ('cancelled', 'timeout') or not self.process.is_alive():
+                # The solver cannot be interrupted from outside: replace the worker
+                self.kill()
+                self.spawn()
+            self.service.finish_job(job_id, outcome)
+        if self.process is not None:
+            self.conn.send(None)
+            self.process.join(timeout=1)
+            self.kill()
+
+    def wait(self, job):
+        while True:
+            if self.conn.poll(POLL_INTERVAL):
+                try:
+                    return self.conn.recv()
+                except EOFError:
+                    return {'state': 'failed', 'error': 'worker process died'}
+            if job['cancel'].is_set():
+                return {'state': 'cancelled'}
+            if job['deadline_at'] is not None and time.time() >= job['deadline_at']:
+                return {'state': 'timeout'}
+            if not self.process.is_alive():
+                return {'state': 'failed', 'error': f"worker exited with code {self.process.exitcode}"}
+
+
+class SolverService:
+    """Job table, priority queue, worker pool and result subscribers."""
+
+    def __init__(self, workers=None, solver='ver_2_5', keep_finished=KEEP_FINISHED):
+        if solver not in SOLVERS:
+            raise ValueError(f"Unknown solver: {solver} (expected one of {sorted(SOLVERS)})")
+        if keep_finished < 1:
+            raise ValueError(f"keep_finished must be at least 1, got {keep_finished}")
+        self.solver = solver
+        self.warm_solvers = [solver]
+        self.queue = JobQueue()
+        self.jobs = {}
+        self.finished = collections.deque()  # Finished job ids, oldest first
+        self.keep_finished = keep_finished
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.subscribers = []
+        self.slots = [WorkerSlot(self, i) for i in range(workers or os.cpu_count() or 1)]
+
+    def start(self):
+        for slot in self.slots:
+            slot.start()
+
+    def stop(self):
+        self.queue.close()
+        for slot in self.slots:
+            slot.join(timeout=5)
+
+    def submit(self, spec):
+        """Queue a job, returns its record (without the graph)."""
+        solver = spec.get('solver', self.solver)
+        if solver not in SOLVERS:
+            raise ValueError(f"Unknown solver: {solver}")
+        if not spec.get('path') and 'n' not in spec:
+            raise ValueError("Job needs either 'path' or 'n' and 'edges'")
+        n = int(spec['n']) if 'n' in spec else None
+        priority = int(spec.get('priority', 0))
+        deadline = float(spec['deadline']) if spec.get('deadline') is not None else None
+
+        with self.lock:
+            job_id = str(next(self.ids))
+            now = time.time()
+            self.jobs[job_id] = {
+                'id': job_id, 'name': spec.get('name', spec.get('path') or f"job-{job_id}"),
+                'solver': solver, 'priority': priority, 'state': 'queued', 'submitted': now,
+                'deadline_at': now + deadline if deadline is not None else None,
+                'cancel': threading.Event(),
+                'spec': {'path': spec.get('path'), 'n': n, 'edges': spec.get('edges', []),
+                         'solver': solver},
+            }
+        self.queue.push(job_id, priority)
+        return self.public(job_id)
+
+    def start_job(self, job_id):
+        """Mark a popped job running, or close it if it was cancelled/expired in the queue."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job['state'] != 'queued':
+                return None
+            if job['deadline_at'] is not None and time.time() >= job['deadline_at']:
+                expired = True
+            else:
+                expired = False
+                job['state'] = 'running'
+                job['started'] = time.time()
+        if expired:
+            self.finish_job(job_id, {'state': 'timeout'})
+            return None
+        return job
+
+    def finish_job(self, job_id, outcome):
+        with self.lock:
+            job = self.jobs[job_id]
+            job.update(outcome)
+            job['finished'] = time.time()
+            job['spec'] = None  # Drop the graph, keep the record
+            record = self.public(job_id)
+            self.finished.append(job_id)
+            while len(self.finished) > self.keep_finished:
+                del self.jobs[self.finished.popleft()]
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            subscriber.put(record)
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job. Returns False if it is unknown or already final."""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job['state'] in FINAL_STATES:
+                return False
+            job['cancel'].set()
+            queued = job['state'] == 'queued'
+            if queued:
+                job['state'] = 'cancelling'
+        if queued:
+            self.finish_job(job_id, {'state': 'cancelled'})
+        return True
+
+    def public(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        return {key: value for key, value in job.items() if key not in ('cancel', 'spec')}
+
+    def pending(self):
+        with self.lock:
+            return sum(1 for job in self.jobs.values() if job['state'] not in FINAL_STATES)
+
+    def status(self):
+        with self.lock:
+            states = {}
+            for job in self.jobs.values():
+                states[job['state']] = states.get(job['state'], 0) + 1
+        return {'workers': len(self.slots), 'queued': states.get('queued', 0), 'jobs': states,
+                'solver': self.solver}
+
+    def subscribe(self):
+        subscriber = queue.Queue()
+        with self.lock:
+            self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.remove(subscriber)
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    service = None  # Set by serve()
+
+    def log_message(self, format, *args):
+        pass  # Quiet: results go to /stream, not to the server log
+
+    def send_json(self, code, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def job_id(self):
+        parts = urlparse(self.path).path.strip('/').split('/')
+        return parts[1] if len(parts) == 2 and parts[0] == 'jobs' else None
+
+    def do_POST(self):
+        if urlparse(self.path).path.rstrip('/') != '/jobs':
+            return self.send_json(404, {'error': 'not found'})
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            spec = json.loads(self.rfile.read(length) or b'{}')
+            self.send_json(202, self.service.submit(spec))
+        except (ValueError, TypeError) as e:
+            self.send_json(400, {'error': str(e)})
+
+    def do_DELETE(self):
+        job_id = self.job_id()
+        if job_id is None or self.service.public(job_id) is None:
+            return self.send_json(404, {'error': 'unknown job'})
+        cancelled = self.service.cancel(job_id)
+        self.send_json(200 if cancelled else 409, self.service.public(job_id))
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/status':
+            return self.send_json(200, self.service.status())
+        if url.path == '/stream':
+            return self.stream(parse_qs(url.query).get('until_idle', ['0'])[0] == '1')
+        job_id = self.job_id()
+        record = self.service.public(job_id) if job_id else None
+        if record is None:
+            return self.send_json(404, {'error': 'unknown job'})
+        self.send_json(200, record)
+
+    def stream(self, until_idle):
+        """Write each finished job as one JSON line until the client goes away."""
+        subscriber = self.service.subscribe()
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.end_headers()
+            while True:
+                if until_idle and subscriber.empty() and self.service.pending() == 0:
+                    break
+                try:
+                    record = subscriber.get(timeout=1.0)
+                except queue.Empty:
+                    continue
+                self.wfile.write((json.dumps(record) + '\n').encode('utf-8'))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.service.unsubscribe(subscriber)
+        self.close_connection = True
+
+
+def serve(host='127.0.0.1', port=DEFAULT_PORT, workers=None, solver='ver_2_5',
+          keep_finished=KEEP_FINISHED):
+    service = SolverService(workers, solver, keep_finished)
+    service.start()
+    handler = type('BoundServiceHandler', (ServiceHandler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    print(f"CBP service on http://{host}:{port} ({len(service.slots)} workers, solver {solver})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='CBP solver service on localhost HTTP')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--solver', choices=sorted(SOLVERS), default='ver_2_5')
+    parser.add_argument('--keep-finished', type=int, default=KEEP_FINISHED,
+                        help=f'finished jobs kept for GET /jobs/<id> (default: {KEEP_FINISHED})')
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.solver, args.keep_finished)
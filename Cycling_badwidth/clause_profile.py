@@ -0,0 +1,121 @@
+"""
+Formula-size profile of one (graph, w) encoding, broken down by clause family.
+
+Every encoder tags its clauses when given a tags list:
+    - ver_2_5, ver_2: ladder, channelling, label_amo, edge_case1/2/3
+    - ver_1_1:        vertex_exactly_one, label_exactly_one, edge_case1/2/3
+    - ver_1:          vertex_exactly_one, label_exactly_one, edge_case1,
+                      edge_case2_3 (exactly-one over the cyclic window)
+For each family the profile counts clauses, literals, auxiliary variables
+(variables above the labeling variables, charged to the first family that
+uses them) and bytes, both as Python lists in memory and as DIMACS text.
+
+    python clause_profile.py Dataset/D_can___24.mtx 5 [--encoder ver_2_5 ver_1_1] [--json out.json]
+"""
+import importlib
+import sys
+
+# encoder -> number of labeling (non-auxiliary) variables for n vertices
+ENCODERS = {
+    'ver_2_5': lambda n: 2 * n * n,
+    'ver_2': lambda n: 2 * n * n,
+    'ver_1_1': lambda n: n * n,
+    'ver_1': lambda n: n * n,
+}
+
+# Python's cached small ints are shared, not allocated per literal
+SMALL_INTS = range(-5, 257)
+POINTER_BYTES = 8
+
+
+def encode_tagged(encoder, n, edges, w):
+    """Clauses of one encoder with their family tags. Returns (clauses, tags, n_vars)."""
+    module = importlib.import_module(encoder)
+    tags = []
+    if encoder == 'ver_1':
+        vpool = module.VPool(start_from=n * n + 1)
+        clauses = module.generate_clauses_for_cbp(n, edges, w, vpool, tags=tags)
+        n_vars = vpool.top
+    else:
+        clauses, n_vars = module.generate_clauses_for_cbp(n, edges, w, tags=tags)
+    if len(tags) != len(clauses):
+        raise RuntimeError(f"{encoder} tagged {len(tags)} of {len(clauses)} clauses")
+    return clauses, tags, n_vars
+
+
+def profile_clauses(clauses, tags, primary_vars):
+    """
+    Size of every clause family, in encoder order.
+
+    Returns:
+        dict: {family: {'clauses', 'literals', 'aux_vars', 'python_bytes', 'dimacs_bytes'}}
+    """
+    families = {}
+    seen_aux = set()
+    for clause, family in zip(clauses, tags):
+        entry = families.get(family)
+        if entry is None:
+            entry = families[family] = {'clauses': 0, 'literals': 0, 'aux_vars': 0,
+                                        'python_bytes': 0, 'dimacs_bytes': 0}
+        entry['clauses'] += 1
+        entry['literals'] += len(clause)
+        entry['python_bytes'] += sys.getsizeof(clause) + POINTER_BYTES
+        entry['dimacs_bytes'] += 2  # "0\n"
+        for lit in clause:
+            if lit not in SMALL_INTS:
+                entry['python_bytes'] += sys.getsizeof(lit)
+            entry['dimacs_bytes'] += len(str(lit)) + 1
+            var = abs(lit)
+            if var > primary_vars and var not in seen_aux:
+                seen_aux.add(var)
+                entry['aux_vars'] += 1
+    return families
+
+
+def profile_encoding(encoder, n, edges, w):
+    """Family profile of one encoder on (graph, w), with totals."""
+    clauses, tags, n_vars = encode_tagged(encoder, n, edges, w)
+    families = profile_clauses(clauses, tags, ENCODERS[encoder](n))
+    totals = {key: sum(entry[key] for entry in families.values())
+              for key in ('clauses', 'literals', 'aux_vars', 'python_bytes', 'dimacs_bytes')}
+    return {'encoder': encoder, 'n': n, 'edges': len(edges), 'w': w, 'variables': n_vars,
+            'families': families, 'totals': totals}
+
+
+def print_profile(profile):
+    totals = profile['totals']
+    print(f"\n===== {profile['encoder']}: n={profile['n']}, E={profile['edges']}, w={profile['w']}, "
+          f"{profile['variables']} variables =====")
+    print(f"   {'family':20s} {'clauses':>10s} {'share':>6s} {'literals':>11s} {'aux vars':>9s} "
+          f"{'python MB':>10s} {'DIMACS MB':>10s}")
+    for family, entry in list(profile['families'].items()) + [('total', totals)]:
+        share = entry['clauses'] / totals['clauses'] if totals['clauses'] else 0.0
+        print(f"   {family:20s} {entry['clauses']:10d} {share:6.1%} {entry['literals']:11d} "
+              f"{entry['aux_vars']:9d} {entry['python_bytes'] / 2**20:10.2f} {entry['dimacs_bytes'] / 2**20:10.2f}")
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+    from dataset_loader import load_graph
+
+    parser = argparse.ArgumentParser(description="Clause-family breakdown of the CBP encodings.")
+    parser.add_argument('file', help='graph file (any format read by dataset_loader)')
+    parser.add_argument('w', type=int, help='bandwidth to encode')
+    parser.add_argument('--encoder', nargs='+', choices=sorted(ENCODERS), default=['ver_2_5'])
+    parser.add_argument('--json', metavar='PATH', help='also write the profiles as JSON')
+    args = parser.parse_args()
+
+    n_vertices, graph_edges = load_graph(args.file)
+    if n_vertices is None:
+        print(" Cannot read data file. Exiting program.")
+        sys.exit(1)
+
+    profiles = []
+    for encoder in args.encoder:
+        profile = profile_encoding(encoder, n_vertices, graph_edges, args.w)
+        print_profile(profile)
+        profiles.append(profile)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'file': args.file, 'profiles': profiles}, f, indent=1)
@@ -0,0 +1,195 @@
+"""
+CBP solver that turns UNSAT cores into reusable lower bounds.
+
+Probes run on one incremental solver (incremental_cbp.py), linear from LB up
+to UB. Every UNSAT probe yields a core: a small set of edges that alone does
+not fit in bandwidth w. The core is minimized and then re-solved on its own
+for w+1, w+2, ... which is cheap and lifts the LB without full probes. Cores
+are kept in a cache keyed by n so later instances that contain the same
+edges start from the proven bound directly.
+"""
+import json
+import os
+import time
+
+from cbp_events import emit, solver_stats
+from graph_classes import classify_graph
+from incremental_cbp import IncrementalCBP
+from lower_bounds import compute_lower_bound
+
+# n -> list of (w, frozenset of edges): those edges alone are UNSAT at width w
+_CORE_CACHE = {}
+
+
+def canonical_edge(u, v):
+    return (u, v) if u < v else (v, u)
+
+
+def record_core(core_cache, n, w, core_edges):
+    """Store that core_edges cannot be labeled within bandwidth w on n labels."""
+    key = frozenset(canonical_edge(u, v) for u, v in core_edges)
+    entries = core_cache.setdefault(n, [])
+    for i, (cached_w, cached_key) in enumerate(entries):
+        if cached_key == key:
+            entries[i] = (max(w, cached_w), key)
+            return
+    entries.append((w, key))
+
+
+def cached_core_bound(core_cache, n, edges):
+    """Best LB implied by cached cores contained in the edge set (0 if none)."""
+    entries = core_cache.get(n)
+    if not entries:
+        return 0
+    edge_set = set(canonical_edge(u, v) for u, v in edges)
+    return max((w + 1 for w, key in entries if key <= edge_set), default=0)
+
+
+def save_core_cache(core_cache, path):
+    data = {str(n): [[w, sorted(key)] for w, key in entries]
+            for n, entries in core_cache.items()}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def load_core_cache(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {int(n): [(w, frozenset(tuple(e) for e in key)) for w, key in entries]
+            for n, entries in data.items()}
+
+
+def solve_cbp_cores(n, edges, core_cache=None):
+    """
+    Solve CBP with linear search from LB upwards, extracting an UNSAT core
+    at every failed probe and pushing it to the largest w it still refutes.
+
+    Returns:
+        dict: {'bandwidth', 'lower_bound', 'probes', 'cores', 'graph_class'}
+        where cores is a list of {'w', 'raw_size', 'size'} (core sizes in edges)
+    """
+    if core_cache is None:
+        core_cache = _CORE_CACHE
+
+    edges = sorted(set(canonical_edge(u, v) for u, v in edges if u != v))
+
+    # Closed-form answer for trivial graph classes, no encoding needed
+    known = classify_graph(n, edges)
+    if known is not None:
+        print(f"   => Graph class: {known['class']} (labeling: {known['labeling']})")
+        print(f"==================================================")
+        print(f"[*] FOUND! Minimum Cyclic Bandwidth (w) is: {known['bandwidth']}")
+        print(f"==================================================")
+        emit('answer', 'core_cbp', bandwidth=known['bandwidth'], lower_bound=known['bandwidth'],
+             upper_bound=known['bandwidth'], source='class')
+        return {'bandwidth': known['bandwidth'], 'lower_bound': known['bandwidth'],
+                'probes': 0, 'cores': [], 'graph_class': known['class']}
+
+    low_w, lb_details = compute_lower_bound(n, edges)
+    high_w = n // 2
+    cache_w = min(cached_core_bound(core_cache, n, edges), high_w)
+    if cache_w > low_w:
+        lb_details['core_cache'] = cache_w
+        low_w = cache_w
+
+    print(f"   => Lower Bound (LB): {low_w} {lb_details}")
+    print(f"   => Upper Bound (UB): {high_w}")
+    print(f"   => Search strategy: Incremental linear from {low_w} up to {high_w}, UNSAT cores lift LB")
+
+    result = {'bandwidth': None, 'lower_bound': low_w, 'probes': 0, 'cores': [], 'graph_class': None}
+
+    with IncrementalCBP(n, edges) as cbp:
+        w = low_w
+        while w <= high_w:
+            print(f"\n===== Testing with bandwidth w = {w} =====")
+            emit('probe_start', 'core_cbp', w=w)
+            result['probes'] += 1
+            start_time = time.perf_counter()
+            stats_before = solver_stats(cbp.solver)
+            is_sat = cbp.probe(w)
+            emit('solve_done', 'core_cbp', w=w, result='SAT' if is_sat else 'UNSAT',
+                 solve_time=time.perf_counter() - start_time, stats=solver_stats(cbp.solver, stats_before))
+            print(f"   => Solver result: {'SAT' if is_sat else 'UNSAT'}")
+            if is_sat:
+                print(f"   =>  Found solution with w = {w}")
+                result['bandwidth'] = w
+                break
+
+            raw_core = cbp.core_edges()
+            core = cbp.minimize_core(w, raw_core)
+            print(f"   => UNSAT core: {len(core)}/{len(edges)} edges (raw {len(raw_core)})")
+            result['cores'].append({'w': w, 'raw_size': len(raw_core), 'size': len(core)})
+            emit('core', 'core_cbp', w=w, size=len(core), raw_size=len(raw_core))
+            record_core(core_cache, n, w, [cbp.edges[e] for e in core])
+
+            # Re-solve the core subgraph alone for larger w while it stays UNSAT
+            w += 1
+            while w < high_w and cbp.probe(w, core) is False:
+                core = cbp.minimize_core(w, cbp.core_edges())
+                print(f"   => Core subgraph still UNSAT at w = {w}: {len(core)} edges")
+                result['cores'].append({'w': w, 'raw_size': len(core), 'size': len(core)})
+                emit('core', 'core_cbp', w=w, size=len(core), raw_size=len(core))
+                record_core(core_cache, n, w, [cbp.edges[e] for e in core])
+                w += 1
+            result['lower_bound'] = w
+
+    best_w = result['bandwidth']
+    if best_w is not None:
+        print(f"==================================================")
+        print(f"[*] FOUND! Minimum Cyclic Bandwidth (w) is: {best_w}")
+        print(f"==================================================")
+    else:
+        print(f"\n   =>  No solution found in range [{low_w}, {high_w}]")
+    core_sizes = [core['size'] for core in result['cores']]
+    print(f"   => Probes: {result['probes']}, UNSAT core sizes: {core_sizes}")
+    emit('answer', 'core_cbp', bandwidth=best_w, lower_bound=result['lower_bound'],
+         upper_bound=high_w, source='search')
+
+    return result
+
+if __name__ == '__main__':
+    import sys
+    from dataset_loader import load_mtx_graph, load_mtx_graph_manual, print_graph_stats
+
+    # Check command line arguments
+    if len(sys.argv) < 2:
+        print(" Please provide path to .mtx or .mtx.gz data file")
+        print("Usage: python core_cbp.py <path_to_file.mtx.gz> [core_cache.json]")
+        sys.exit(1)
+
+    file_path = sys.argv[1]
+    cache_path = sys.argv[2] if len(sys.argv) > 2 else None
+    print(f"Reading data from file: {file_path}")
+
+    # Try reading with scipy first
+    n_vertices, graph_edges = load_mtx_graph(file_path)
+
+    # If unsuccessful, try manual reading
+    if n_vertices is None:
+        print("Scipy not available or error, trying manual reading...")
+        n_vertices, graph_edges = load_mtx_graph_manual(file_path)
+
+    if n_vertices is None or graph_edges is None:
+        print(" Cannot read data file. Exiting program.")
+        sys.exit(1)
+
+    # Print graph statistics
+    print_graph_stats(n_vertices, graph_edges)
+
+    core_cache = load_core_cache(cache_path) if cache_path else None
+
+    # Solve CBP
+    print("\nStarting Cyclic Bandwidth Problem solving (UNSAT cores)...")
+    result = solve_cbp_cores(n_vertices, graph_edges, core_cache)
+
+    if cache_path:
+        save_core_cache(core_cache, cache_path)
+
+    print("\n==================================================")
+    if result['bandwidth'] is not None:
+        print(f"[*] FOUND! Minimum Cyclic Bandwidth (w) is: {result['bandwidth']}")
+    else:
+        print("[*] No solution found.")
+    print("==================================================")
@@ -1,11 +1,270 @@
-import gzip
+import hashlib
+import json
+import mmap
+import re
 import numpy as np
-from scipy.io import mmread
 import os
+import tempfile
 
-def load_mtx_graph(file_path):
+from cbp_graph import CBPGraph, as_graph, canonical_edge_array, canonical_edge_keys, edge_keys_to_array
+
+# Files up to this size are parsed in pure Python (no scipy import, no cache)
+SMALL_FILE_BYTES = 1 << 18
+
+# Bytes of coordinate lines parsed per chunk by the streaming reader
+CHUNK_BYTES = 1 << 22
+
+# Per-chunk edge keys are merged (deduplicated) every MERGE_CHUNKS chunks
+MERGE_CHUNKS = 8
+
+# Binary graph cache written next to the source file
+CACHE_EDGES_SUFFIX = '.edges.npy'
+CACHE_META_SUFFIX = '.meta.json'
+CACHE_VERSION = 1
+
+# Values stored after (row, col) on each coordinate line, by MTX field
+MTX_FIELD_VALUES = {'pattern': 0, 'integer': 1, 'real': 1, 'double': 1, 'complex': 2}
+
+# Comment prefixes of plain edge lists
+EDGE_LIST_COMMENTS = (b'#', b'%', b'//')
+
+# Fixed-width lines of a Harwell-Boeing index section parsed per chunk
+HB_CHUNK_LINES = 1 << 16
+
+# Fortran integer format of Harwell-Boeing pointer/index sections, e.g. (16I5)
+HB_INT_FORMAT = re.compile(r'\(\s*(\d*)\s*I\s*(\d+)\s*\)', re.IGNORECASE)
+
+# File extension (without .gz) -> reader
+GRAPH_FORMATS = {
+    '.mtx': 'mtx',
+    '.graph': 'metis', '.metis': 'metis',
+    '.rua': 'hb', '.rsa': 'hb', '.rza': 'hb', '.pua': 'hb', '.psa': 'hb', '.pza': 'hb',
+    '.cua': 'hb', '.csa': 'hb', '.cza': 'hb', '.hb': 'hb', '.rb': 'hb',
+    '.jsonl': 'jsonl', '.ndjson': 'jsonl',
+    '.el': 'edgelist', '.edges': 'edgelist', '.edgelist': 'edgelist',
+    '.txt': 'edgelist', '.tsv': 'edgelist', '.csv': 'edgelist',
+}
+
+def open_text(file_path):
+    """Text handle on a plain or gzip-compressed file (gzip imported on demand)."""
+    if file_path.endswith('.gz'):
+        import gzip
+        return gzip.open(file_path, 'rt', encoding='utf-8')
+    return open(file_path, 'r', encoding='utf-8')
+
+def is_small_file(file_path):
+    return os.path.getsize(file_path) <= SMALL_FILE_BYTES
+
+def read_small_mtx(file_path):
+    """
+    Pure-Python reader for small coordinate .mtx files: one pass over the
+    lines, canonical edges collected in a set.
+    
+    Returns:
+        tuple: (n_vertices, sorted edge list), or None for dense (array) files
+    """
+    size = None
+    edges = set()
+    with open_text(file_path) as f:
+        for line in f:
+            if line.startswith('%'):
+                if line.lower().startswith('%%matrixmarket') and 'array' in line.lower():
+                    return None
+                continue
+            parts = line.split()
+            if not parts:
+                continue
+            if size is None:
+                size = parts
+                continue
+            u, v = int(parts[0]) - 1, int(parts[1]) - 1
+            if u != v:
+                edges.add((u, v) if u < v else (v, u))
+    if size is None:
+        raise ValueError("Missing size line")
+    return max(int(size[0]), int(size[1])), sorted(edges)
+
+def load_mtx_edges(file_path):
+    """
+    Read .mtx or .mtx.gz file into compact arrays (vectorized, no Python loop
+    per entry). Small files take the pure-Python path, larger ones scipy.
+    
+    Args:
+        file_path (str): Path to .mtx or .mtx.gz file
+        
+    Returns:
+        tuple: (n_vertices, edge_array) with:
+            - n_vertices: number of vertices in the graph
+            - edge_array: np.ndarray of shape (E, 2), each row (u, v) with u < v
+    """
+    # Check if file exists
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File does not exist: {file_path}")
+    
+    if is_small_file(file_path):
+        small = read_small_mtx(file_path)
+        if small is not None:
+            n_vertices, edges = small
+            return n_vertices, np.array(edges, dtype=np.int64).reshape(-1, 2)
+    
+    # mmread handles both plain and compressed files
+    from scipy.io import mmread
+    matrix = mmread(file_path)
+    
+    print(f"Matrix size: {matrix.shape}")
+    
+    if hasattr(matrix, 'tocoo'):
+        coo_matrix = matrix.tocoo()
+        rows, cols = coo_matrix.row, coo_matrix.col
+    else:
+        # Dense array format
+        rows, cols = np.nonzero(matrix)
+    print(f"Non-zero elements: {len(rows)}")
+    
+    # Get number of vertices (assume square matrix)
+    n_vertices = max(matrix.shape[0], matrix.shape[1])
+    
+    return n_vertices, canonical_edge_array(rows, cols)
+
+def file_digest(file_path):
+    """SHA-256 of a file, read in CHUNK_BYTES blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(CHUNK_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def degree_stats(n_vertices, edge_array):
+    degree = np.bincount(edge_array.ravel(), minlength=n_vertices)
+    if n_vertices == 0:
+        return {'max_degree': 0, 'min_degree': 0, 'avg_degree': 0.0}
+    return {'max_degree': int(degree.max()), 'min_degree': int(degree.min()),
+            'avg_degree': float(degree.mean())}
+
+def write_atomically(path, write, binary=False):
+    """
+    Call write(f) on a private temporary file next to path, then rename it
+    over path: concurrent writers of the same cache never share a file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.',
+                                    prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb' if binary else 'w', encoding=None if binary else 'utf-8') as f:
+            write(f)
+        os.chmod(tmp_path, 0o644)  # mkstemp creates 0600
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def save_graph_cache(file_path, n_vertices, edge_array):
     """
-    Read .mtx or .mtx.gz file and convert to edge list.
+    Store the canonical edge array (.npy) and n, degree statistics and the
+    source key (size, mtime, sha256) (.json) next to the source file.
+    Files are written to a private temporary name and renamed, the metadata last,
+    so a present metadata file always describes a complete edge file.
+    
+    Returns:
+        dict: the metadata, or None if the cache could not be written
+    """
+    stat = os.stat(file_path)
+    meta = {'version': CACHE_VERSION, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+            'sha256': file_digest(file_path), 'n_vertices': int(n_vertices),
+            'n_edges': int(len(edge_array))}
+    meta.update(degree_stats(n_vertices, edge_array))
+    
+    edges_path = file_path + CACHE_EDGES_SUFFIX
+    meta_path = file_path + CACHE_META_SUFFIX
+    try:
+        write_atomically(edges_path, lambda f: np.save(f, np.ascontiguousarray(edge_array, dtype=np.int64)),
+                         binary=True)
+        write_atomically(meta_path, lambda f: json.dump(meta, f))
+    except OSError as e:
+        # Read-only dataset directory: keep working without a cache
+        print(f"Cannot write graph cache for {file_path}: {e}")
+        return None
+    return meta
+
+def read_graph_cache_meta(file_path):
+    """
+    Metadata of a valid cache entry, or None if missing or stale.
+    Size and mtime are checked first; when only the mtime changed the
+    content hash decides, and a matching hash refreshes the stored mtime.
+    """
+    meta_path = file_path + CACHE_META_SUFFIX
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        stat = os.stat(file_path)
+    except (OSError, ValueError):
+        return None
+    
+    if meta.get('version') != CACHE_VERSION or meta.get('size') != stat.st_size:
+        return None
+    if meta.get('mtime_ns') != stat.st_mtime_ns:
+        if meta.get('sha256') != file_digest(file_path):
+            return None
+        meta['mtime_ns'] = stat.st_mtime_ns
+        try:
+            write_atomically(meta_path, lambda f: json.dump(meta, f))
+        except OSError:
+            pass
+    return meta
+
+def load_graph_cache(file_path):
+    """
+    Zero-parse load from the binary cache: the edge array is memory-mapped.
+    
+    Returns:
+        tuple: (n_vertices, edge_array, meta), or None on a cache miss
+    """
+    meta = read_graph_cache_meta(file_path)
+    if meta is None:
+        return None
+    try:
+        edge_array = np.load(file_path + CACHE_EDGES_SUFFIX, mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+    if edge_array.shape != (meta['n_edges'], 2):
+        return None
+    return meta['n_vertices'], edge_array, meta
+
+def load_cached_edges(file_path):
+    """
+    (n_vertices, edge_array, meta) from the cache, parsing the source and
+    filling the cache on a miss. Small files are re-parsed every time, this
+    is faster than hashing them and loading a cache entry.
+    """
+    if is_small_file(file_path):
+        n_vertices, edge_array = load_mtx_edges(file_path)
+        meta = {'n_vertices': n_vertices, 'n_edges': len(edge_array)}
+        meta.update(degree_stats(n_vertices, edge_array))
+        return n_vertices, edge_array, meta
+    
+    cached = load_graph_cache(file_path)
+    if cached is not None:
+        return cached
+    n_vertices, edge_array = load_mtx_edges(file_path)
+    meta = save_graph_cache(file_path, n_vertices, edge_array)
+    if meta is None:
+        meta = {'n_vertices': n_vertices, 'n_edges': len(edge_array)}
+        meta.update(degree_stats(n_vertices, edge_array))
+    return n_vertices, edge_array, meta
+
+def load_graph_stats(file_path):
+    """n, edge count and degree statistics, from the cache metadata when valid."""
+    meta = read_graph_cache_meta(file_path)
+    if meta is None:
+        _, _, meta = load_cached_edges(file_path)
+    return meta
+
+def load_mtx_graph(file_path, use_cache=True):
+    """
+    Read .mtx or .mtx.gz file and convert to a CBPGraph.
+    With use_cache, the binary cache next to the file is used (and filled).
     
     Args:
         file_path (str): Path to .mtx or .mtx.gz file
@@ -13,44 +272,16 @@ def load_mtx_graph(file_path):
     Returns:
         tuple: (n_vertices, edges) with:
             - n_vertices: number of vertices in the graph
-            - edges: list of edges as [(u, v), ...]
+            - edges: CBPGraph, iterates like a list of edges [(u, v), ...]
     """
     try:
         print(f"Reading file: {file_path}")
         
-        # Check if file exists
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File does not exist: {file_path}")
-        
-        # Read matrix from file
-        if file_path.endswith('.gz'):
-            # Read compressed file
-            matrix = mmread(file_path)
-        else:
-            # Read regular file
-            matrix = mmread(file_path)
-        
-        print(f"Matrix size: {matrix.shape}")
-        print(f"Non-zero elements: {matrix.nnz}")
-        
-        # Convert to COO format for easier processing
-        if hasattr(matrix, 'tocoo'):
-            coo_matrix = matrix.tocoo()
+        if use_cache:
+            n_vertices, edge_array, _ = load_cached_edges(file_path)
         else:
-            coo_matrix = matrix
-        
-        # Get number of vertices (assume square matrix)
-        n_vertices = max(matrix.shape[0], matrix.shape[1])
-        
-        # Create edge list
-        edges = []
-        for i, j in zip(coo_matrix.row, coo_matrix.col):
-            # Convert from 1-indexed to 0-indexed if needed
-            u, v = int(i), int(j)
-            
-            # Avoid self-loops and duplicate edges
-            if u != v and (v, u) not in edges:
-                edges.append((u, v))
+            n_vertices, edge_array = load_mtx_edges(file_path)
+        edges = CBPGraph(n_vertices, edge_array)
         
         print(f"Number of vertices: {n_vertices}")
         print(f"Number of edges: {len(edges)}")
@@ -61,6 +292,148 @@ def load_mtx_graph(file_path):
         print(f"Error reading file {file_path}: {str(e)}")
         return None, None
 
+def open_graph_stream(file_path):
+    """
+    Open a graph file for streaming: gzip files are decompressed on the fly,
+    plain files are memory-mapped. Both support readline() and read(size).
+    
+    Returns:
+        tuple: (stream, file handle to close)
+    """
+    if file_path.endswith('.gz'):
+        import gzip
+        handle = gzip.open(file_path, 'rb')
+        return handle, handle
+    handle = open(file_path, 'rb')
+    if os.fstat(handle.fileno()).st_size == 0:
+        handle.close()
+        raise ValueError("Empty file")
+    return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ), handle
+
+def close_graph_stream(stream, handle):
+    if stream is not handle:
+        stream.close()
+    handle.close()
+
+def read_mtx_header(stream):
+    """
+    Parse the banner and size line of a Matrix Market file.
+    
+    Returns:
+        dict: {'format', 'field', 'symmetry', 'rows', 'cols', 'entries'}
+    """
+    header = {'format': 'coordinate', 'field': None, 'symmetry': 'general'}
+    line = stream.readline()
+    if line.lower().startswith(b'%%matrixmarket'):
+        banner = line.decode('ascii', 'replace').lower().split()
+        if len(banner) >= 5:
+            header['format'], header['field'], header['symmetry'] = banner[2], banner[3], banner[4]
+        line = stream.readline()
+    while line and (line.startswith(b'%') or not line.strip()):
+        line = stream.readline()
+    if not line:
+        raise ValueError("Missing size line")
+    
+    if header['format'] != 'coordinate':
+        raise ValueError(f"Unsupported MTX format: {header['format']} (expected coordinate)")
+    
+    size = line.split()
+    header['rows'], header['cols'], header['entries'] = int(size[0]), int(size[1]), int(size[2])
+    return header
+
+def iter_line_chunks(stream, chunk_bytes=CHUNK_BYTES):
+    """Yield blocks of whole lines, about chunk_bytes each."""
+    rest = b''
+    while True:
+        block = stream.read(chunk_bytes)
+        if not block:
+            break
+        block = rest + block
+        cut = block.rfind(b'\n') + 1
+        if cut == 0:
+            rest = block
+            continue
+        rest = block[cut:]
+        yield block[:cut]
+    if rest.strip():
+        yield rest
+
+def strip_comment_lines(chunk, comments):
+    """Drop lines starting with one of the comment prefixes (bytes)."""
+    if not any(prefix in chunk for prefix in comments):
+        return chunk
+    return b'\n'.join(line for line in chunk.split(b'\n')
+                      if not line.lstrip().startswith(comments))
+
+def parse_coordinate_chunk(chunk, n_tokens):
+    """
+    (rows, cols) of one block of coordinate lines "row col [values...]",
+    as written in the file (no index shift), converted in bulk.
+    n_tokens is the number of tokens on each line.
+    """
+    tokens = chunk.split()
+    if not tokens:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    if len(tokens) % n_tokens:
+        raise ValueError(f"Malformed coordinate lines (expected {n_tokens} tokens per line)")
+    rows = np.array(tokens[0::n_tokens]).astype(np.int64)
+    cols = np.array(tokens[1::n_tokens]).astype(np.int64)
+    return rows, cols
+
+def merge_edge_keys(coordinate_chunks):
+    """
+    Sorted unique edge keys of a stream of (rows, cols) chunks (0-indexed).
+    Only per-chunk deduplicated keys are kept, merged every MERGE_CHUNKS chunks.
+    """
+    key_chunks = []
+    for rows, cols in coordinate_chunks:
+        key_chunks.append(canonical_edge_keys(rows, cols))
+        if len(key_chunks) >= MERGE_CHUNKS:
+            # Merge so duplicates across chunks do not pile up
+            key_chunks = [np.unique(np.concatenate(key_chunks))]
+    return np.unique(np.concatenate(key_chunks)) if key_chunks else np.empty(0, dtype=np.int64)
+
+def stream_mtx_edges(file_path, chunk_bytes=CHUNK_BYTES):
+    """
+    Streaming Matrix Market reader (no scipy): coordinate lines are parsed
+    chunk by chunk and only the deduplicated edge keys are kept, so memory
+    stays bounded by chunk_bytes plus the edge array itself.
+    
+    The header qualifiers are honoured: the field (pattern/integer/real/
+    complex) gives the number of values to skip on each line; symmetric
+    files store one triangle and general files both orientations, which the
+    canonical (min, max) edge keys handle alike.
+    
+    Returns:
+        tuple: (n_vertices, edge_array, header)
+    """
+    stream, handle = open_graph_stream(file_path)
+    try:
+        header = read_mtx_header(stream)
+        n_vertices = max(header['rows'], header['cols'])
+        
+        n_values = MTX_FIELD_VALUES.get(header['field'])
+        if header['field'] is not None and n_values is None:
+            raise ValueError(f"Unsupported MTX field: {header['field']}")
+        
+        def coordinates():
+            nonlocal n_values
+            for chunk in iter_line_chunks(stream, chunk_bytes):
+                chunk = strip_comment_lines(chunk, (b'%',))
+                if not chunk.strip():
+                    continue
+                if n_values is None:
+                    # No banner: infer the field from the first data line
+                    n_values = len(chunk.lstrip().split(b'\n', 1)[0].split()) - 2
+                rows, cols = parse_coordinate_chunk(chunk, 2 + n_values)
+                yield rows - 1, cols - 1
+        
+        keys = merge_edge_keys(coordinates())
+        return n_vertices, edge_keys_to_array(keys), header
+    finally:
+        close_graph_stream(stream, handle)
+
 def load_mtx_graph_manual(file_path):
     """
     Read .mtx/.mtx.gz file manually (without scipy).
@@ -70,50 +443,16 @@ def load_mtx_graph_manual(file_path):
         file_path (str): Path to .mtx or .mtx.gz file
         
     Returns:
-        tuple: (n_vertices, edges)
+        tuple: (n_vertices, edges) with edges a CBPGraph
     """
     try:
         print(f"Reading file manually: {file_path}")
         
-        # Open file (compressed or not)
-        if file_path.endswith('.gz'):
-            file_handle = gzip.open(file_path, 'rt')
-        else:
-            file_handle = open(file_path, 'r')
-        
-        with file_handle as f:
-            lines = f.readlines()
+        n_vertices, edge_array, header = stream_mtx_edges(file_path)
+        print(f"Header: {header['rows']} x {header['cols']}, {header['entries']} entries "
+              f"({header['field'] or 'unknown'} {header['symmetry']})")
         
-        # Skip comment lines (starting with %)
-        data_lines = []
-        header_found = False
-        
-        for line in lines:
-            line = line.strip()
-            if line.startswith('%'):
-                continue
-            elif not header_found:
-                # First non-comment line is the header
-                header = line.split()
-                rows, cols, entries = int(header[0]), int(header[1]), int(header[2])
-                n_vertices = max(rows, cols)
-                header_found = True
-                print(f"Header: {rows} x {cols}, {entries} entries")
-            else:
-                data_lines.append(line)
-        
-        # Read edges
-        edges = []
-        for line in data_lines:
-            if line:
-                parts = line.split()
-                if len(parts) >= 2:
-                    # Convert from 1-indexed to 0-indexed
-                    u, v = int(parts[0]) - 1, int(parts[1]) - 1
-                    
-                    # Avoid self-loops and duplicate edges
-                    if u != v and (v, u) not in edges:
-                        edges.append((u, v))
+        edges = CBPGraph(n_vertices, edge_array)
         
         print(f"Number of vertices: {n_vertices}")
         print(f"Number of edges: {len(edges)}")
@@ -124,6 +463,271 @@ def load_mtx_graph_manual(file_path):
         print(f"Error reading file manually {file_path}: {str(e)}")
         return None, None
 
+def stream_edge_list(file_path, base=None, chunk_bytes=CHUNK_BYTES):
+    """
+    Plain edge list: one edge "u v [values...]" per line, separated by
+    spaces, tabs or commas; lines starting with '#', '%' or '//' are comments.
+    
+    Args:
+        base: index of the first vertex (0 or 1); None detects it, 0 if
+              vertex 0 appears in the file, else 1
+    
+    Returns:
+        tuple: (n_vertices, edge_array), n_vertices = largest vertex + 1
+    """
+    stream, handle = open_graph_stream(file_path)
+    try:
+        n_tokens = None
+        low, high = None, -1
+        
+        def coordinates():
+            nonlocal n_tokens, low, high
+            for chunk in iter_line_chunks(stream, chunk_bytes):
+                chunk = strip_comment_lines(chunk, EDGE_LIST_COMMENTS)
+                if b',' in chunk:
+                    chunk = chunk.replace(b',', b' ')
+                if not chunk.strip():
+                    continue
+                if n_tokens is None:
+                    n_tokens = len(chunk.lstrip().split(b'\n', 1)[0].split())
+                rows, cols = parse_coordinate_chunk(chunk, n_tokens)
+                if len(rows):
+                    chunk_low = int(min(rows.min(), cols.min()))
+                    low = chunk_low if low is None else min(low, chunk_low)
+                    high = max(high, int(rows.max()), int(cols.max()))
+                yield rows, cols
+        
+        keys = merge_edge_keys(coordinates())
+    finally:
+        close_graph_stream(stream, handle)
+    
+    if base is None:
+        base = 0 if low == 0 else 1
+    if low is not None and low < base:
+        raise ValueError(f"Vertex index {low} below base {base}")
+    return max(high + 1 - base, 0), edge_keys_to_array(keys) - base
+
+def read_metis_header(stream):
+    """
+    Header "n m [fmt [ncon]]" of a METIS graph (comment lines skipped).
+    fmt is up to three digits [vsize][vwgt][ewgt] telling which weights are
+    interleaved with the neighbour lists.
+    
+    Returns:
+        dict: {'n', 'm', 'vsize', 'vwgt', 'ewgt', 'ncon'}
+    """
+    line = stream.readline()
+    while line and line.lstrip().startswith(b'%'):
+        line = stream.readline()
+    fields = line.split()
+    if len(fields) < 2:
+        raise ValueError("Missing METIS header line")
+    fmt = fields[2].decode('ascii').zfill(3) if len(fields) > 2 else '000'
+    header = {'n': int(fields[0]), 'm': int(fields[1]),
+              'vsize': fmt[-3] == '1', 'vwgt': fmt[-2] == '1', 'ewgt': fmt[-1] == '1'}
+    header['ncon'] = int(fields[3]) if len(fields) > 3 else int(header['vwgt'])
+    return header
+
+def stream_metis_graph(file_path, chunk_bytes=CHUNK_BYTES):
+    """
+    METIS .graph reader: after the header, line i (1-based) lists the
+    neighbours of vertex i, an empty line being a vertex without neighbours.
+    Vertex sizes/weights at the start of a line and edge weights after each
+    neighbour are skipped in bulk with a per-token position mask.
+    
+    Returns:
+        tuple: (n_vertices, edge_array, header)
+    """
+    stream, handle = open_graph_stream(file_path)
+    try:
+        header = read_metis_header(stream)
+        n_vertices = header['n']
+        skip = int(header['vsize']) + header['ncon'] * int(header['vwgt'])
+        step = 2 if header['ewgt'] else 1
+        vertex = 0
+        
+        def coordinates():
+            nonlocal vertex
+            for chunk in iter_line_chunks(stream, chunk_bytes):
+                lines = chunk.split(b'\n')
+                if chunk.endswith(b'\n'):
+                    lines.pop()
+                lines = [line for line in lines if not line.lstrip().startswith(b'%')]
+                counts = np.array([len(line.split()) for line in lines], dtype=np.int64)
+                if vertex + len(lines) > n_vertices:
+                    # Trailing blank lines after the last vertex are harmless
+                    extra = counts[n_vertices - vertex:]
+                    if extra.any():
+                        raise ValueError(f"More than {n_vertices} vertex lines")
+                    counts = counts[:n_vertices - vertex]
+                    lines = lines[:n_vertices - vertex]
+                tokens = b' '.join(lines).split()
+                rows = np.repeat(np.arange(vertex, vertex + len(lines), dtype=np.int64), counts)
+                vertex += len(lines)
+                if not tokens:
+                    continue
+                position = np.arange(len(tokens)) - np.repeat(np.cumsum(counts) - counts, counts)
+                keep = (position >= skip) & ((position - skip) % step == 0)
+                cols = np.array(tokens)[keep].astype(np.int64) - 1
+                yield rows[keep], cols
+        
+        keys = merge_edge_keys(coordinates())
+        return n_vertices, edge_keys_to_array(keys), header
+    finally:
+        close_graph_stream(stream, handle)
+
+def parse_fortran_int_format(fmt):
+    """(values per line, width) of a Fortran integer format such as (16I5)."""
+    match = HB_INT_FORMAT.search(fmt)
+    if match is None:
+        raise ValueError(f"Unsupported Fortran integer format: {fmt.strip()}")
+    return int(match.group(1) or 1), int(match.group(2))
+
+def iter_fixed_width_ints(stream, n_lines, count, fmt, chunk_lines=HB_CHUNK_LINES):
+    """
+    Yield int64 arrays of the count integers stored on the next n_lines
+    fixed-width lines (fields may touch, so they are sliced, not split).
+    """
+    per_line, width = parse_fortran_int_format(fmt)
+    line_bytes = per_line * width
+    remaining = count
+    while n_lines > 0 and remaining > 0:
+        batch = min(chunk_lines, n_lines)
+        n_lines -= batch
+        lines = [stream.readline().rstrip(b'\r\n')[:line_bytes].ljust(line_bytes) for _ in range(batch)]
+        values = np.frombuffer(b''.join(lines), dtype=f'S{width}')[:remaining]
+        remaining -= len(values)
+        yield values.astype(np.int64)
+    if remaining > 0:
+        raise ValueError(f"Missing {remaining} integers in fixed-width section")
+
+def read_hb_header(stream):
+    """
+    Parse the 4-5 fixed-width header lines of a Harwell-Boeing file.
+    
+    Returns:
+        dict: {'title', 'key', 'ptrcrd', 'indcrd', 'mxtype', 'nrow', 'ncol', 'nnzero', 'ptrfmt', 'indfmt'}
+    """
+    title = stream.readline().decode('ascii', 'replace')
+    cards = stream.readline().decode('ascii', 'replace')
+    sizes = stream.readline().decode('ascii', 'replace')
+    formats = stream.readline().decode('ascii', 'replace')
+    
+    def field(line, start, end):
+        return int(line[start:end].strip() or 0)
+    
+    header = {'title': title[:72].strip(), 'key': title[72:80].strip(),
+              'ptrcrd': field(cards, 14, 28), 'indcrd': field(cards, 28, 42),
+              'mxtype': sizes[:3].upper(), 'nrow': field(sizes, 14, 28),
+              'ncol': field(sizes, 28, 42), 'nnzero': field(sizes, 42, 56),
+              'ptrfmt': formats[0:16], 'indfmt': formats[16:32]}
+    if field(cards, 56, 70) > 0:
+        stream.readline()  # Right-hand side descriptor, unused
+    if header['mxtype'][2:3] != 'A':
+        raise ValueError(f"Unsupported Harwell-Boeing matrix type: {header['mxtype']} (expected assembled)")
+    return header
+
+def stream_harwell_boeing(file_path):
+    """
+    Harwell-Boeing reader (.rua, .rsa, .psa, ...): the column pointers and
+    the row indices are read as fixed-width Fortran integers, the row indices
+    in chunks of HB_CHUNK_LINES lines; numerical values are never parsed.
+    
+    Returns:
+        tuple: (n_vertices, edge_array, header)
+    """
+    stream, handle = open_graph_stream(file_path)
+    try:
+        header = read_hb_header(stream)
+        n_vertices = max(header['nrow'], header['ncol'])
+        colptr = np.concatenate(list(iter_fixed_width_ints(
+            stream, header['ptrcrd'], header['ncol'] + 1, header['ptrfmt']))) - 1
+        
+        def coordinates():
+            start = 0
+            for rows in iter_fixed_width_ints(stream, header['indcrd'], header['nnzero'], header['indfmt']):
+                positions = np.arange(start, start + len(rows))
+                cols = np.searchsorted(colptr, positions, side='right') - 1
+                start += len(rows)
+                yield rows - 1, cols
+        
+        keys = merge_edge_keys(coordinates())
+        return n_vertices, edge_keys_to_array(keys), header
+    finally:
+        close_graph_stream(stream, handle)
+
+def iter_jsonl_graphs(file_path):
+    """
+    Batch of graphs in JSON lines (.jsonl, optionally .gz), read one line at
+    a time. Each object has "n" and "edges" ([[u, v], ...], 0-indexed, or
+    1-indexed with "base": 1) and an optional "name" (default: file:line).
+    
+    Yields:
+        tuple: (name, n_vertices, CBPGraph)
+    """
+    with open_text(file_path) as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            n_vertices = int(record['n'])
+            edge_array = np.asarray(record.get('edges', []), dtype=np.int64).reshape(-1, 2)
+            edge_array = edge_array - int(record.get('base', 0))
+            name = record.get('name', f"{os.path.basename(file_path)}:{line_no}")
+            yield name, n_vertices, CBPGraph(n_vertices, canonical_edge_array(edge_array[:, 0], edge_array[:, 1]))
+
+def detect_graph_format(file_path):
+    """Reader name for a file, from its extension (.gz ignored)."""
+    name = file_path[:-3] if file_path.endswith('.gz') else file_path
+    fmt = GRAPH_FORMATS.get(os.path.splitext(name)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Unknown graph format: {file_path}")
+    return fmt
+
+def load_graph(file_path, fmt=None, use_cache=True):
+    """
+    Read one graph in any supported format (see GRAPH_FORMATS).
+    
+    Returns:
+        tuple: (n_vertices, CBPGraph)
+    """
+    fmt = fmt or detect_graph_format(file_path)
+    if fmt == 'mtx':
+        if use_cache:
+            n_vertices, edge_array, _ = load_cached_edges(file_path)
+        else:
+            n_vertices, edge_array = load_mtx_edges(file_path)
+    elif fmt == 'edgelist':
+        n_vertices, edge_array = stream_edge_list(file_path)
+    elif fmt == 'metis':
+        n_vertices, edge_array, _ = stream_metis_graph(file_path)
+    elif fmt == 'hb':
+        n_vertices, edge_array, _ = stream_harwell_boeing(file_path)
+    elif fmt == 'jsonl':
+        raise ValueError(f"{file_path} holds a batch of graphs, use iter_graphs")
+    else:
+        raise ValueError(f"Unknown graph format: {fmt}")
+    return n_vertices, CBPGraph(n_vertices, edge_array)
+
+def iter_graphs(paths, use_cache=True):
+    """
+    Batch iterator over many graphs in one process: every file is read with
+    load_graph, JSON-lines files are expanded into their graphs. A file that
+    cannot be read is reported and skipped.
+    
+    Yields:
+        tuple: (name, n_vertices, CBPGraph)
+    """
+    for path in paths:
+        try:
+            if detect_graph_format(path) == 'jsonl':
+                yield from iter_jsonl_graphs(path)
+            else:
+                n_vertices, graph = load_graph(path, use_cache=use_cache)
+                yield path, n_vertices, graph
+        except Exception as e:
+            print(f"Error reading file {path}: {str(e)}")
+
 def print_graph_stats(n_vertices, edges):
     """
     Print basic graph statistics.
@@ -132,15 +736,11 @@ def print_graph_stats(n_vertices, edges):
         print("No graph data to analyze.")
         return
     
-    # Calculate vertex degrees
-    degree = [0] * n_vertices
-    for u, v in edges:
-        degree[u] += 1
-        degree[v] += 1
-    
-    max_degree = max(degree) if degree else 0
-    min_degree = min(degree) if degree else 0
-    avg_degree = sum(degree) / len(degree) if degree else 0
+    # Vertex degrees from the CSR graph
+    stats = degree_stats(n_vertices, as_graph(n_vertices, edges).edge_array)
+    max_degree = stats['max_degree']
+    min_degree = stats['min_degree']
+    avg_degree = stats['avg_degree']
     
     print("\n=== GRAPH STATISTICS ===")
     print(f"Number of vertices: {n_vertices}")
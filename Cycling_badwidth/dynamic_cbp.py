@@ -0,0 +1,171 @@
+"""
+CBP on a graph that changes by a few edges at a time.
+
+DynamicCBP keeps one IncrementalCBP solver, its loaded clauses and the last
+optimal labeling between updates instead of re-running solve_cbp:
+    - an inserted edge gets a fresh selector; if the current labeling already
+      fits it within w nothing is solved, otherwise w is re-checked with the
+      old labeling as phase hint
+    - a deleted edge is retracted by fixing its selector to false, its window
+      clauses stay in the solver but can never fire again
+After a batch the optimum is re-established with probes around the previous
+w: upwards while UNSAT (insertions), downwards while SAT (deletions), never
+below the lower bound of the current graph.
+"""
+from graph_classes import labeling_width
+from incremental_cbp import IncrementalCBP
+from lower_bounds import compute_lower_bound
+
+
+class DynamicCBP:
+    """Optimal cyclic bandwidth of a graph under edge insertions and deletions."""
+
+    def __init__(self, n, edges=()):
+        self.n = n
+        self.cbp = IncrementalCBP(n)
+        self.active = {}      # (u, v), u < v -> edge id in self.cbp
+        self.width = None
+        self.labeling = None
+        self.probes = 0       # SAT calls since construction
+        for u, v in edges:
+            self._insert(u, v)
+        self.width, self.labeling = self._solve_from(self._lower_bound())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.delete()
+
+    def delete(self):
+        self.cbp.delete()
+
+    @property
+    def edges(self):
+        return sorted(self.active)
+
+    def _lower_bound(self):
+        low_w, _ = compute_lower_bound(self.n, self.edges)
+        return max(low_w, 1)
+
+    def _insert(self, u, v):
+        key = (min(u, v), max(u, v))
+        if u == v or key in self.active:
+            return False
+        if not 0 <= u < self.n or not 0 <= v < self.n:
+            raise ValueError(f"Edge ({u}, {v}) out of range for n = {self.n}")
+        self.active[key] = self.cbp.add_edge(*key)
+        return True
+
+    def _retract(self, u, v):
+        edge_id = self.active.pop((min(u, v), max(u, v)), None)
+        if edge_id is None:
+            return False
+        self.cbp.solver.add_clause([-self.cbp.edge_sel[edge_id]])
+        return True
+
+    def _probe(self, w):
+        """SAT check of the active edges at width w, hinted by the last labeling."""
+        if self.labeling is not None:
+            self.cbp.set_phases(self.labeling)
+        self.probes += 1
+        return self.cbp.probe(w, self.active.values())
+
+    def _solve_from(self, low_w):
+        """Linear search upwards from low_w (no edge: any labeling, w = 0)."""
+        if not self.active:
+            return 0, list(range(1, self.n + 1))
+        for w in range(low_w, self.n // 2 + 1):
+            if self._probe(w):
+                return w, self.cbp.get_labeling()
+        return None, None
+
+    def _reestablish(self, deleted, inserted):
+        """
+        Optimum after a batch of updates, starting from the previous width.
+        The old labeling is an upper bound. Insertions never lower the
+        optimum and deletions never raise it, so only the needed direction
+        is probed: up from the old w while UNSAT, down while SAT.
+        """
+        if not self.active:
+            self.width, self.labeling = 0, list(range(1, self.n + 1))
+            return
+        high_w = labeling_width(self.n, self.edges, self.labeling)
+        w = max(min(self.width, high_w), 1)
+
+        if inserted and w < high_w:
+            if not self._probe(w):
+                # Climb while UNSAT, the old labeling's width is always feasible
+                self.width = high_w
+                for w in range(w + 1, high_w):
+                    if self._probe(w):
+                        self.width, self.labeling = w, self.cbp.get_labeling()
+                        break
+                return
+            high_w, self.labeling = w, self.cbp.get_labeling()
+
+        if deleted:
+            low_w = self._lower_bound()
+            while high_w > low_w and self._probe(high_w - 1):
+                high_w, self.labeling = high_w - 1, self.cbp.get_labeling()
+        self.width = high_w
+
+    def insert_edge(self, u, v):
+        """Add edge (u, v) and return the new optimum."""
+        return self.update(insertions=[(u, v)])
+
+    def delete_edge(self, u, v):
+        """Remove edge (u, v) and return the new optimum."""
+        return self.update(deletions=[(u, v)])
+
+    def update(self, insertions=(), deletions=()):
+        """Apply deletions, then insertions, and return the new optimum."""
+        deleted = sum(self._retract(u, v) for u, v in deletions)
+        inserted = sum(self._insert(u, v) for u, v in insertions)
+        if deleted or inserted:
+            self._reestablish(deleted, inserted)
+        return self.width
+
+
+if __name__ == '__main__':
+    import random
+    import sys
+    import time
+    from dataset_loader import load_graph, print_graph_stats
+
+    # Check command line arguments
+    if len(sys.argv) < 2:
+        print(" Please provide path to graph data file")
+        print("Usage: python dynamic_cbp.py <path_to_file.mtx> [n_updates]")
+        sys.exit(1)
+
+    file_path = sys.argv[1]
+    n_updates = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    print(f"Reading data from file: {file_path}")
+    n_vertices, graph_edges = load_graph(file_path)
+    if n_vertices is None:
+        print(" Cannot read data file. Exiting program.")
+        sys.exit(1)
+    print_graph_stats(n_vertices, graph_edges)
+
+    start_time = time.perf_counter()
+    dynamic = DynamicCBP(n_vertices, graph_edges)
+    print(f"   => Initial optimum w = {dynamic.width} ({time.perf_counter() - start_time:.3f}s, "
+          f"{dynamic.probes} probes)")
+
+    # Random edits: delete an existing edge or insert a missing one
+    rng = random.Random(0)
+    for step in range(n_updates):
+        probes = dynamic.probes
+        start_time = time.perf_counter()
+        if dynamic.active and rng.random() < 0.5:
+            u, v = rng.choice(dynamic.edges)
+            w = dynamic.delete_edge(u, v)
+            action = 'delete'
+        else:
+            u, v = rng.sample(range(n_vertices), 2)
+            w = dynamic.insert_edge(u, v)
+            action = 'insert'
+        print(f"   => {action} ({u}, {v}): w = {w} ({time.perf_counter() - start_time:.3f}s, "
+              f"{dynamic.probes - probes} probes)")
+    dynamic.delete()
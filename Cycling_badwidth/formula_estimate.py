@@ -0,0 +1,275 @@
+"""
+Formula size and memory estimate of a CBP encoding, computed before encoding.
+
+estimate_formula(model, n, n_edges, w, amo_encoding) predicts variables,
+clauses and literals exactly from the clause counts of each family, using
+a loop over the n labels of one edge, no clause is built. The counts are exact
+for ver_2_5, ver_2, ver_1_1 and ver_1 (see clause_profile.py for the
+measured ones). Only n, E and w matter: every edge gets the same window
+clauses, so the degree distribution does not change the size.
+
+Memory is a model, not a measurement:
+    - Python: every clause is a list (header + pointer in the clause list)
+      and every literal an int object plus its slot. validate_clauses
+      copies the clauses while the encoder's list is still alive, which
+      peaks at about ENCODE_PEAK_FACTOR copies
+    - SAT solver: per clause header and watches, per literal 4 bytes, per
+      variable the solver's assignment, activity and watch lists
+peak_mb is the encoding peak plus the solver, which is loaded while the
+clean copy is alive. Against the RSS of ver_2_5 (n = 150..500) the model
+is within 5% for seqcounter and 15% above for pairwise.
+
+choose_encoding picks the at-most-one encoding of the label constraints
+(ver_2_5, ver_2) with the smallest predicted peak, or raises
+FormulaTooLarge when even that one exceeds the memory budget.
+"""
+import math
+import os
+
+# Calibrated on CPython 3.11 / Glucose4, see the module docstring
+PY_CLAUSE_BYTES = 64 + 8     # list header with slack + slot in the clause list
+PY_LITERAL_BYTES = 28 + 8    # int object + slot in the clause
+ENCODE_PEAK_FACTOR = 1.75
+SOLVER_CLAUSE_BYTES = 48     # header and two watches
+SOLVER_LITERAL_BYTES = 4
+SOLVER_VARIABLE_BYTES = 96
+
+# At-most-one encodings of pysat.card.EncType with exact size formulas
+AMO_ENCODINGS = ('seqcounter', 'pairwise', 'ladder', 'bitwise', 'kmtotalizer')
+DEFAULT_AMO_ENCODING = 'seqcounter'  # CardEnc.atmost default
+
+# Encoders passing top_id = cnf.nv + 1 to CardEnc skip one id per call
+TOP_ID_GAP = 1
+
+# Models whose label at-most-one encoding can be chosen
+SELECTABLE_MODELS = ('ver_2_5', 'ver_2')
+
+
+class FormulaTooLarge(MemoryError):
+    """No encoding of the instance fits the memory budget."""
+
+
+def amo_size(m, encoding=DEFAULT_AMO_ENCODING):
+    """(clauses, literals, auxiliary variables) of CardEnc.atmost(m literals, bound=1)."""
+    if m <= 1:
+        return 0, 0, 0
+    if m == 2:
+        return 1, 2, 0
+    if encoding == 'pairwise':
+        clauses = m * (m - 1) // 2
+        return clauses, 2 * clauses, 0
+    if encoding == 'seqcounter':
+        return 3 * m - 4, 6 * m - 8, m - 1
+    if encoding == 'ladder':
+        return 4 * m, 9 * m - 1, m + 1
+    if encoding == 'bitwise':
+        bits = math.ceil(math.log2(m))
+        return m * bits, 2 * m * bits, bits
+    if encoding == 'kmtotalizer':
+        return 4 * m - 4, 10 * m - 10, 2 * m - 2
+    raise ValueError(f"No size formula for encoding '{encoding}', expected one of {', '.join(AMO_ENCODINGS)}")
+
+
+def exactly_one_size(m):
+    """(clauses, literals, auxiliary variables) of CardEnc.equals(m literals, bound=1), seqcounter."""
+    if m == 1:
+        return 1, 1, 0
+    clauses, literals, aux = amo_size(m)
+    return clauses + 1, literals + m, aux
+
+
+def labeling_size(n, amo_encoding):
+    """Ladder, channelling and per-label AMO of ver_2 / ver_2_5 (same counts in both)."""
+    amo_clauses, amo_literals, amo_aux = amo_size(n, amo_encoding)
+    clauses = n * n + n * (2 + 3 * (n - 1)) + n * amo_clauses
+    literals = n + 2 * n * (n - 1) + n * (4 + 7 * (n - 1)) + n * amo_literals
+    return clauses, literals, 2 * n * n + n * (amo_aux + TOP_ID_GAP)
+
+
+def edge_size_ver_2_5(n, w):
+    """(clauses, literals) of generate_edge_clauses for one edge."""
+    clauses = literals = 0
+    for k in range(1, n + 1):
+        if 1 + w < k < n - w:                # case 1: two binary clauses at most
+            size = (k - w - 1 >= 1) + (k + w <= n)
+            clauses += size
+            literals += 2 * size
+        elif k <= w + 1:                     # case 2
+            if k + w < n:
+                clauses += 1
+                literals += 2 + (n - w + k - 1 >= 1)
+        else:                                # case 3
+            size = (k - w - 1 >= 1) + (k + w - n >= 1)
+            if size:
+                clauses += 1
+                literals += 1 + size
+    return clauses, literals
+
+
+def edge_size_ver_2(n, w):
+    """(clauses, literals) of the window clauses of one edge in ver_2."""
+    clauses = literals = 0
+    for k in range(1, n + 1):
+        if w < k < n - w:                    # case 1
+            clauses += 2
+            literals += 4
+            continue
+        if k <= w:                           # case 2
+            size = (n - w + k >= 1) + (w + k + 1 <= n)
+        else:                                # case 3
+            size = (k - w - 1 >= 1) + (w + k - n + 1 >= 1)
+        if size:
+            clauses += 1
+            literals += 1 + size
+    return clauses, literals
+
+
+def edge_size_ver_1_1(n, w):
+    """(clauses, literals, variable ids) of the window constraints of one edge in ver_1_1."""
+    clauses = literals = aux = 0
+    for k in range(1, n + 1):
+        if w < k < n - w:
+            middle = max(0, k - w - 1) + max(0, n - k - w)
+            clauses += middle
+            literals += 2 * middle
+            continue
+        if k <= w:
+            first, second = range(1, min(k + w + 1, n + 1)), range(max(n - w + k, 1), n + 1)
+        else:
+            first, second = range(1, min(w + k - n + 1, n + 1)), range(max(k - w, 1), n + 1)
+        m = len(set(first) | set(second))
+        if m > 1:
+            eo_clauses, eo_literals, eo_aux = exactly_one_size(m)
+            clauses += eo_clauses
+            literals += eo_literals + eo_clauses
+            aux += eo_aux + TOP_ID_GAP
+        elif m == 1:
+            clauses += 1
+            literals += 2
+    return clauses, literals, aux
+
+
+def edge_size_ver_1(n, w):
+    """(clauses, literals, auxiliary variables) of the window constraints of one edge in ver_1."""
+    clauses = literals = aux = 0
+    window = min(2 * w, n - 1)               # labels l != k within cyclic distance w
+    for k in range(1, n + 1):
+        if w < k < n - w:
+            middle = max(0, k - w - 1) + max(0, n - k - w)
+            clauses += middle
+            literals += 2 * middle
+        elif window == 0:
+            clauses += 1
+            literals += 1
+        else:
+            eo_clauses, eo_literals, eo_aux = exactly_one_size(window)
+            clauses += eo_clauses
+            literals += eo_literals + eo_clauses
+            aux += eo_aux
+    return clauses, literals, aux
+
+
+def estimate_formula(model, n, n_edges, w, amo_encoding=DEFAULT_AMO_ENCODING):
+    """
+    Predicted size of one probe's formula.
+
+    Returns:
+        dict: {'model', 'amo_encoding', 'w', 'variables', 'clauses', 'literals',
+        'python_mb', 'solver_mb', 'peak_mb'}
+    """
+    if model in SELECTABLE_MODELS:
+        clauses, literals, variables = labeling_size(n, amo_encoding)
+        edge_clauses, edge_literals = (edge_size_ver_2_5 if model == 'ver_2_5' else edge_size_ver_2)(n, w)
+        edge_aux = 0
+    elif model in ('ver_1_1', 'ver_1'):
+        amo_encoding = 'seqcounter'          # fixed CardEnc.equals default
+        eo_clauses, eo_literals, eo_aux = exactly_one_size(n)
+        # ver_1 takes its ids from a VPool, ver_1_1 from top_id like ver_2 / ver_2_5
+        gap = TOP_ID_GAP if model == 'ver_1_1' else 0
+        clauses, literals, variables = 2 * n * eo_clauses, 2 * n * eo_literals, n * n + 2 * n * (eo_aux + gap)
+        edge_clauses, edge_literals, edge_aux = (edge_size_ver_1_1 if model == 'ver_1_1' else edge_size_ver_1)(n, w)
+    else:
+        raise ValueError(f"Unknown model '{model}'")
+    clauses += n_edges * edge_clauses
+    literals += n_edges * edge_literals
+    variables += n_edges * edge_aux
+
+    python_bytes = clauses * PY_CLAUSE_BYTES + literals * PY_LITERAL_BYTES
+    solver_bytes = (clauses * SOLVER_CLAUSE_BYTES + literals * SOLVER_LITERAL_BYTES
+                    + variables * SOLVER_VARIABLE_BYTES)
+    return {'model': model, 'amo_encoding': amo_encoding, 'w': w, 'variables': variables,
+            'clauses': clauses, 'literals': literals,
+            'python_mb': python_bytes / 2**20, 'solver_mb': solver_bytes / 2**20,
+            'peak_mb': (ENCODE_PEAK_FACTOR * python_bytes + solver_bytes) / 2**20}
+
+
+def estimate_search(model, n, n_edges, low_w, high_w, amo_encoding=DEFAULT_AMO_ENCODING):
+    """
+    Largest probe of a search over [low_w, high_w]. The ver_2 / ver_2_5
+    formulas shrink as w grows, so only the ends are estimated; the window
+    exactly-one constraints of ver_1 / ver_1_1 are not monotone in w.
+    """
+    probes = {low_w, high_w} if model in SELECTABLE_MODELS else range(low_w, high_w + 1)
+    estimates = [estimate_formula(model, n, n_edges, w, amo_encoding) for w in probes]
+    return max(estimates, key=lambda estimate: estimate['peak_mb'])
+
+
+def choose_encoding(model, n, n_edges, low_w, high_w, memory_budget_mb=None, encodings=None):
+    """
+    Encoding (among encodings, default AMO_ENCODINGS) with the smallest
+    predicted peak over the search, checked against the budget (None: no check).
+
+    Returns:
+        dict: estimate_search() of the chosen encoding
+    Raises:
+        FormulaTooLarge: even the smallest encoding exceeds memory_budget_mb
+    """
+    if model not in SELECTABLE_MODELS:
+        encodings = (DEFAULT_AMO_ENCODING,)
+    elif encodings is None:
+        encodings = AMO_ENCODINGS
+    best = min((estimate_search(model, n, n_edges, low_w, high_w, encoding) for encoding in encodings),
+               key=lambda estimate: estimate['peak_mb'])
+    if memory_budget_mb is not None and best['peak_mb'] > memory_budget_mb:
+        raise FormulaTooLarge(
+            f"{model} needs about {best['peak_mb']:.1f} MB at w = {best['w']} "
+            f"({best['clauses']} clauses, {best['variables']} variables, {best['amo_encoding']}), "
+            f"memory budget is {memory_budget_mb:.1f} MB")
+    return best
+
+
+def default_memory_budget_mb():
+    """Available physical memory, capped by this process' RLIMIT_AS; None if unknown."""
+    budget = None
+    try:
+        budget = os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (AttributeError, ValueError, OSError):
+        pass
+    try:
+        import resource
+        soft, _ = resource.getrlimit(resource.RLIMIT_AS)
+        if soft != resource.RLIM_INFINITY:
+            budget = min(budget, soft / 2**20) if budget is not None else soft / 2**20
+    except (ImportError, AttributeError, ValueError, OSError):
+        pass
+    return budget
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Predict the CNF size and memory of a CBP encoding.")
+    parser.add_argument('n', type=int, help='number of vertices')
+    parser.add_argument('edges', type=int, help='number of edges')
+    parser.add_argument('w', type=int, nargs='+', help='bandwidths to estimate')
+    parser.add_argument('--model', choices=('ver_2_5', 'ver_2', 'ver_1_1', 'ver_1'), default='ver_2_5')
+    args = parser.parse_args()
+
+    encodings = AMO_ENCODINGS if args.model in SELECTABLE_MODELS else (DEFAULT_AMO_ENCODING,)
+    print(f"   {'w':>5s} {'encoding':12s} {'variables':>12s} {'clauses':>12s} {'literals':>13s} "
+          f"{'peak MB':>10s}")
+    for w in args.w:
+        for encoding in encodings:
+            estimate = estimate_formula(args.model, args.n, args.edges, w, encoding)
+            print(f"   {w:5d} {encoding:12s} {estimate['variables']:12d} {estimate['clauses']:12d} "
+                  f"{estimate['literals']:13d} {estimate['peak_mb']:10.1f}")
@@ -0,0 +1,186 @@
+"""
+Closed-form cyclic bandwidth for trivial graph classes.
+
+classify_graph runs in linear time on the loaded graph and, when the
+graph belongs to a class whose cyclic bandwidth is known analytically,
+returns the exact value together with a witness labeling, so solve_cbp can
+skip encoding altogether:
+    - no edges: 0
+    - disjoint union of paths (isolated vertices included): 1
+    - Hamiltonian cycle on all n vertices: 1
+    - any other disjoint union of paths and cycles: 2
+    - complete graph K_n: floor(n/2)
+    - complete bipartite K_a,b on all n vertices: floor(n/2), or n/2 - 1
+      when a and b are both even
+    - ceil(max_degree/2) = floor(n/2), e.g. stars: floor(n/2)
+"""
+import math
+
+import numpy as np
+
+from cbp_graph import as_graph
+
+
+def labeling_width(n, edges, labeling):
+    """Cyclic bandwidth of a labeling (vertex -> label in 1..n), vectorized over the edges."""
+    graph = as_graph(n, edges)
+    if graph.n_edges == 0:
+        return 0
+    labels = np.asarray(labeling, dtype=np.int64)
+    dist = np.abs(labels[graph.edge_array[:, 0]] - labels[graph.edge_array[:, 1]])
+    return int(np.minimum(dist, n - dist).max())
+
+
+def build_adjacency(n, edges):
+    adj = [set() for _ in range(n)]
+    for u, v in edges:
+        if u != v:
+            adj[u].add(v)
+            adj[v].add(u)
+    return adj
+
+
+def connected_components(adj):
+    """Components as lists of vertices, each in BFS order from its first vertex."""
+    seen = [False] * len(adj)
+    components = []
+    for start in range(len(adj)):
+        if seen[start]:
+            continue
+        seen[start] = True
+        component = [start]
+        for u in component:
+            for v in adj[u]:
+                if not seen[v]:
+                    seen[v] = True
+                    component.append(v)
+        components.append(component)
+    return components
+
+
+def walk(adj, start):
+    """Vertices of a path or cycle component in order, starting from start."""
+    order = [start]
+    prev, cur = None, start
+    while True:
+        nxt = [v for v in adj[cur] if v != prev and v != start]
+        if not nxt:
+            return order
+        prev, cur = cur, nxt[0]
+        order.append(cur)
+
+
+def labeling_from_order(n, order):
+    labeling = [0] * n
+    for position, v in enumerate(order):
+        labeling[v] = position + 1
+    return labeling
+
+
+def classify_paths_and_cycles(n, adj):
+    """Max degree <= 2: every component is a path or a cycle."""
+    order = []
+    has_cycle = False
+    for component in connected_components(adj):
+        ends = [v for v in component if len(adj[v]) < 2]
+        if ends or len(component) < 3:
+            # Path (or isolated vertex): walk from one end
+            order.extend(walk(adj, ends[0] if ends else component[0]))
+            continue
+
+        has_cycle = True
+        if len(component) == n:
+            # Hamiltonian cycle: consecutive labels, closing edge wraps around
+            return {'class': 'cycle', 'bandwidth': 1,
+                    'labeling': labeling_from_order(n, walk(adj, component[0]))}
+        # Zig-zag c0, c1, c_m-1, c2, c_m-2, ... has linear bandwidth 2
+        cycle = walk(adj, component[0])
+        lo, hi = 1, len(cycle) - 1
+        order.append(cycle[0])
+        while lo <= hi:
+            order.append(cycle[lo])
+            if lo != hi:
+                order.append(cycle[hi])
+            lo, hi = lo + 1, hi - 1
+
+    if has_cycle:
+        # A cycle that does not use all labels cannot have every edge at distance 1
+        return {'class': 'paths_and_cycles', 'bandwidth': 2,
+                'labeling': labeling_from_order(n, order)}
+    return {'class': 'paths', 'bandwidth': 1, 'labeling': labeling_from_order(n, order)}
+
+
+def bipartition(adj):
+    """2-colouring of a connected graph, or None if it is not bipartite."""
+    colour = [-1] * len(adj)
+    colour[0] = 0
+    queue = [0]
+    for u in queue:
+        for v in adj[u]:
+            if colour[v] < 0:
+                colour[v] = 1 - colour[u]
+                queue.append(v)
+            elif colour[v] == colour[u]:
+                return None
+    if min(colour) < 0:
+        return None  # Disconnected
+    return colour
+
+
+def classify_complete_bipartite(n, adj, n_edges):
+    colour = bipartition(adj)
+    if colour is None:
+        return None
+    side_a = [v for v in range(n) if colour[v] == 0]
+    side_b = [v for v in range(n) if colour[v] == 1]
+    if n_edges != len(side_a) * len(side_b):
+        return None
+
+    half = n // 2
+    if n % 2 == 0 and len(side_a) % 2 == 0:
+        # Antipodal labels (distance n/2) go to the same side, so no edge
+        # reaches n/2; with an odd side or odd n this is impossible.
+        pairs = len(side_a) // 2
+        positions_a = list(range(1, pairs + 1)) + list(range(half + 1, half + pairs + 1))
+        positions_b = [p for p in range(1, n + 1) if p not in set(positions_a)]
+        labeling = [0] * n
+        for v, p in zip(side_a, positions_a):
+            labeling[v] = p
+        for v, p in zip(side_b, positions_b):
+            labeling[v] = p
+        return {'class': 'complete_bipartite', 'bandwidth': half - 1, 'labeling': labeling}
+    return {'class': 'complete_bipartite', 'bandwidth': half,
+            'labeling': list(range(1, n + 1))}
+
+
+def classify_graph(n, edges):
+    """
+    Detect a graph class with a closed-form cyclic bandwidth.
+
+    Returns:
+        dict: {'class', 'bandwidth', 'labeling'} (labeling: vertex -> label),
+        or None if the graph needs the SAT search
+    """
+    graph = as_graph(n, edges)
+    n_edges = graph.n_edges
+    max_degree = graph.max_degree
+    identity = list(range(1, n + 1))
+
+    if n_edges == 0:
+        result = {'class': 'empty', 'bandwidth': 0, 'labeling': identity}
+    elif max_degree <= 2:
+        result = classify_paths_and_cycles(n, graph.adjacency_sets())
+    elif n_edges == n * (n - 1) // 2:
+        result = {'class': 'complete', 'bandwidth': n // 2, 'labeling': identity}
+    elif math.ceil(max_degree / 2) >= n // 2:
+        # Degree bound meets the trivial upper bound: any labeling is optimal
+        result = {'class': 'star_like', 'bandwidth': n // 2, 'labeling': identity}
+    else:
+        result = classify_complete_bipartite(n, graph.adjacency_sets(), n_edges)
+
+    if result is not None:
+        width = labeling_width(n, graph, result['labeling'])
+        if width != result['bandwidth']:
+            raise RuntimeError(f"{result['class']} labeling has width {width}, "
+                               f"closed form says {result['bandwidth']}")
+    return result
@@ -0,0 +1,311 @@
+"""
+Seeded synthetic graph families for scaling and stress benchmarks.
+
+Every generator builds the graph with NumPy (tens of thousands of vertices
+in well under a second) together with a witness labeling, then the vertices
+are shuffled with the same seed so no solver gets the good order for free.
+The witness width is an upper bound and compute_lower_bound a lower bound;
+the optimum is recorded when it is known:
+    - cycle, path:  1
+    - planted:      w, a banded graph (cyclic label distance <= w) whose hub
+                    vertex has all 2w neighbours, so ceil(deg/2) = w
+    - any family:   when the lower bound meets the witness width
+Families: cycle, path, grid, torus, hypercube, rgg (random geometric),
+er (Erdos-Renyi), planted, caterpillar.
+
+Graphs are written as symmetric pattern Matrix Market files, readable by
+dataset_loader and therefore by cbp.py and auto_test.py. The optimum and
+the bounds go in '%' comment lines (read back by known_optimum) and in a
+manifest.json next to the files.
+
+    python graph_generators.py planted 1000 10000 --width 5 --output-dir synthetic
+    python graph_generators.py --suite --output-dir synthetic
+"""
+import json
+import math
+import os
+
+import numpy as np
+
+from cbp_graph import CBPGraph, canonical_edge_array
+from graph_classes import labeling_width
+from lower_bounds import compute_lower_bound
+
+OPTIMUM_COMMENT = '% cbp-optimum:'
+BOUNDS_COMMENT = '% cbp-bounds:'
+MANIFEST_NAME = 'manifest.json'
+
+# family -> sizes of the default scaling suite (--suite)
+SUITE_SIZES = {
+    'cycle': (1000, 10000, 50000),
+    'path': (1000, 10000, 50000),
+    'planted': (1000, 10000, 50000),
+    'grid': (1024, 10000, 40000),
+    'torus': (1024, 10000, 40000),
+    'hypercube': (1024, 8192, 32768),
+    'rgg': (1000, 10000, 30000),
+    'er': (1000, 10000, 30000),
+    'caterpillar': (1000, 10000, 50000),
+}
+
+
+def order_edges(n, rows, cols, order):
+    """(n, canonical edge array, witness order) with order[position] = vertex."""
+    return n, canonical_edge_array(rows, cols), np.asarray(order, dtype=np.int64)
+
+
+def cycle_graph(n):
+    vertices = np.arange(n)
+    return order_edges(n, vertices, (vertices + 1) % n, vertices)
+
+
+def path_graph(n):
+    vertices = np.arange(n - 1)
+    return order_edges(n, vertices, vertices + 1, np.arange(n))
+
+
+def grid_graph(rows, cols, wrap=False):
+    """rows x cols grid (torus with wrap), row-major with the shorter side as row length."""
+    rows, cols = max(rows, cols), min(rows, cols)
+    ids = np.arange(rows * cols).reshape(rows, cols)
+    right = ids if wrap else ids[:, :-1]
+    down = ids if wrap else ids[:-1, :]
+    rows_out = np.concatenate((right.ravel(), down.ravel()))
+    cols_out = np.concatenate((((right % cols + 1) % cols + right // cols * cols).ravel(),
+                               ((down + cols) % (rows * cols)).ravel()))
+    return order_edges(rows * cols, rows_out, cols_out, np.arange(rows * cols))
+
+
+def hypercube_graph(dim):
+    n = 1 << dim
+    vertices = np.arange(n)
+    rows = np.concatenate([vertices] * dim)
+    cols = np.concatenate([vertices ^ (1 << bit) for bit in range(dim)])
+    # Reflected Gray code order: consecutive labels differ in one bit
+    return order_edges(n, rows, cols, vertices ^ (vertices >> 1))
+
+
+def rgg_graph(n, avg_degree, rng):
+    """Random geometric graph in the unit square, radius set for the expected degree."""
+    from scipy.spatial import cKDTree
+
+    points = rng.random((n, 2))
+    radius = math.sqrt(avg_degree / (math.pi * n))
+    pairs = cKDTree(points).query_pairs(radius, output_type='ndarray').reshape(-1, 2)
+    return order_edges(n, pairs[:, 0], pairs[:, 1], np.argsort(points[:, 0], kind='stable'))
+
+
+def erdos_renyi_graph(n, avg_degree, rng):
+    """G(n, m) with m = n * avg_degree / 2 distinct edges."""
+    m = min(int(n * avg_degree / 2), n * (n - 1) // 2)
+    edge_array = np.empty((0, 2), dtype=np.int64)
+    while len(edge_array) < m:
+        missing = m - len(edge_array)
+        rows = rng.integers(0, n, size=2 * missing + 16)
+        cols = rng.integers(0, n, size=2 * missing + 16)
+        edge_array = canonical_edge_array(np.concatenate((edge_array[:, 0], rows)),
+                                          np.concatenate((edge_array[:, 1], cols)))
+    keep = np.sort(rng.choice(len(edge_array), size=m, replace=False))
+    return n, edge_array[keep], np.arange(n)
+
+
+def planted_graph(n, width, density, rng):
+    """
+    Banded graph on a cycle of labels: every edge joins labels at cyclic
+    distance <= width, each kept with probability density. The labels at
+    distance 1 (a Hamiltonian cycle) and all 2 * width neighbours of vertex
+    0 are always kept, which pins the optimum to exactly width.
+    """
+    if n < 2 * width + 1:
+        raise ValueError(f"planted graph needs n >= 2 * width + 1, got n = {n}, width = {width}")
+    vertices = np.arange(n)
+    rows, cols = [vertices], [(vertices + 1) % n]
+    for distance in range(2, width + 1):
+        kept = vertices[rng.random(n) < density]
+        rows.append(np.concatenate((kept, [0, 0])))
+        cols.append(np.concatenate(((kept + distance) % n, [distance, n - distance])))
+    return order_edges(n, np.concatenate(rows), np.concatenate(cols), vertices)
+
+
+def caterpillar_graph(spine, max_hairs, rng):
+    """A path of spine vertices, each with 0..max_hairs pendant leaves."""
+    hairs = rng.integers(0, max_hairs + 1, size=spine)
+    n = spine + int(hairs.sum())
+    leaf_owner = np.repeat(np.arange(spine), hairs)
+    leaves = np.arange(spine, n)
+    rows = np.concatenate((np.arange(spine - 1), leaf_owner))
+    cols = np.concatenate((np.arange(1, spine), leaves))
+
+    # Witness: each spine vertex between the two halves of its leaves
+    order = []
+    start = spine
+    for v, count in enumerate(hairs.tolist()):
+        half = count // 2
+        order.extend(range(start, start + half))
+        order.append(v)
+        order.extend(range(start + half, start + count))
+        start += count
+    return order_edges(n, rows, cols, order)
+
+
+def build_family(family, size, rng, width=3, density=0.5, degree=8, hairs=4):
+    """Dispatch to a generator with about size vertices. Returns (graph tuple, params)."""
+    if family == 'cycle':
+        return cycle_graph(size), {}
+    if family == 'path':
+        return path_graph(size), {}
+    if family in ('grid', 'torus'):
+        side = max(int(round(math.sqrt(size))), 3)
+        rows = max(size // side, 3)
+        return grid_graph(rows, side, wrap=family == 'torus'), {'rows': rows, 'cols': side}
+    if family == 'hypercube':
+        dim = max(int(round(math.log2(size))), 1)
+        return hypercube_graph(dim), {'dim': dim}
+    if family == 'rgg':
+        return rgg_graph(size, degree, rng), {'degree': degree}
+    if family == 'er':
+        return erdos_renyi_graph(size, degree, rng), {'degree': degree}
+    if family == 'planted':
+        return planted_graph(size, width, density, rng), {'width': width, 'density': density}
+    if family == 'caterpillar':
+        spine = max(size * 2 // (hairs + 2), 1)
+        return caterpillar_graph(spine, hairs, rng), {'spine': spine, 'hairs': hairs}
+    raise ValueError(f"Unknown graph family '{family}', expected one of {', '.join(SUITE_SIZES)}")
+
+
+def generate_graph(family, size, seed=0, shuffle=True, **options):
+    """
+    Generate one synthetic graph.
+
+    Returns:
+        dict: {'family', 'params', 'seed', 'n', 'graph' (CBPGraph), 'labeling'
+        (witness, vertex -> label), 'lower_bound', 'upper_bound', 'optimum'
+        (None if unknown), 'optimum_source'}
+    """
+    rng = np.random.default_rng(seed)
+    (n, edge_array, order), params = build_family(family, size, rng, **options)
+
+    if shuffle:
+        # Vertex v becomes perm[v]; the witness moves with it
+        perm = rng.permutation(n)
+        edge_array = canonical_edge_array(perm[edge_array[:, 0]], perm[edge_array[:, 1]])
+        order = perm[order]
+    graph = CBPGraph(n, edge_array)
+    labeling = np.empty(n, dtype=np.int64)
+    labeling[order] = np.arange(1, n + 1)
+    labeling = labeling.tolist()
+
+    upper_bound = labeling_width(n, graph, labeling)
+    optimum, source = None, None
+    if family in ('cycle', 'path') and n >= 3:
+        optimum, source = 1, 'closed form'
+    elif family == 'planted':
+        optimum, source = params['width'], 'planted'
+    if optimum is not None:
+        # The exact diameter bound is slow on long paths and adds nothing here
+        lower_bound = optimum
+    else:
+        lower_bound, _ = compute_lower_bound(n, graph)
+        if lower_bound == upper_bound:
+            optimum, source = upper_bound, 'bounds'
+    if lower_bound > upper_bound or optimum not in (None, upper_bound):
+        raise RuntimeError(f"{family} graph: lower bound {lower_bound}, upper bound {upper_bound} "
+                           f"and optimum {optimum} are inconsistent")
+
+    return {'family': family, 'params': params, 'seed': seed, 'n': n, 'graph': graph,
+            'labeling': labeling, 'lower_bound': lower_bound, 'upper_bound': upper_bound,
+            'optimum': optimum, 'optimum_source': source}
+
+
+def graph_file_name(record):
+    params = ''.join(f"_{key[0]}{value}" for key, value in record['params'].items()
+                     if key in ('width', 'degree', 'hairs'))
+    return f"{record['family']}{params}_n{record['n']}_s{record['seed']}.mtx"
+
+
+def write_mtx(file_path, record):
+    """Write a generated graph as a symmetric pattern .mtx (lower triangle, 1-based)."""
+    graph = record['graph']
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write("%%MatrixMarket matrix coordinate pattern symmetric\n")
+        f.write(f"% graph_generators.py family={record['family']} seed={record['seed']} "
+                f"params={json.dumps(record['params'])}\n")
+        if record['optimum'] is not None:
+            f.write(f"{OPTIMUM_COMMENT} {record['optimum']} ({record['optimum_source']})\n")
+        f.write(f"{BOUNDS_COMMENT} {record['lower_bound']} {record['upper_bound']}\n")
+        f.write(f"{graph.n} {graph.n} {graph.n_edges}\n")
+        np.savetxt(f, graph.edge_array[:, ::-1] + 1, fmt='%d')
+
+
+def known_optimum(file_path):
+    """Optimum recorded in the comment lines of a generated .mtx, None otherwise."""
+    from dataset_loader import open_text
+
+    try:
+        with open_text(file_path) as f:
+            for line in f:
+                if not line.startswith('%'):
+                    return None
+                if line.startswith(OPTIMUM_COMMENT):
+                    return int(line[len(OPTIMUM_COMMENT):].split()[0])
+    except (OSError, UnicodeDecodeError, ValueError):
+        return None
+    return None
+
+
+def update_manifest(output_dir, entries):
+    """Merge entries (by file name) into output_dir/manifest.json."""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    manifest = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = {entry['file']: entry for entry in json.load(f)}
+    for entry in entries:
+        manifest[entry['file']] = entry
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(sorted(manifest.values(), key=lambda entry: entry['file']), f, indent=1)
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Generate synthetic CBP benchmark graphs (.mtx).")
+    parser.add_argument('family', nargs='?', choices=sorted(SUITE_SIZES))
+    parser.add_argument('sizes', nargs='*', type=int, help='approximate numbers of vertices')
+    parser.add_argument('--suite', action='store_true', help='every family at its default sizes')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--width', type=int, default=3, help='planted cyclic bandwidth')
+    parser.add_argument('--density', type=float, default=0.5, help='planted: share of band edges kept')
+    parser.add_argument('--degree', type=int, default=8, help='rgg / er: expected average degree')
+    parser.add_argument('--hairs', type=int, default=4, help='caterpillar: max leaves per spine vertex')
+    parser.add_argument('--no-shuffle', action='store_true', help='keep the witness order as vertex ids')
+    parser.add_argument('--output-dir', default='synthetic')
+    args = parser.parse_args()
+
+    if args.suite:
+        plan = [(family, size) for family, sizes in SUITE_SIZES.items() for size in sizes]
+    elif args.family and args.sizes:
+        plan = [(args.family, size) for size in args.sizes]
+    else:
+        parser.error("give a family and sizes, or --suite")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    entries = []
+    for family, size in plan:
+        start_time = time.perf_counter()
+        record = generate_graph(family, size, args.seed, shuffle=not args.no_shuffle, width=args.width,
+                                density=args.density, degree=args.degree, hairs=args.hairs)
+        file_name = graph_file_name(record)
+        write_mtx(os.path.join(args.output_dir, file_name), record)
+        entries.append({'file': file_name, 'family': family, 'params': record['params'],
+                        'seed': args.seed, 'vertices': record['n'], 'edges': record['graph'].n_edges,
+                        'max_degree': record['graph'].max_degree, 'lower_bound': record['lower_bound'],
+                        'upper_bound': record['upper_bound'], 'optimum': record['optimum'],
+                        'optimum_source': record['optimum_source']})
+        optimum = record['optimum'] if record['optimum'] is not None else '?'
+        print(f"   => {file_name}: {record['n']} vertices, {record['graph'].n_edges} edges, "
+              f"bounds [{record['lower_bound']}, {record['upper_bound']}], optimum {optimum} "
+              f"({time.perf_counter() - start_time:.2f}s)")
+    update_manifest(args.output_dir, entries)
+    print(f"\n[*] {len(entries)} graphs written to {args.output_dir}")
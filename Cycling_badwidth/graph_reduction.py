@@ -0,0 +1,244 @@
+"""
+Graph reduction in front of the CBP encoders.
+
+Reductions only delete vertices, and deleting a vertex (with its edges) never
+increases the cyclic bandwidth, so the optimum of the reduced graph is a
+lower bound for the full graph:
+    - pendant trees are stripped leaf by leaf, each leaf remembers the vertex
+      it hangs from
+    - true twins (adjacent, same closed neighbourhood) keep one representative
+    - the remaining graph is split into connected components, solved one by one
+
+lift_labeling maps the component labelings back to a labeling of the full
+graph (components side by side, removed vertices reinserted next to their
+anchor). Its width is an upper bound; when it meets the lower bound the
+reduced solve is optimal, otherwise solve_cbp_reduced finishes with a SAT
+search on the full graph restricted to [LB, UB - 1].
+"""
+from graph_classes import build_adjacency, classify_graph, connected_components, labeling_width
+from incremental_cbp import solve_optimal_labeling
+from lower_bounds import compute_lower_bound
+
+# Try every rotation of a component layout only while n_c * E_c stays below this
+ROTATION_LIMIT = 1_000_000
+
+
+def strip_pendant_trees(adj, alive, removed):
+    """Remove degree-1 vertices until none is left (anchor = their neighbour)."""
+    stack = [v for v in range(len(adj)) if alive[v] and len(adj[v]) == 1]
+    while stack:
+        v = stack.pop()
+        if not alive[v] or len(adj[v]) != 1:
+            continue
+        anchor = next(iter(adj[v]))
+        if len(adj[anchor]) == 1:
+            continue  # Last edge of a tree component: keep it
+        alive[v] = False
+        adj[anchor].discard(v)
+        adj[v].clear()
+        removed.append((v, anchor))
+        if len(adj[anchor]) == 1:
+            stack.append(anchor)
+
+
+def merge_true_twins(adj, alive, removed):
+    """Keep one vertex per closed neighbourhood N[v] shared by adjacent twins."""
+    groups = {}
+    for v in range(len(adj)):
+        if alive[v] and adj[v]:
+            groups.setdefault(frozenset(adj[v] | {v}), []).append(v)
+    for twins in groups.values():
+        anchor = twins[0]
+        for v in twins[1:]:
+            alive[v] = False
+            for u in adj[v]:
+                adj[u].discard(v)
+            adj[v].clear()
+            removed.append((v, anchor))
+
+
+def reduce_graph(n, edges):
+    """
+    Shrink the graph with pendant-tree stripping and twin merging, then split
+    it into connected components.
+
+    Returns:
+        dict with:
+            - components: list of (vertices, local_edges), vertices[i] is the
+              original id of local vertex i
+            - removed: list of (vertex, anchor) in removal order
+            - reduced_n: number of vertices left
+    """
+    adj = build_adjacency(n, edges)
+    alive = [True] * n
+    removed = []
+    strip_pendant_trees(adj, alive, removed)
+    merge_true_twins(adj, alive, removed)
+
+    kept = [v for v in range(n) if alive[v]]
+    kept_adj = [set() for _ in range(n)]
+    for v in kept:
+        kept_adj[v] = adj[v]
+
+    components = []
+    for component in connected_components(kept_adj):
+        if not alive[component[0]]:
+            continue
+        local = {v: i for i, v in enumerate(component)}
+        local_edges = [(local[u], local[v]) for u in component for v in kept_adj[u] if u < v]
+        components.append((component, local_edges))
+
+    return {'components': components, 'removed': removed, 'reduced_n': len(kept)}
+
+
+def best_rotation(order, local_edges):
+    """Rotate a cyclic order so that it is also good as a linear layout."""
+    n_c = len(order)
+    if n_c * max(len(local_edges), 1) > ROTATION_LIMIT:
+        return order
+    position = {v: i for i, v in enumerate(order)}
+    best_start, best_width = 0, None
+    for start in range(n_c):
+        width = max((abs((position[u] - start) % n_c - (position[v] - start) % n_c)
+                     for u, v in local_edges), default=0)
+        if best_width is None or width < best_width:
+            best_start, best_width = start, width
+    return order[best_start:] + order[:best_start]
+
+
+def lift_labeling(n, reduction, component_labelings):
+    """
+    Labeling of the full graph from one labeling (local vertex -> label) per
+    component: components are laid out one after another, then removed
+    vertices are reinserted next to their anchor, last removed first.
+    """
+    order = []
+    single = len(reduction['components']) == 1
+    for (vertices, local_edges), labeling in zip(reduction['components'], component_labelings):
+        local_order = sorted(range(len(vertices)), key=lambda i: labeling[i])
+        if not single:
+            # Wrap-around edges only survive on the full cycle for a lone component
+            local_order = best_rotation(local_order, local_edges)
+        order.extend(vertices[i] for i in local_order)
+
+    # Alternate sides around an anchor so its reinserted vertices stay close:
+    # the k-th vertex reinserted after an anchor lands next to it, ahead of
+    # the earlier ones, while those before it queue up to its left
+    side, before, after = {}, {}, {}
+    for v, anchor in reversed(reduction['removed']):
+        side[anchor] = 1 - side.get(anchor, 0)
+        (after if side[anchor] else before).setdefault(anchor, []).append(v)
+
+    # One pass: a vertex expands to before-block, itself, after-block
+    layout = []
+    stack = [(v, False) for v in reversed(order)]
+    while stack:
+        v, placed = stack.pop()
+        if placed:
+            layout.append(v)
+            continue
+        stack.extend((a, False) for a in after.get(v, ()))
+        stack.append((v, True))
+        stack.extend((b, False) for b in reversed(before.get(v, ())))
+
+    labeling = [0] * n
+    for position, v in enumerate(layout):
+        labeling[v] = position + 1
+    return labeling
+
+
+def solve_component(n_c, local_edges):
+    """Optimal (w, labeling) of one component."""
+    known = classify_graph(n_c, local_edges)
+    if known is not None:
+        return known['bandwidth'], known['labeling']
+    low_w, _ = compute_lower_bound(n_c, local_edges)
+    return solve_optimal_labeling(n_c, local_edges, low_w)
+
+
+def solve_cbp_reduced(n, edges):
+    """
+    Solve CBP on the reduced graph, lift the witness back and close any
+    remaining gap on the full graph.
+
+    Returns:
+        dict: {'bandwidth', 'labeling', 'reduced_n', 'lower_bound', 'upper_bound'}
+    """
+    known = classify_graph(n, edges)
+    if known is not None:
+        print(f"   => Graph class: {known['class']} (labeling: {known['labeling']})")
+        print(f"==================================================")
+        print(f"[*] FOUND! Minimum Cyclic Bandwidth (w) is: {known['bandwidth']}")
+        print(f"==================================================")
+        return {'bandwidth': known['bandwidth'], 'labeling': known['labeling'], 'reduced_n': n,
+                'lower_bound': known['bandwidth'], 'upper_bound': known['bandwidth']}
+
+    reduction = reduce_graph(n, edges)
+    sizes = [len(vertices) for vertices, _ in reduction['components']]
+    print(f"   => Reduced graph: {reduction['reduced_n']}/{n} vertices, "
+          f"{len(reduction['removed'])} removed, components {sizes}")
+
+    low_w, lb_details = compute_lower_bound(n, edges)
+    component_labelings = []
+    for vertices, local_edges in reduction['components']:
+        w_c, labeling_c = solve_component(len(vertices), local_edges)
+        low_w = max(low_w, w_c)
+        component_labelings.append(labeling_c)
+
+    labeling = lift_labeling(n, reduction, component_labelings)
+    high_w = labeling_width(n, edges, labeling)
+    print(f"   => Lower Bound (LB): {low_w} (reduced graph + {lb_details})")
+    print(f"   => Upper Bound (UB): {high_w} (lifted labeling)")
+
+    best_w = high_w
+    if low_w < high_w:
+        print(f"   => Search strategy: Incremental linear from {low_w} up to {high_w - 1} on the full graph")
+        w, full_labeling = solve_optimal_labeling(n, edges, low_w, high_w - 1)
+        if w is not None:
+            best_w, labeling = w, full_labeling
+
+    print(f"==================================================")
+    print(f"[*] FOUND! Minimum Cyclic Bandwidth (w) is: {best_w}")
+    print(f"==================================================")
+
+    return {'bandwidth': best_w, 'labeling': labeling, 'reduced_n': reduction['reduced_n'],
+            'lower_bound': low_w, 'upper_bound': high_w}
+
+if __name__ == '__main__':
+    import sys
+    from dataset_loader import load_mtx_graph, load_mtx_graph_manual, print_graph_stats
+
+    # Check command line arguments
+    if len(sys.argv) < 2:
+        print(" Please provide path to .mtx or .mtx.gz data file")
+        print("Usage: python graph_reduction.py <path_to_file.mtx.gz>")
+        sys.exit(1)
+
+    file_path = sys.argv[1]
+    print(f"Reading data from file: {file_path}")
+
+    # Try reading with scipy first
+    n_vertices, graph_edges = load_mtx_graph(file_path)
+
+    # If unsuccessful, try manual reading
+    if n_vertices is None:
+        print("Scipy not available or error, trying manual reading...")
+        n_vertices, graph_edges = load_mtx_graph_manual(file_path)
+
+    if n_vertices is None or graph_edges is None:
+        print(" Cannot read data file. Exiting program.")
+        sys.exit(1)
+
+    # Print graph statistics
+    print_graph_stats(n_vertices, graph_edges)
+
+    # Solve CBP
+    print("\nStarting Cyclic Bandwidth Problem solving (reduced graph)...")
+    result = solve_cbp_reduced(n_vertices, graph_edges)
+
+    print("\n==================================================")
+    if result['bandwidth'] is not None:
+        print(f"[*] FOUND! Minimum Cyclic Bandwidth (w) is: {result['bandwidth']}")
+    else:
+        print("[*] No solution found.")
+    print("==================================================")
@@ -0,0 +1,151 @@
+"""
+Incremental CBP probing on a single SAT solver (ver_2_5 encoding).
+
+The labeling clauses are loaded once. The window clauses of edge e at width w
+are added lazily and guarded by two selectors, [-a_w, -s_e] + clause, so a
+probe is a solve() under the assumptions a_w and s_e of the active edges.
+When a probe is UNSAT, the core names the edges that are responsible.
+"""
+from solver_deadline import solve_within_deadline
+from ver_2_5 import get_K_var, generate_labeling_clauses, generate_edge_clauses
+
+
+class IncrementalCBP:
+    """One Glucose4 instance shared by every (edge set, w) probe of a graph."""
+
+    def __init__(self, n, edges=()):
+        from pysat.solvers import Glucose4
+
+        self.n = n
+        clauses, self.top_id = generate_labeling_clauses(n)
+        # incr=True: Glucose's incremental mode, much faster under many assumptions
+        self.solver = Glucose4(bootstrap_with=clauses, incr=True)
+        self.edges = []       # edge id -> (u, v)
+        self.edge_sel = []    # edge id -> selector s_e
+        self.sel_edge = {}    # selector -> edge id
+        self.width_sel = {}   # w -> selector a_w
+        self.loaded = set()   # (edge id, w) whose clauses are in the solver
+        for u, v in edges:
+            self.add_edge(u, v)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.delete()
+
+    def delete(self):
+        if self.solver is not None:
+            self.solver.delete()
+            self.solver = None
+
+    def new_var(self):
+        var = self.top_id
+        self.top_id += 1
+        return var
+
+    def add_edge(self, u, v):
+        """Register edge (u, v); its clauses are added on first probe. Returns the edge id."""
+        selector = self.new_var()
+        self.edges.append((u, v))
+        self.edge_sel.append(selector)
+        self.sel_edge[selector] = len(self.edges) - 1
+        return len(self.edges) - 1
+
+    def width_selector(self, w):
+        if w not in self.width_sel:
+            self.width_sel[w] = self.new_var()
+        return self.width_sel[w]
+
+    def load(self, w, edge_ids):
+        """Add the width-w window clauses of the given edges (once per (edge, w))."""
+        a_w = self.width_selector(w)
+        for e in edge_ids:
+            if (e, w) in self.loaded:
+                continue
+            u, v = self.edges[e]
+            s_e = self.edge_sel[e]
+            for clause in generate_edge_clauses(self.n, u, v, w):
+                self.solver.add_clause([-a_w, -s_e] + clause)
+            self.loaded.add((e, w))
+
+    def probe(self, w, edge_ids=None, conf_budget=None):
+        """
+        Check whether the edges fit in cyclic bandwidth w.
+
+        Returns:
+            True (SAT), False (UNSAT) or None (conflict budget exhausted)
+        """
+        if edge_ids is None:
+            edge_ids = range(len(self.edges))
+        edge_ids = list(edge_ids)
+        self.load(w, edge_ids)
+        assumptions = [self.width_sel[w]] + [self.edge_sel[e] for e in edge_ids]
+        if conf_budget is None:
+            return solve_within_deadline(self.solver, assumptions)
+        self.solver.conf_budget(conf_budget)
+        return self.solver.solve_limited(assumptions=assumptions)
+
+    def core_edges(self):
+        """Edge ids in the core of the last UNSAT probe."""
+        core = self.solver.get_core() or []
+        return sorted(self.sel_edge[lit] for lit in core if lit in self.sel_edge)
+
+    def minimize_core(self, w, edge_ids, conf_budget=1000, trim_rounds=3, max_checks=100):
+        """
+        Cheap core minimization, every solve under a conflict budget: re-solve
+        on the core a few times while it shrinks (trimming), then try to drop
+        single edges for at most max_checks probes. Anything undecided stays
+        in the core, so the result is always a valid (maybe non-minimal) core.
+        """
+        core = list(edge_ids)
+        for _ in range(trim_rounds):
+            if self.probe(w, core, conf_budget) is not False:
+                break
+            smaller = self.core_edges()
+            if len(smaller) >= len(core):
+                break
+            core = smaller
+
+        i = 0
+        checks = 0
+        while i < len(core) and checks < max_checks:
+            checks += 1
+            candidate = core[:i] + core[i + 1:]
+            if candidate and self.probe(w, candidate, conf_budget) is False:
+                core = self.core_edges() or candidate
+            else:
+                i += 1
+        return core
+
+    def set_phases(self, labeling):
+        """Hint the solver with a known labeling (vertex -> label)."""
+        self.solver.set_phases([get_K_var(self.n, i, label) for i, label in enumerate(labeling)])
+
+    def get_labeling(self):
+        """Labeling (list, vertex -> label) of the last SAT probe."""
+        model = self.solver.get_model()
+        labeling = [None] * self.n
+        for i in range(self.n):
+            for j in range(1, self.n + 1):
+                if model[get_K_var(self.n, i, j) - 1] > 0:
+                    labeling[i] = j
+                    break
+        return labeling
+
+
+def solve_optimal_labeling(n, edges, low_w, high_w=None):
+    """
+    Linear search from low_w upwards on one incremental solver.
+
+    Returns:
+        tuple: (w, labeling) for the first SAT w, or (None, None) if none
+        in [low_w, high_w] (high_w defaults to floor(n/2))
+    """
+    if high_w is None:
+        high_w = n // 2
+    with IncrementalCBP(n, edges) as cbp:
+        for w in range(low_w, high_w + 1):
+            if cbp.probe(w):
+                return w, cbp.get_labeling()
+    return None, None
@@ -0,0 +1,108 @@
+"""
+Cheap graph-theoretic lower bounds for the Cyclic Bandwidth Problem.
+
+Every bound here runs in (near) linear time in the size of the graph and is
+valid for the cyclic bandwidth, so solve_cbp can start its w range from the
+maximum of them instead of ceil(max_degree / 2).
+"""
+import math
+
+import numpy as np
+
+from cbp_graph import as_graph
+
+# Number of BFS sources used by the ball and diameter bounds
+BFS_SOURCES = 16
+# Exact diameter (BFS from every vertex) only when n * E stays below this
+EXACT_DIAMETER_LIMIT = 2_000_000
+
+
+def degree_lower_bound(graph):
+    """A vertex and its deg neighbours need deg labels within distance w: w >= ceil(deg/2)."""
+    return math.ceil(graph.max_degree / 2)
+
+
+def ball_lower_bound(graph, sources):
+    """
+    BFS-ball density bound. The m vertices within distance r of a source lie
+    on an arc of 2*r*w + 1 labels, so 2*r*w >= m - 1 for every radius r.
+    """
+    best = 0
+    for source in sources:
+        dist = graph.bfs(source)
+        layer_sizes = np.bincount(dist[dist >= 0])
+        balls = np.cumsum(layer_sizes)
+        for r in range(1, len(balls)):
+            best = max(best, math.ceil((int(balls[r]) - 1) / (2 * r)))
+    return best
+
+
+def greedy_clique(graph, start):
+    """Greedily grow a clique from start, preferring high-degree neighbours."""
+    clique = [start]
+    candidates = set(graph.neighbors(start).tolist())
+    while candidates:
+        v = max(candidates, key=lambda x: graph.degrees[x])
+        clique.append(v)
+        candidates &= set(graph.neighbors(v).tolist())
+    return clique
+
+
+def clique_lower_bound(graph, sources):
+    """
+    Clique bound. If 3w < n, q pairwise-adjacent vertices must sit on an arc
+    of w + 1 labels, hence w >= min(q - 1, ceil(n / 3)).
+    """
+    n = graph.n
+    q = 1 if n > 0 else 0
+    for source in sources:
+        q = max(q, len(greedy_clique(graph, source)))
+    return min(q - 1, math.ceil(n / 3)) if q > 0 else 0
+
+
+def diameter_lower_bound(graph, sources):
+    """
+    Diameter bound for the cyclic case. Two vertices carry labels floor(n/2)
+    apart and are joined by a path of at most diam edges: diam * w >= floor(n/2).
+    Only valid for connected graphs; returns 0 otherwise.
+    """
+    n = graph.n
+    if n < 2:
+        return 0
+    dist = graph.bfs(sources[0])
+    if dist.min() < 0:
+        return 0  # Disconnected
+
+    if n * graph.n_edges <= EXACT_DIAMETER_LIMIT:
+        diameter = max(int(graph.bfs(v).max()) for v in range(n))
+    else:
+        # diam <= 2 * ecc(v) for any v; take the best sampled centre
+        diameter = min(2 * int(graph.bfs(v).max()) for v in sources)
+    return math.ceil((n // 2) / diameter) if diameter > 0 else 0
+
+
+def pick_sources(graph, count=BFS_SOURCES):
+    """Highest-degree vertices first, they give the densest balls and cliques."""
+    order = np.argsort(-graph.degrees, kind='stable')
+    return order[:count].tolist()
+
+
+def compute_lower_bound(n, edges):
+    """
+    Compute every cheap lower bound and return the strongest one.
+    edges may be a CBPGraph (reused as is) or any list of (u, v) pairs.
+
+    Returns:
+        tuple: (low_w, bounds) with:
+            - low_w: max of all bounds, capped at the trivial upper bound n // 2
+            - bounds: dict {bound name: value}
+    """
+    graph = as_graph(n, edges)
+    sources = pick_sources(graph)
+    bounds = {'degree': degree_lower_bound(graph)}
+    if sources:
+        bounds['ball'] = ball_lower_bound(graph, sources)
+        bounds['clique'] = clique_lower_bound(graph, sources)
+        bounds['diameter'] = diameter_lower_bound(graph, sources)
+    low_w = min(max(bounds.values()), n // 2)
+    return low_w, bounds
@@ -0,0 +1,184 @@
+"""
+Single-call MaxSAT formulation of the Cyclic Bandwidth Problem.
+
+Instead of rebuilding and solving one decision formula per w, CBP is encoded
+once with w as a unary objective and handed to a MaxSAT engine (RC2 or LSU).
+The labeling part and the edge windows are the ones of ver_2_5.py.
+"""
+import time
+
+from pysat.formula import WCNF
+from pysat.examples.rc2 import RC2
+from pysat.examples.lsu import LSU
+
+from cbp_events import emit
+from graph_classes import classify_graph
+from lower_bounds import compute_lower_bound
+from solver_deadline import call_within_deadline, check_deadline, remaining_time
+from ver_2_5 import generate_labeling_clauses, generate_edge_clauses
+
+ENGINES = ('rc2', 'lsu')
+
+
+class _CountingRC2(RC2):
+    """RC2 that counts its SAT oracle calls."""
+
+    oracle_calls = 0
+
+    def _call_oracle(self, assumptions=[], expect_interrupt=False):
+        self.oracle_calls += 1
+        return super()._call_oracle(assumptions=assumptions,
+                                    expect_interrupt=expect_interrupt)
+
+
+class _CountingLSU(LSU):
+    """LSU that counts its SAT oracle calls (one per improved model + last)."""
+
+    oracle_calls = 1
+
+    def _assert_lt(self, cost):
+        self.oracle_calls += 1
+        return super()._assert_lt(cost)
+
+
+def get_B_var(top_id, low_w, t):
+    """Map indicator B_t: cyclic bandwidth > t (low_w <= t < high_w)"""
+    return top_id + (t - low_w)
+
+
+def generate_wcnf_for_cbp(n, edges, low_w, high_w):
+    """
+    Encode CBP for every w in [low_w, high_w] in one WCNF.
+
+    B_t (low_w <= t < high_w) is a unary counter on w: B_t → B_t-1, and the
+    edge windows of width t are only enforced when B_t is false. Each B_t is
+    penalised by a unit soft clause, so the optimum cost is w - low_w.
+
+    Returns:
+        tuple: (wcnf, top_id) with top_id the first indicator variable
+    """
+    hard, top_id = generate_labeling_clauses(n)
+    wcnf = WCNF()
+    for clause in hard:
+        wcnf.append(clause)
+
+    for t in range(low_w, high_w):
+        b_t = get_B_var(top_id, low_w, t)
+        # Unary order: bandwidth > t → bandwidth > t-1
+        if t > low_w:
+            wcnf.append([-b_t, get_B_var(top_id, low_w, t - 1)])
+        # ¬B_t → every edge fits in a window of width t
+        for u, v in edges:
+            for clause in generate_edge_clauses(n, u, v, t):
+                wcnf.append(clause + [b_t])
+        wcnf.append([-b_t], weight=1)
+
+    # Edges at width high_w = floor(n/2) are always satisfied, no clauses needed
+    return wcnf, top_id
+
+
+def solve_cbp_maxsat(n, edges, engine='rc2'):
+    """
+    Solve CBP with a single MaxSAT call, reporting like solve_cbp.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown MaxSAT engine: {engine} (expected one of {ENGINES})")
+
+    # Closed-form answer for trivial graph classes, no encoding needed
+    known = classify_graph(n, edges)
+    if known is not None:
+        print(f"   => Graph class: {known['class']} (labeling: {known['labeling']})")
+        print(f"==================================================")
+        print(f"[*] FOUND! Minimum Cyclic Bandwidth (w) is: {known['bandwidth']}")
+        print(f"==================================================")
+        emit('answer', f'maxsat_{engine}', bandwidth=known['bandwidth'], lower_bound=known['bandwidth'],
+             upper_bound=known['bandwidth'], source='class')
+        return known['bandwidth']
+
+    low_w, lb_details = compute_lower_bound(n, edges)  # Strongest cheap lower bound
+    high_w = n // 2  # Upper bound = floor(n/2)
+
+    print(f"   => Lower Bound (LB): {low_w} {lb_details}")
+    print(f"   => Upper Bound (UB): {high_w}")
+    print(f"   => Search strategy: single MaxSAT call ({engine}) over [{low_w}, {high_w}]")
+
+    start_time = time.time()
+    wcnf, _ = generate_wcnf_for_cbp(n, edges, low_w, high_w)
+    print(f"   => Generated {len(wcnf.hard)} hard and {len(wcnf.soft)} soft clauses "
+          f"with total {wcnf.nv} variables.")
+    encode_time = time.time() - start_time
+    emit('encode_done', f'maxsat_{engine}', w=None, clauses=len(wcnf.hard) + len(wcnf.soft),
+         variables=wcnf.nv, encode_time=encode_time)
+
+    # Under a deadline (auto_test --in-process) the engine's oracle is interrupted at the timeout
+    check_deadline()
+    interruptible = remaining_time() is not None
+    best_w = None
+    if engine == 'rc2':
+        with _CountingRC2(wcnf, solver='g4') as rc2:
+            model = call_within_deadline(lambda: rc2.compute(expect_interrupt=interruptible), rc2.interrupt)
+            if model is not None:
+                best_w = low_w + rc2.cost
+            oracle_calls, oracle_time = rc2.oracle_calls, rc2.oracle_time()
+    else:
+        with _CountingLSU(wcnf, solver='g4', expect_interrupt=interruptible) as lsu:
+            if call_within_deadline(lsu.solve, lsu.interrupt) and lsu.found_optimum():
+                best_w = low_w + lsu.cost
+            oracle_calls, oracle_time = lsu.oracle_calls, lsu.oracle_time()
+
+    emit('solve_done', f'maxsat_{engine}', w=best_w, result='SAT' if best_w is not None else 'UNSAT',
+         solve_time=oracle_time, stats={'oracle_calls': oracle_calls})
+    print(f"   => Encoding time: {encode_time:.3f}s")
+    print(f"   => Solver result: {'OPTIMUM' if best_w is not None else 'UNSAT'} "
+          f"after {oracle_calls} oracle calls ({oracle_time:.3f}s)")
+
+    if best_w is not None:
+        print(f"==================================================")
+        print(f"[*] FOUND! Minimum Cyclic Bandwidth (w) is: {best_w}")
+        print(f"==================================================")
+    else:
+        print(f"\n   =>  No solution found in range [{low_w}, {high_w}]")
+    emit('answer', f'maxsat_{engine}', bandwidth=best_w, lower_bound=low_w, upper_bound=high_w,
+         source='search')
+
+    return best_w
+
+if __name__ == '__main__':
+    import sys
+    from dataset_loader import load_mtx_graph, load_mtx_graph_manual, print_graph_stats
+
+    # Check command line arguments
+    if len(sys.argv) < 2:
+        print(" Please provide path to .mtx or .mtx.gz data file")
+        print("Usage: python maxsat_cbp.py <path_to_file.mtx.gz> [rc2|lsu]")
+        sys.exit(1)
+
+    file_path = sys.argv[1]
+    engine = sys.argv[2] if len(sys.argv) > 2 else 'rc2'
+    print(f"Reading data from file: {file_path}")
+
+    # Try reading with scipy first
+    n_vertices, graph_edges = load_mtx_graph(file_path)
+
+    # If unsuccessful, try manual reading
+    if n_vertices is None:
+        print("Scipy not available or error, trying manual reading...")
+        n_vertices, graph_edges = load_mtx_graph_manual(file_path)
+
+    if n_vertices is None or graph_edges is None:
+        print(" Cannot read data file. Exiting program.")
+        sys.exit(1)
+
+    # Print graph statistics
+    print_graph_stats(n_vertices, graph_edges)
+
+    # Solve CBP
+    print(f"\nStarting Cyclic Bandwidth Problem solving (MaxSAT, {engine})...")
+    final_w = solve_cbp_maxsat(n_vertices, graph_edges, engine)
+
+    print("\n==================================================")
+    if final_w is not None:
+        print(f"[*] FOUND! Minimum Cyclic Bandwidth (w) is: {final_w}")
+    else:
+        print("[*] No solution found.")
+    print("==================================================")
@@ -0,0 +1,292 @@
+"""
+Persistent CBP result store (SQLite) keyed by a relabeling-invariant graph
+fingerprint.
+
+The fingerprint is the digest of 1-WL colour refinement (Weisfeiler-Lehman)
+run to a stable partition. Equal fingerprints are confirmed by an exact
+isomorphism search guided by the stable colours, and the isomorphism maps
+the stored witness labeling onto the vertices of the new graph. A search
+that exceeds ISO_NODE_LIMIT counts as a miss, so a hit is always exact.
+
+Graphs on the same n that are not isomorphic still help (seed_bounds):
+    - the stored witness labeling is a labeling of any graph on n
+      vertices, its width on the new graph is an upper bound
+    - a stored graph whose edges are a subset of the new graph's edges
+      (same vertex ids) gives its optimum as a lower bound
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from collections import Counter
+
+import numpy as np
+
+from cbp_graph import CBPGraph, as_graph, canonical_edge_keys
+from graph_classes import labeling_width
+
+DEFAULT_PATH = 'cbp_results.sqlite'
+# Backtracking nodes allowed for one exact isomorphism check
+ISO_NODE_LIMIT = 200_000
+# Same-n stored graphs examined by seed_bounds (most recent first)
+SEED_CANDIDATES = 50
+# seed_bounds only looks at stored graphs with |E| within this fraction
+SEED_EDGE_RATIO = 0.1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    n_edges INTEGER NOT NULL,
+    edges BLOB NOT NULL,
+    bandwidth INTEGER NOT NULL,
+    lower_bound INTEGER,
+    upper_bound INTEGER,
+    labeling TEXT,
+    stats TEXT,
+    solver TEXT,
+    created REAL
+);
+CREATE INDEX IF NOT EXISTS results_fingerprint ON results (fingerprint);
+CREATE INDEX IF NOT EXISTS results_size ON results (n, n_edges);
+"""
+
+
+def neighbour_lists(graph):
+    indices = graph.indices.tolist()
+    indptr = graph.indptr.tolist()
+    return [indices[indptr[v]:indptr[v + 1]] for v in range(graph.n)]
+
+
+def refine_colours(graph):
+    """
+    1-WL colour refinement until the partition is stable. Colours are
+    renumbered by sorted signature at every round, so they are canonical.
+
+    Returns:
+        tuple: (colours, fingerprint) with colours a list (vertex -> colour)
+    """
+    adj = neighbour_lists(graph)
+    colours = graph.degrees.tolist()
+    digest = hashlib.sha256(f"{graph.n} {graph.n_edges}".encode())
+    digest.update(repr(sorted(Counter(colours).items())).encode())
+    n_classes = len(set(colours))
+    while True:
+        signatures = [(colours[v], tuple(sorted(colours[u] for u in adj[v]))) for v in range(graph.n)]
+        ids = {signature: i for i, signature in enumerate(sorted(set(signatures)))}
+        digest.update(repr(sorted(Counter(signatures).items())).encode())
+        colours = [ids[signature] for signature in signatures]
+        if len(ids) == n_classes:
+            return colours, digest.hexdigest()
+        n_classes = len(ids)
+
+
+def find_isomorphism(graph_a, colours_a, graph_b, colours_b, node_limit=ISO_NODE_LIMIT):
+    """
+    Edge- and colour-preserving bijection a -> b (list), found by
+    backtracking in BFS order, or None if there is none or the search
+    exceeds node_limit.
+    """
+    n = graph_a.n
+    if n != graph_b.n or graph_a.n_edges != graph_b.n_edges or sorted(colours_a) != sorted(colours_b):
+        return None
+    adj_a = graph_a.adjacency_sets()
+    adj_b = graph_b.adjacency_sets()
+    by_colour = {}
+    for u in range(n):
+        by_colour.setdefault(colours_b[u], []).append(u)
+
+    # Rarest colour first, then BFS so each vertex has mapped neighbours
+    order, seen = [], [False] * n
+    for start in sorted(range(n), key=lambda v: (len(by_colour[colours_a[v]]), v)):
+        if seen[start]:
+            continue
+        seen[start] = True
+        order.append(start)
+        queue = [start]
+        for v in queue:
+            for u in sorted(adj_a[v]):
+                if not seen[u]:
+                    seen[u] = True
+                    queue.append(u)
+                    order.append(u)
+
+    mapping = [-1] * n
+    used = [False] * n
+
+    def candidates(v):
+        anchors = [w for w in adj_a[v] if mapping[w] >= 0]
+        pool = adj_b[mapping[anchors[0]]] if anchors else by_colour[colours_a[v]]
+        mapped_neighbours = len(anchors)
+        for u in pool:
+            if used[u] or colours_b[u] != colours_a[v]:
+                continue
+            if all(mapping[w] in adj_b[u] for w in anchors) and \
+                    sum(1 for x in adj_b[u] if used[x]) == mapped_neighbours:
+                yield u
+
+    nodes = 0
+    stack = [candidates(order[0])] if n else []
+    depth = 0
+    while stack:
+        v = order[depth]
+        if mapping[v] >= 0:
+            used[mapping[v]] = False
+            mapping[v] = -1
+        u = next(stack[-1], None)
+        if u is None:
+            stack.pop()
+            depth -= 1
+            continue
+        nodes += 1
+        if nodes > node_limit:
+            return None
+        mapping[v] = u
+        used[u] = True
+        if depth + 1 == n:
+            return mapping
+        depth += 1
+        stack.append(candidates(order[depth]))
+    return mapping if n == 0 else None
+
+
+def pack_edges(graph):
+    return zlib.compress(graph.edge_array.astype(np.int32).tobytes())
+
+
+def unpack_edges(blob):
+    return np.frombuffer(zlib.decompress(blob), dtype=np.int32).astype(np.int64).reshape(-1, 2)
+
+
+class ResultCache:
+    """SQLite-backed store of proven CBP optima."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def lookup(self, n, edges):
+        """
+        Stored result of a graph isomorphic to (n, edges).
+
+        Returns:
+            dict: {'bandwidth', 'lower_bound', 'upper_bound', 'labeling', 'stats', 'solver'}
+            with labeling mapped onto this graph's vertices, or None on a miss
+        """
+        graph = as_graph(n, edges)
+        colours, fingerprint = refine_colours(graph)
+        rows = self.conn.execute(
+            "SELECT edges, bandwidth, lower_bound, upper_bound, labeling, stats, solver "
+            "FROM results WHERE fingerprint = ? AND n = ? AND n_edges = ? ORDER BY id DESC",
+            (fingerprint, n, graph.n_edges)).fetchall()
+        for blob, bandwidth, lower_bound, upper_bound, labeling, stats, solver in rows:
+            stored = CBPGraph(n, unpack_edges(blob))
+            stored_colours, _ = refine_colours(stored)
+            mapping = find_isomorphism(graph, colours, stored, stored_colours)
+            if mapping is None:
+                continue  # Fingerprint collision (or search limit): not a hit
+            result = {'bandwidth': bandwidth, 'lower_bound': lower_bound, 'upper_bound': upper_bound,
+                      'labeling': None, 'stats': json.loads(stats) if stats else {}, 'solver': solver}
+            if labeling:
+                stored_labeling = json.loads(labeling)
+                mapped = [stored_labeling[mapping[v]] for v in range(n)]
+                if labeling_width(n, graph, mapped) == bandwidth:
+                    result['labeling'] = mapped
+            return result
+        return None
+
+    def store(self, n, edges, bandwidth, lower_bound=None, upper_bound=None, labeling=None,
+              stats=None, solver=None):
+        """Record a proven optimum (bandwidth) with its bounds, witness and statistics."""
+        if bandwidth is None:
+            return
+        graph = as_graph(n, edges)
+        _, fingerprint = refine_colours(graph)
+        self.conn.execute(
+            "INSERT INTO results (fingerprint, n, n_edges, edges, bandwidth, lower_bound, upper_bound, "
+            "labeling, stats, solver, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (fingerprint, n, graph.n_edges, pack_edges(graph), int(bandwidth),
+             lower_bound, upper_bound, json.dumps([int(x) for x in labeling]) if labeling else None,
+             json.dumps(stats or {}), solver, time.time()))
+        self.conn.commit()
+
+    def seed_bounds(self, n, edges):
+        """
+        Bounds from stored graphs on the same n with a similar edge count.
+
+        Returns:
+            dict: {'lower_bound', 'upper_bound', 'labeling'} (upper_bound and
+            labeling None when no stored witness helps)
+        """
+        graph = as_graph(n, edges)
+        keys = canonical_edge_keys(graph.edge_array[:, 0], graph.edge_array[:, 1])
+        slack = max(1, int(graph.n_edges * SEED_EDGE_RATIO))
+        rows = self.conn.execute(
+            "SELECT edges, bandwidth, labeling FROM results WHERE n = ? AND n_edges BETWEEN ? AND ? "
+            "ORDER BY id DESC LIMIT ?",
+            (n, graph.n_edges - slack, graph.n_edges + slack, SEED_CANDIDATES)).fetchall()
+
+        seed = {'lower_bound': 0, 'upper_bound': None, 'labeling': None}
+        for blob, bandwidth, labeling in rows:
+            stored = unpack_edges(blob)
+            if len(stored) <= graph.n_edges:
+                stored_keys = canonical_edge_keys(stored[:, 0], stored[:, 1])
+                if np.isin(stored_keys, keys, assume_unique=True).all():
+                    # Subgraph on the same vertex ids: deleting edges never increases B_c
+                    seed['lower_bound'] = max(seed['lower_bound'], bandwidth)
+            if labeling:
+                stored_labeling = json.loads(labeling)
+                width = labeling_width(n, graph, stored_labeling)
+                if seed['upper_bound'] is None or width < seed['upper_bound']:
+                    seed['upper_bound'], seed['labeling'] = width, stored_labeling
+        return seed
+
+
+def open_result_cache(path):
+    """ResultCache for path, or None when no path is given."""
+    return ResultCache(path) if path else None
+
+
+def cached_solve(n, edges, solve, cache, solver=None):
+    """
+    Run solve(n, edges) unless the cache already knows the answer, and store
+    what it proves. solve may return an int or a dict with 'bandwidth' and
+    optionally 'lower_bound', 'upper_bound', 'labeling'.
+    """
+    hit = cache.lookup(n, edges)
+    if hit is not None:
+        print(f"   => Result cache hit: w = {hit['bandwidth']} (solved by {hit['solver']})")
+        return hit['bandwidth']
+    start_time = time.perf_counter()
+    result = solve(n, edges)
+    runtime = time.perf_counter() - start_time
+    details = result if isinstance(result, dict) else {'bandwidth': result}
+    cache.store(n, edges, details['bandwidth'], details.get('lower_bound'), details.get('upper_bound'),
+                details.get('labeling'), {'runtime': runtime}, solver)
+    return details['bandwidth']
+
+
+if __name__ == '__main__':
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH
+    if not os.path.exists(path):
+        print(f" Result cache not found: {path}")
+        sys.exit(1)
+    with ResultCache(path) as cache:
+        count, graphs = cache.conn.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT fingerprint) FROM results").fetchone()
+        print(f"{path}: {count} results, {graphs} distinct fingerprints")
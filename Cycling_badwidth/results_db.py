@@ -0,0 +1,289 @@
+"""
+Benchmark results database (SQLite), one table of runs and one of results.
+
+Every auto_test.py invocation is a run, stored once with its environment
+(git commit, Python, PySAT version, the SAT backend and encoding of each
+solver in the run, command line) and the campaign it belongs to; every (file, solver) job is a result
+row pointing at its run. Indexes on solver, file and run keep queries over
+thousands of rows in SQLite instead of concatenating CSVs in pandas.
+
+    python results_db.py import cbp_test_results_*.csv    # old CSV files
+    python results_db.py runs                              # list runs
+    python results_db.py export results.parquet            # needs pyarrow
+
+pandas (to_dataframe) and pyarrow (export_parquet) are imported only when
+those functions are used.
+"""
+import json
+import os
+import platform
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+DEFAULT_DB = 'cbp_benchmarks.sqlite'
+
+# SAT backend and encoding of each auto_test solver, recorded with every run.
+# ver_2 / ver_2_5 choose the label at-most-one encoding per instance, the one
+# used is stored in the amo_encoding column of each result.
+SOLVER_ENCODINGS = {
+    'ver_2': {'sat_backend': 'Glucose4', 'search': 'linear, one solver per w',
+              'amo_encoding': 'per instance (formula_estimate)'},
+    'ver_2_5': {'sat_backend': 'Glucose4', 'search': 'linear, one solver per w',
+                'amo_encoding': 'per instance (formula_estimate)'},
+    'core_cbp': {'sat_backend': 'Glucose4 (incremental)', 'search': 'linear, assumptions and cores',
+                 'amo_encoding': 'seqcounter'},
+    'maxsat_cbp': {'sat_backend': 'Glucose4 in RC2', 'search': 'MaxSAT', 'amo_encoding': 'seqcounter'},
+}
+
+# Result column -> SQLite type, same names as the auto_test.py CSV columns
+RESULT_COLUMNS = {
+    'file_name': 'TEXT', 'file_path': 'TEXT', 'solver': 'TEXT',
+    'vertices': 'INTEGER', 'edges': 'INTEGER', 'max_degree': 'INTEGER',
+    'success': 'INTEGER', 'bandwidth': 'INTEGER', 'mode': 'TEXT',
+    'runtime_sec': 'REAL', 'load_sec': 'REAL', 'cpu_sec': 'REAL', 'max_rss_mb': 'REAL',
+    'encode_sec': 'REAL', 'build_sec': 'REAL', 'solve_sec': 'REAL', 'conflicts': 'INTEGER',
+    'decisions': 'INTEGER', 'propagations': 'INTEGER', 'restarts': 'INTEGER',
+    'encode_families': 'TEXT', 'probe_profile': 'TEXT',
+    'clauses': 'INTEGER', 'variables': 'INTEGER', 'amo_encoding': 'TEXT',
+    'timeout': 'INTEGER', 'timeout_at_w': 'INTEGER', 'last_successful_w': 'INTEGER',
+    'last_successful_clauses': 'INTEGER', 'last_successful_vars': 'INTEGER',
+    'core_sizes': 'TEXT', 'error_msg': 'TEXT', 'config': 'TEXT', 'attempt': 'INTEGER',
+}
+BOOLEAN_COLUMNS = ('success', 'timeout')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    campaign TEXT,
+    started REAL,
+    git_commit TEXT,
+    git_dirty INTEGER,
+    python TEXT,
+    platform TEXT,
+    hostname TEXT,
+    pysat_version TEXT,
+    sat_backend TEXT,
+    encoding TEXT,
+    config TEXT,
+    argv TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    created REAL,
+    {columns}
+);
+CREATE INDEX IF NOT EXISTS results_run ON results (run_id);
+CREATE INDEX IF NOT EXISTS results_solver ON results (solver, file_name);
+CREATE INDEX IF NOT EXISTS results_file ON results (file_name);
+CREATE INDEX IF NOT EXISTS runs_campaign ON runs (campaign);
+""".format(columns=',\n    '.join(f"{name} {kind}" for name, kind in RESULT_COLUMNS.items()))
+
+
+def git_revision(path=None):
+    """(commit, dirty) of the repository containing path, (None, None) outside git."""
+    cwd = path or os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=cwd, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+        if commit is None:
+            return None, None
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=cwd,
+                                capture_output=True, text=True, timeout=30).stdout
+        return commit, bool(status.strip())
+    except (OSError, subprocess.SubprocessError):
+        return None, None
+
+
+def pysat_version():
+    try:
+        from importlib.metadata import version
+        return version('python-sat')
+    except Exception:
+        return None
+
+
+def collect_environment(solvers=()):
+    """Metadata of this machine and checkout, with the encodings of solvers, stored with a run."""
+    commit, dirty = git_revision()
+    options = {solver: SOLVER_ENCODINGS.get(solver, {}) for solver in solvers}
+    backends = sorted({entry['sat_backend'] for entry in options.values() if 'sat_backend' in entry})
+    return {
+        'git_commit': commit,
+        'git_dirty': dirty,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'hostname': socket.gethostname(),
+        'pysat_version': pysat_version(),
+        'sat_backend': '; '.join(backends) or None,
+        'encoding': options,
+        'argv': sys.argv,
+    }
+
+
+def to_db_value(name, value):
+    """CSV / harness value -> SQLite value of column name ('' and NaN become NULL)."""
+    if value is None or value == '' or (isinstance(value, float) and value != value):
+        return None
+    kind = RESULT_COLUMNS[name]
+    if name in BOOLEAN_COLUMNS:
+        return int(value in (True, 'True', 'true', '1', 1))
+    try:
+        if kind == 'INTEGER':
+            return int(float(value))
+        if kind == 'REAL':
+            return float(value)
+    except (TypeError, ValueError):
+        return None  # e.g. bandwidth 'NO_SOLUTION'
+    return str(value)
+
+
+class ResultsDB:
+    """SQLite store of benchmark runs; safe to share between auto_test worker threads."""
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        # Databases created before a column was added get it (NULL for old rows)
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(results)")}
+        for name, kind in RESULT_COLUMNS.items():
+            if name not in existing:
+                self.conn.execute(f"ALTER TABLE results ADD COLUMN {name} {kind}")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def start_run(self, campaign=None, config=None, environment=None):
+        """Record a run and return its id."""
+        env = environment if environment is not None else collect_environment()
+        with self.lock:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (campaign, started, git_commit, git_dirty, python, platform, hostname, "
+                "pysat_version, sat_backend, encoding, config, argv) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (campaign, time.time(), env.get('git_commit'),
+                 None if env.get('git_dirty') is None else int(env['git_dirty']),
+                 env.get('python'), env.get('platform'), env.get('hostname'), env.get('pysat_version'),
+                 env.get('sat_backend'), json.dumps(env.get('encoding') or {}), config,
+                 json.dumps(env.get('argv') or [])))
+            self.conn.commit()
+            return cursor.lastrowid
+
+    def add_result(self, run_id, row):
+        """Store one result row (dict with any of RESULT_COLUMNS), committed at once."""
+        names = [name for name in RESULT_COLUMNS if name in row]
+        values = [to_db_value(name, row[name]) for name in names]
+        with self.lock:
+            self.conn.execute(
+                f"INSERT INTO results (run_id, created, {', '.join(names)}) "
+                f"VALUES (?, ?, {', '.join('?' * len(names))})",
+                [run_id, time.time()] + values)
+            self.conn.commit()
+
+    def import_csv(self, csv_file, campaign=None):
+        """Load an auto_test.py CSV as one run (environment unknown). Returns (run_id, rows)."""
+        import csv
+
+        with open(csv_file, 'r', newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        run_id = self.start_run(campaign or os.path.basename(csv_file),
+                                environment={'encoding': {'imported_from': csv_file}})
+        for row in rows:
+            self.add_result(run_id, row)
+        return run_id, len(rows)
+
+    def runs(self):
+        return self.conn.execute(
+            "SELECT runs.id, campaign, started, git_commit, git_dirty, COUNT(results.id) "
+            "FROM runs LEFT JOIN results ON results.run_id = runs.id GROUP BY runs.id ORDER BY runs.id"
+        ).fetchall()
+
+    def latest_run_id(self):
+        row = self.conn.execute("SELECT MAX(run_id) FROM results").fetchone()
+        return row[0] if row else None
+
+    def query(self, where=None, params=()):
+        """
+        Result rows joined with their run (list of dicts). where is an SQL
+        condition on the results / runs columns, e.g. "solver = ?".
+        """
+        sql = ("SELECT results.*, runs.campaign, runs.git_commit, runs.sat_backend, runs.encoding "
+               "FROM results JOIN runs ON runs.id = results.run_id")
+        if where:
+            sql += f" WHERE {where}"
+        cursor = self.conn.execute(sql + " ORDER BY results.id", params)
+        names = [description[0] for description in cursor.description]
+        rows = []
+        for values in cursor:
+            row = dict(zip(names, values))
+            for name in BOOLEAN_COLUMNS:
+                if row.get(name) is not None:
+                    row[name] = bool(row[name])
+            rows.append(row)
+        return rows
+
+    def to_dataframe(self, where=None, params=()):
+        """query() as a pandas DataFrame."""
+        import pandas as pd
+
+        rows = self.query(where, params)
+        columns = ['id', 'run_id', 'created'] + list(RESULT_COLUMNS) + \
+            ['campaign', 'git_commit', 'sat_backend', 'encoding']
+        return pd.DataFrame(rows, columns=columns if not rows else None)
+
+    def export_parquet(self, path, where=None, params=()):
+        """Columnar export of query() (needs pyarrow). Returns the number of rows."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow")
+        rows = self.query(where, params)
+        pq.write_table(pa.Table.from_pylist(rows), path)
+        return len(rows)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark results database (SQLite).")
+    parser.add_argument('--db', default=DEFAULT_DB)
+    commands = parser.add_subparsers(dest='command', required=True)
+    import_parser = commands.add_parser('import', help='load auto_test.py CSV files')
+    import_parser.add_argument('files', nargs='+')
+    import_parser.add_argument('--campaign')
+    commands.add_parser('runs', help='list the stored runs')
+    export_parser = commands.add_parser('export', help='write all results to a Parquet file')
+    export_parser.add_argument('path')
+    export_parser.add_argument('--where', help='SQL condition, e.g. "solver = \'ver_2_5\'"')
+    args = parser.parse_args()
+
+    with ResultsDB(args.db) as db:
+        if args.command == 'import':
+            for csv_file in args.files:
+                run_id, count = db.import_csv(csv_file, args.campaign)
+                print(f"{csv_file}: {count} results as run {run_id}")
+        elif args.command == 'runs':
+            for run_id, campaign, started, commit, dirty, count in db.runs():
+                when = time.strftime('%Y-%m-%d %H:%M', time.localtime(started)) if started else '?'
+                revision = f"{commit[:10]}{'+' if dirty else ''}" if commit else '-'
+                print(f"{run_id:5d}  {when}  {revision:12s} {count:6d} results  {campaign or ''}")
+        else:
+            try:
+                count = db.export_parquet(args.path, args.where)
+            except RuntimeError as e:
+                print(f" {e}")
+                sys.exit(1)
+            print(f"{count} results written to {args.path}")
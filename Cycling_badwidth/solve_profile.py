@@ -0,0 +1,110 @@
+"""
+Per-probe profile of one CBP solve: where the time of every probed w went.
+
+solve_cbp(..., profile=SolveProfile()) appends one record per probe:
+    - w, result ('SAT', 'UNSAT', or None when the solve was interrupted)
+    - clauses, variables
+    - encode_sec, and families {clause family: seconds} of the encoder
+    - build_sec: solver construction and clause loading
+    - solve_sec
+    - stats: accum_stats() counters of that probe (conflicts, decisions,
+      propagations, restarts)
+The same records travel in the event stream (encode_done carries
+'families', solve_done 'build_time'), so from_events rebuilds the profile
+of a solver that ran in a subprocess.
+"""
+import json
+import time
+
+STAT_KEYS = ('conflicts', 'decisions', 'propagations', 'restarts')
+TIME_KEYS = ('encode_sec', 'build_sec', 'solve_sec')
+
+
+def lap(timings, family, start_time):
+    """Add the seconds since start_time to timings[family] (if timings is a dict) and return the current time."""
+    now = time.perf_counter()
+    if timings is not None:
+        timings[family] = timings.get(family, 0.0) + now - start_time
+    return now
+
+
+def tag_clauses(tags, clauses, family):
+    """Tag the clauses appended since the last call with family (no-op when tags is None)."""
+    if tags is not None:
+        tags.extend([family] * (len(clauses) - len(tags)))
+
+
+def rounded(value, digits=6):
+    """value with every float rounded, for compact JSON."""
+    if isinstance(value, float):
+        return round(value, digits)
+    if isinstance(value, dict):
+        return {key: rounded(item, digits) for key, item in value.items()}
+    if isinstance(value, list):
+        return [rounded(item, digits) for item in value]
+    return value
+
+
+class SolveProfile:
+    """Timing and solver statistics of every probe of one solve."""
+
+    def __init__(self, solver=None):
+        self.solver = solver
+        self.probes = []
+
+    def add_probe(self, w, result=None, clauses=None, variables=None, encode_sec=0.0, families=None,
+                  build_sec=0.0, solve_sec=0.0, stats=None):
+        record = {'w': w, 'result': result, 'clauses': clauses, 'variables': variables,
+                  'encode_sec': encode_sec, 'families': dict(families or {}),
+                  'build_sec': build_sec, 'solve_sec': solve_sec,
+                  'stats': {key: (stats or {}).get(key, 0) for key in STAT_KEYS}}
+        self.probes.append(record)
+        return record
+
+    def totals(self):
+        """Sums over the probes: {'probes', 'encode_sec', 'build_sec', 'solve_sec', 'families', *STAT_KEYS}."""
+        totals = {'probes': len(self.probes), 'families': {}}
+        totals.update(dict.fromkeys(TIME_KEYS, 0.0))
+        totals.update(dict.fromkeys(STAT_KEYS, 0))
+        for probe in self.probes:
+            for key in TIME_KEYS:
+                totals[key] += probe[key] or 0.0
+            for family, seconds in probe['families'].items():
+                totals['families'][family] = totals['families'].get(family, 0.0) + seconds
+            for key in STAT_KEYS:
+                totals[key] += probe['stats'].get(key, 0)
+        return totals
+
+    def to_dict(self):
+        return rounded({'solver': self.solver, 'probes': self.probes, 'totals': self.totals()})
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def from_events(cls, events):
+        """
+        Profile of an event stream. A probe killed during its solve keeps its
+        encoding figures with result None.
+        """
+        profile = cls()
+        current = None
+        for event in events:
+            kind = event.get('event')
+            if kind not in ('encode_done', 'solve_done'):
+                continue
+            profile.solver = profile.solver or event.get('solver')
+            if kind == 'encode_done':
+                current = profile.add_probe(event.get('w'), clauses=event.get('clauses'),
+                                            variables=event.get('variables'),
+                                            encode_sec=event.get('encode_time') or 0.0,
+                                            families=event.get('families'))
+                continue
+            if current is None or current['w'] != event.get('w') or current['result'] is not None:
+                # Solve without its own encoding (e.g. repeated core_cbp calls at one w)
+                current = profile.add_probe(event.get('w'))
+            stats = event.get('stats') or {}
+            current.update(result=event.get('result'), build_sec=event.get('build_time') or 0.0,
+                           solve_sec=event.get('solve_time') or 0.0,
+                           stats={key: stats.get(key, 0) for key in STAT_KEYS})
+        return profile
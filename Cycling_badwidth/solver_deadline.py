@@ -0,0 +1,92 @@
+"""
+Wall-clock deadline for SAT calls made inside one process.
+
+The in-process benchmark (auto_test.py --in-process) cannot kill a solver
+that runs in its own interpreter, so the drivers route their solve() calls
+through solve_within_deadline: with a deadline set, the call becomes
+solve_limited(expect_interrupt=True) and a timer interrupts the solver when
+time is up, which raises SolveTimeout. Without a deadline it is a plain
+solve(). Engines that drive their own oracle (RC2, LSU) go through
+call_within_deadline with their interrupt method. Encoding is not
+interruptible; check_deadline() is called between probes so an expired run
+stops before the next encoding.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+_deadline = None
+
+
+class SolveTimeout(Exception):
+    """The deadline set by solve_deadline() expired."""
+
+
+@contextmanager
+def solve_deadline(seconds):
+    """Run the block with every solve_within_deadline call bounded by seconds from now."""
+    global _deadline
+    previous = _deadline
+    _deadline = None if seconds is None else time.perf_counter() + seconds
+    try:
+        yield
+    finally:
+        _deadline = previous
+
+
+def remaining_time():
+    """Seconds left before the deadline, or None when none is set."""
+    if _deadline is None:
+        return None
+    return _deadline - time.perf_counter()
+
+
+def check_deadline():
+    remaining = remaining_time()
+    if remaining is not None and remaining <= 0:
+        raise SolveTimeout()
+
+
+def solve_within_deadline(solver, assumptions=()):
+    """solver.solve(assumptions), interrupted with SolveTimeout at the deadline."""
+    remaining = remaining_time()
+    if remaining is None:
+        return solver.solve(assumptions=assumptions)
+    if remaining <= 0:
+        raise SolveTimeout()
+    timer = threading.Timer(remaining, solver.interrupt)
+    timer.daemon = True
+    timer.start()
+    try:
+        result = solver.solve_limited(assumptions=assumptions, expect_interrupt=True)
+    finally:
+        timer.cancel()
+    if result is None:
+        solver.clear_interrupt()
+        raise SolveTimeout()
+    return result
+
+
+def call_within_deadline(call, interrupt):
+    """call(), with interrupt() fired at the deadline; an interrupted call raises SolveTimeout."""
+    remaining = remaining_time()
+    if remaining is None:
+        return call()
+    if remaining <= 0:
+        raise SolveTimeout()
+    fired = threading.Event()
+
+    def stop():
+        fired.set()
+        interrupt()
+
+    timer = threading.Timer(remaining, stop)
+    timer.daemon = True
+    timer.start()
+    try:
+        result = call()
+    finally:
+        timer.cancel()
+    if fired.is_set():
+        raise SolveTimeout()
+    return result
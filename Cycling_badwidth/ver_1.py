@@ -1,9 +1,15 @@
 
 from pysat.formula import CNF
-from pysat.formula import VPool
+try:
+    from pysat.formula import VPool
+except ImportError:  # PySAT >= 0.1.5 only has the new name
+    from pysat.formula import IDPool as VPool
 from pysat.card import CardEnc
 from pysat.solvers import Glucose4
 
+from cbp_graph import as_graph
+from solve_profile import tag_clauses
+
 
 def get_var(n, u, l):
     """Ánh xạ (đỉnh u, nhãn l) sang một biến số nguyên (1-based index)."""
@@ -15,10 +21,11 @@ def get_cyclic_dist(n, l1, l2):
     return min(dist, n - dist)
 
 
-def generate_clauses_for_cbp(n, edges, w, vpool):
+def generate_clauses_for_cbp(n, edges, w, vpool, tags=None):
     """
     Tạo ra tất cả các mệnh đề CNF cho bài toán CBP với bandwidth w.
     Hàm này sử dụng CardEnc của PySAT để xử lý các ràng buộc đếm.
+    Nếu có danh sách tags, họ ràng buộc của từng mệnh đề được thêm vào đó.
     """
     clauses = []
 
@@ -28,15 +35,17 @@ def generate_clauses_for_cbp(n, edges, w, vpool):
         literals = [get_var(n, u, l) for l in range(1, n + 1)]
         cnf = CardEnc.equals(lits=literals, bound=1, vpool=vpool)
         clauses.extend(cnf.clauses)
+    tag_clauses(tags, clauses, 'vertex_exactly_one')
 
     # 2. Mỗi nhãn được dùng bởi đúng một đỉnh
     for l in range(1, n + 1):
         literals = [get_var(n, u, l) for u in range(n)]
         cnf = CardEnc.equals(lits=literals, bound=1, vpool=vpool)
         clauses.extend(cnf.clauses)
+    tag_clauses(tags, clauses, 'label_exactly_one')
 
     # --- Ràng buộc Bandwidth theo 3 trường hợp ---
-    unique_edges = list(set(tuple(sorted(edge)) for edge in edges))
+    unique_edges = as_graph(n, edges)  # Cạnh chuẩn hóa (u < v), không trùng lặp
     for u, v in unique_edges:
         for k in range(1, n + 1):
             var_uk = get_var(n, u, k)
@@ -47,6 +56,8 @@ def generate_clauses_for_cbp(n, edges, w, vpool):
                     clauses.append([-var_uk, -get_var(n, v, l)])
                 for l in range(k + w + 1, n + 1):
                     clauses.append([-var_uk, -get_var(n, v, l)])
+                if tags is not None:
+                    tag_clauses(tags, clauses, 'edge_case1')
 
             # Trường hợp 2 & 3: k gần đầu/cuối
             else:
@@ -54,6 +65,8 @@ def generate_clauses_for_cbp(n, edges, w, vpool):
                 
                 if not allowed_labels:
                     clauses.append([-var_uk])
+                    if tags is not None:
+                        tag_clauses(tags, clauses, 'edge_case2_3')
                     continue
                 
                 allowed_literals = [get_var(n, v, l) for l in allowed_labels]
@@ -64,6 +77,8 @@ def generate_clauses_for_cbp(n, edges, w, vpool):
                 # (¬var_uk ∨ C) cho mỗi mệnh đề C trong exo_cnf
                 for clause in exo_cnf.clauses:
                     clauses.append([-var_uk] + clause)
+                if tags is not None:
+                    tag_clauses(tags, clauses, 'edge_case2_3')
     
     return clauses
 
@@ -75,6 +90,7 @@ def solve_cbp(n, edges):
     """
     Hàm chính để giải CBP, tìm kiếm nhị phân trên w.
     """
+    edges = as_graph(n, edges)  # Đồ thị CSR dựng một lần cho mọi lần sinh mệnh đề
     best_w = None
     
     low_w, high_w = 1, n // 2
@@ -83,7 +99,8 @@ def solve_cbp(n, edges):
         print(f"\n===== Đang kiểm tra với bandwidth w = {w} =====")
         
         # VPool quản lý việc tạo các biến cơ bản và biến phụ cho CardEnc
-        vpool = VPool()
+        # Biến phụ bắt đầu sau n*n biến nhãn, tránh trùng với get_var
+        vpool = VPool(start_from=n * n + 1)
         
         clauses = generate_clauses_for_cbp(n, edges, w, vpool)
         print(f"   => Đã tạo {len(clauses)} mệnh đề với tổng số {vpool.top} biến.")
@@ -3,6 +3,10 @@ from pysat.formula import CNF
 from pysat.card import CardEnc
 from pysat.solvers import Glucose4
 
+from cbp_graph import as_graph
+from lower_bounds import compute_lower_bound
+from solve_profile import tag_clauses
+
 
 def get_var(n, u, l):
     """Ánh xạ (đỉnh u, nhãn l) sang một biến số nguyên (1-based index)."""
@@ -10,10 +14,11 @@ def get_var(n, u, l):
 
 
 
-def generate_clauses_for_cbp(n, edges, w):
+def generate_clauses_for_cbp(n, edges, w, tags=None):
     """
     Tạo ra tất cả các mệnh đề CNF cho bài toán CBP với bandwidth w.
     Hàm này sử dụng CardEnc của PySAT để xử lý các ràng buộc đếm.
+    Nếu có danh sách tags, họ ràng buộc của từng mệnh đề được thêm vào đó.
     """
     clauses = []
     top_id = n * n + 1  # Biến đầu tiên cho các biến phụ
@@ -25,6 +30,7 @@ def generate_clauses_for_cbp(n, edges, w):
         cnf = CardEnc.equals(lits=literals, bound=1, top_id=top_id)
         clauses.extend(cnf.clauses)
         top_id = cnf.nv + 1  # Cập nhật top_id cho lần tiếp theo
+    tag_clauses(tags, clauses, 'vertex_exactly_one')
 
     # 2. Mỗi nhãn được dùng bởi đúng một đỉnh
     for l in range(1, n + 1):
@@ -32,15 +38,17 @@ def generate_clauses_for_cbp(n, edges, w):
         cnf = CardEnc.equals(lits=literals, bound=1, top_id=top_id)
         clauses.extend(cnf.clauses)
         top_id = cnf.nv + 1  # Cập nhật top_id cho lần tiếp theo
+    tag_clauses(tags, clauses, 'label_exactly_one')
 
     # --- Ràng buộc Bandwidth theo 3 trường hợp ---
-    unique_edges = list(set(tuple(sorted(edge)) for edge in edges))
+    unique_edges = as_graph(n, edges)  # Cạnh chuẩn hóa (u < v), không trùng lặp
     for u, v in unique_edges:
         for k in range(1, n + 1):
             var_uk = get_var(n, u, k)
 
             # Trường hợp 1: n - w > k > w
             if k > w and k < n - w:
+                case = 'edge_case1'
                 for l in range(1, k - w):
                     clauses.append([-var_uk, -get_var(n, v, l)])
                 for l in range(k + w + 1, n + 1):
@@ -48,6 +56,7 @@ def generate_clauses_for_cbp(n, edges, w):
 
             # Trường hợp 2: w >= k >= 1
             elif 1 <= k <= w:
+                case = 'edge_case2'
                 # Theo ảnh: x_u^k → (Σx_v^l = 1) ∨ (Σx_v^l' = 1) với l = 1 to k+w và l' = n-w+k to n
                 literals_1 = [get_var(n, v, l) for l in range(1, min(k+w+1, n+1))]
                 literals_2 = [get_var(n, v, l) for l in range(max(n-w+k, 1), n+1)]
@@ -66,6 +75,7 @@ def generate_clauses_for_cbp(n, edges, w):
 
             # Trường hợp 3: n >= k >= n-w
             elif n-w <= k <= n:
+                case = 'edge_case3'
                 # Theo ảnh: x_u^k → (Σx_v^l = 1) ∨ (Σx_v^l' = 1) với l = 1 to w+k-n và l' = k-w to n
                 literals_1 = [get_var(n, v, l) for l in range(1, min(w+k-n+1, n+1))]
                 literals_2 = [get_var(n, v, l) for l in range(max(k-w, 1), n+1)]
@@ -81,6 +91,8 @@ def generate_clauses_for_cbp(n, edges, w):
                         clauses.append([-var_uk] + clause)
                 elif len(all_literals) == 1:
                     clauses.append([-var_uk, all_literals[0]])
+            if tags is not None:
+                tag_clauses(tags, clauses, case)
     return clauses, top_id - 1
 
 # =================================================================
@@ -92,19 +104,13 @@ def solve_cbp(n, edges):
     Hàm chính để giải CBP, tìm kiếm tuyến tính từ LB lên UB.
     Khi gặp SAT đầu tiên, đó là w tối ưu.
     """
-    # Tính bậc lớn nhất của đồ thị
-    degree = [0] * n
-    for u, v in edges:
-        degree[u] += 1
-        degree[v] += 1
-    max_degree = max(degree)
+    edges = as_graph(n, edges)  # Đồ thị CSR dựng một lần, dùng chung cho cận và bộ mã hóa
     
     # Tính low_w (LB) và high_w (UB)
-    import math
-    low_w = math.ceil(max_degree / 2)  # Lower bound
+    low_w, lb_details = compute_lower_bound(n, edges)  # Cận dưới mạnh nhất trong các cận rẻ
     high_w = n // 2  # Upper bound = floor(n/2)
     
-    print(f"   => Lower Bound (LB): {low_w}")
+    print(f"   => Lower Bound (LB): {low_w} {lb_details}")
     print(f"   => Upper Bound (UB): {high_w}")
     print(f"   => Search strategy: Linear from {low_w} up to {high_w} until first SAT")
     
@@ -1,8 +1,15 @@
-from pysat.formula import CNF
-from pysat.card import CardEnc
-from pysat.solvers import Glucose4
+# PySAT is imported where clauses are built or solved, so graphs answered
+# in closed form (and imports of the helpers) never pay for it
+from cbp_events import emit, solver_stats
+from cbp_graph import as_graph
+from formula_estimate import DEFAULT_AMO_ENCODING, choose_encoding, default_memory_budget_mb
+from graph_classes import classify_graph
+from lower_bounds import compute_lower_bound
+from solve_profile import lap, tag_clauses
+from solver_deadline import check_deadline, solve_within_deadline
 
 import math
+import time
 
 def get_X_var(n, i, j):
     """Map variable X_ij: vertex i assigned label <= j"""
@@ -16,9 +23,10 @@ def get_K_var(n, i, j):
         raise ValueError(f"Invalid K variable indices: i={i}, j={j}, n={n}")
     return n * n + i * n + j
 
-def validate_clauses(clauses):
-    """Check and clean clauses"""
+def validate_clauses(clauses, tags=None):
+    """Check and clean clauses (tags, parallel to clauses, is filtered alike)"""
     clean_clauses = []
+    clean_tags = []
     for i, clause in enumerate(clauses):
         if not clause:  # Skip empty clauses
             continue
@@ -31,9 +39,23 @@ def validate_clauses(clauses):
             clean_clause.append(lit)
         if clean_clause:  # Only add non-empty clauses
             clean_clauses.append(clean_clause)
+            if tags is not None:
+                clean_tags.append(tags[i])
+    if tags is not None:
+        tags[:] = clean_tags
     return clean_clauses
 
-def generate_clauses_for_cbp(n, edges, w):
+def generate_labeling_clauses(n, timings=None, tags=None, amo_encoding=DEFAULT_AMO_ENCODING):
+    """
+    Clauses that make (X, K) a valid labeling: order ladder on X, K channelled
+    from X and every label used at most once (amo_encoding: EncType name).
+    Returns (clauses, top_id) where top_id is the next free variable.
+    With a timings dict, the seconds of each clause family are added to it;
+    with a tags list, the family of every clause is appended to it.
+    """
+    from pysat.card import CardEnc, EncType
+
+    start_time = time.perf_counter()
     clauses = []
     top_id = 2 * n * n + 1  # First variable for auxiliary variables
     
@@ -48,6 +70,8 @@ def generate_clauses_for_cbp(n, edges, w):
             x_ij = get_X_var(n, i, j)
             x_ij_next = get_X_var(n, i, j+1)
             clauses.append([-x_ij, x_ij_next])
+    tag_clauses(tags, clauses, 'ladder')
+    start_time = lap(timings, 'ladder', start_time)
     
     # 3. Define K_ij through X_ij: K_ij ↔ X_ij ∧ ¬X_i,j-1
     for i in range(n):
@@ -65,107 +89,213 @@ def generate_clauses_for_cbp(n, edges, w):
                 # Case j = 1: K_i1 = X_i1 (since there is no X_i0)
                 clauses.append([-k_ij, x_ij])           # K_i1 → X_i1
                 clauses.append([k_ij, -x_ij])           # X_i1 → K_i1
+    tag_clauses(tags, clauses, 'channelling')
+    start_time = lap(timings, 'channelling', start_time)
 
     # 4. Constraint each label used at most once: ΣK_ij <= 1 (for each j)
     for j in range(1, n + 1):
         literals = [get_K_var(n, i, j) for i in range(n)]
         # Each label is used at most once
-        cnf_atmost = CardEnc.atmost(lits=literals, bound=1, top_id=top_id)
+        cnf_atmost = CardEnc.atmost(lits=literals, bound=1, top_id=top_id,
+                                    encoding=getattr(EncType, amo_encoding))
         clauses.extend(cnf_atmost.clauses)
         top_id = cnf_atmost.nv + 1
+    tag_clauses(tags, clauses, 'label_amo')
+    lap(timings, 'label_amo', start_time)
+
+    return clauses, top_id
+
+def generate_edge_clauses(n, u, v, w, tags=None):
+    """
+    Bandwidth clauses of one edge (u, v): if u has label k then the label of v
+    is within cyclic distance w of k.
+    With a tags list, 'edge_case1/2/3' is appended for every returned clause.
+    """
+    clauses = []
+    tagged = 0
+    for k in range(1, n + 1):
+        k_uk = get_K_var(n, u, k)
+        
+        # Case 1: n-w > k > w+1: K_u,k → ¬X_v,k-w-1 ∧ X_v,k+w
+        if 1+w < k < n-w:
+            case = 'edge_case1'
+            # ¬X_v,k-w-1 (if k-w-1 >= 1)
+            if k-w-1 >= 1:
+                x_vkw_1 = get_X_var(n, v, k-w-1)
+                clauses.append([-k_uk, -x_vkw_1])
+            
+            # X_v,k+w (if k+w <= n)
+            if k+w <= n:
+                x_vkw = get_X_var(n, v, k+w)
+                clauses.append([-k_uk, x_vkw])
+                
+        # Case 2: w+1 >= k >= 1: K_u,k → ¬X_v,n-w+k-1 ∨ X_v,k+w
+        elif 1 <= k <= w+1:
+            case = 'edge_case2'
+            # k+w >= n: every label of v is within distance w (X_v,n is true)
+            if k+w >= n:
+                continue
+            
+            literals = []
+            
+            # ¬X_v,n-w+k-1 (if n-w+k-1 >= 1)
+            if n-w+k-1 >= 1:
+                x_vnwk_1 = get_X_var(n, v, n-w+k-1)
+                literals.append(-x_vnwk_1)
+            
+            x_vkw = get_X_var(n, v, k+w)
+            literals.append(x_vkw)
+            
+            clauses.append([-k_uk] + literals)
+            
+        # Case 3: n >= k >= n-w: K_u,k → ¬X_v,k-w-1 ∨ X_v,k+w-n
+        elif n-w <= k <= n:
+            case = 'edge_case3'
+            literals = []
+            
+            # ¬X_v,k-w-1 (if k-w-1 >= 1)
+            if k-w-1 >= 1:
+                x_vkw1 = get_X_var(n, v, k-w-1)
+                literals.append(-x_vkw1)
+            
+            # X_v,k+w-n (if k+w-n >= 1)
+            if k+w-n >= 1:
+                x_vkwn = get_X_var(n, v, k+w-n)
+                literals.append(x_vkwn)
+            
+            if literals:
+                clauses.append([-k_uk] + literals)
+
+        if tags is not None:
+            tags.extend([case] * (len(clauses) - tagged))
+            tagged = len(clauses)
+
+    return clauses
+
+def generate_clauses_for_cbp(n, edges, w, timings=None, tags=None, amo_encoding=DEFAULT_AMO_ENCODING):
+    # 1-4. Labeling: order ladder, channelling and at-most-one per label
+    clauses, top_id = generate_labeling_clauses(n, timings, tags, amo_encoding)
     
     # 5. Bandwidth constraints for edges according to new specification
+    start_time = time.perf_counter()
     for u, v in edges:
-        for k in range(1, n + 1):
-            k_uk = get_K_var(n, u, k)
-            
-            # Case 1: n-w > k > w+1: K_u,k → ¬X_v,k-w-1 ∧ X_v,k+w
-            if 1+w < k < n-w:
-                # ¬X_v,k-w-1 (if k-w-1 >= 1)
-                if k-w-1 >= 1:
-                    x_vkw_1 = get_X_var(n, v, k-w-1)
-                    clauses.append([-k_uk, -x_vkw_1])
-                
-                # X_v,k+w (if k+w <= n)
-                if k+w <= n:
-                    x_vkw = get_X_var(n, v, k+w)
-                    clauses.append([-k_uk, x_vkw])
-                    
-            # Case 2: w+1 >= k >= 1: K_u,k → ¬X_v,n-w+k-1 ∨ X_v,k+w
-            elif 1 <= k <= w+1:
-                literals = []
-                
-                # ¬X_v,n-w+k-1 (if n-w+k-1 >= 1)
-                if n-w+k-1 >= 1:
-                    x_vnwk_1 = get_X_var(n, v, n-w+k-1)
-                    literals.append(-x_vnwk_1)
-                
-                # X_v,k+w (if k+w <= n)
-                if k+w <= n:
-                    x_vkw = get_X_var(n, v, k+w)
-                    literals.append(x_vkw)
-                
-                if literals:
-                    clauses.append([-k_uk] + literals)
-                
-            # Case 3: n >= k >= n-w: K_u,k → X_v,k-w ∨ X_v,k+w-n
-            elif n-w <= k <= n:
-                literals = []
-                
-                # X_v,k-w (if k-w >= 1)
-                if k-w >= 1:
-                    x_vkw1 = get_X_var(n, v, k-w-1)
-                    literals.append(-x_vkw1)
-                
-                # X_v,k+w-n (if k+w-n >= 1)
-                if k+w-n >= 1:
-                    x_vkwn = get_X_var(n, v, k+w-n)
-                    literals.append(x_vkwn)
-                
-                if literals:
-                    clauses.append([-k_uk] + literals)
+        clauses.extend(generate_edge_clauses(n, u, v, w, tags))
+    start_time = lap(timings, 'edges', start_time)
 
     # Validate and clean clauses
-    clean_clauses = validate_clauses(clauses)
-    print(f"   => Cleaned {len(clauses)} -> {len(clean_clauses)} clauses")
+    clean_clauses = validate_clauses(clauses, tags)
+    lap(timings, 'validate', start_time)
     
     return clean_clauses, top_id - 1
 
-def solve_cbp(n, edges):
+def extract_labeling(n, model):
+    """Labeling (list, vertex -> label) from a SAT model of this encoding."""
+    labeling = [None] * n
+    for i in range(n):
+        for j in range(1, n + 1):
+            if model[get_K_var(n, i, j) - 1] > 0:
+                labeling[i] = j
+                break
+    return labeling
+
+def solve_cbp(n, edges, result_cache=None, profile=None, memory_budget_mb=None, amo_encoding=None):
     """
     Main function to solve CBP, linear search on w to find the smallest value.
+    With a result_cache (result_cache.ResultCache), isomorphic graphs solved
+    before are answered directly, stored near-identical graphs seed the
+    bounds, and the proven optimum is recorded.
+    With a profile (solve_profile.SolveProfile), the timing of every probe
+    is recorded in it: encoding by clause family, solver build, solve and
+    solver statistics.
+    Before encoding, the formula size of the largest probe is estimated
+    (formula_estimate): without amo_encoding the label at-most-one encoding
+    with the smallest predicted memory is used, and with memory_budget_mb
+    (MB) the solve is refused (FormulaTooLarge) when it does not fit.
     """
-    # Calculate maximum degree of the graph
-    degree = [0] * n
-    for u, v in edges:
-        degree[u] += 1
-        degree[v] += 1
-    max_degree = max(degree)
+    # CSR graph built once, shared by the classifier, the bounds and the encoder
+    edges = as_graph(n, edges)
+    
+    # Closed-form answer for trivial graph classes, no encoding needed
+    known = classify_graph(n, edges)
+    if known is not None:
+        print(f"   => Graph class: {known['class']} (labeling: {known['labeling']})")
+        print(f"==================================================")
+        print(f"[*] FOUND! Minimum Cyclic Bandwidth (w) is: {known['bandwidth']}")
+        print(f"==================================================")
+        emit('answer', 'ver_2_5', bandwidth=known['bandwidth'], lower_bound=known['bandwidth'],
+             upper_bound=known['bandwidth'], source='class')
+        return known['bandwidth']
+    
+    if result_cache is not None:
+        hit = result_cache.lookup(n, edges)
+        if hit is not None:
+            print(f"   => Result cache hit (isomorphic graph, solved by {hit['solver']})")
+            print(f"==================================================")
+            print(f"[*] FOUND! Minimum Cyclic Bandwidth (w) is: {hit['bandwidth']}")
+            print(f"==================================================")
+            emit('answer', 'ver_2_5', bandwidth=hit['bandwidth'], lower_bound=hit['lower_bound'],
+                 upper_bound=hit['upper_bound'], source='cache')
+            return hit['bandwidth']
     
     # Calculate low_w (LB) and high_w (UB)
-    import math
-    low_w = math.ceil(max_degree / 2)  # Lower bound
+    low_w, lb_details = compute_lower_bound(n, edges)  # Strongest cheap lower bound
     high_w = n // 2  # Upper bound = floor(n/2)
     
-    print(f"   => Lower Bound (LB): {low_w}")
+    best_w = None
+    best_labeling = None
+    if result_cache is not None:
+        seed = result_cache.seed_bounds(n, edges)
+        if seed['lower_bound'] > low_w:
+            low_w = lb_details['result_cache'] = min(seed['lower_bound'], high_w)
+        if seed['upper_bound'] is not None and seed['upper_bound'] <= high_w:
+            # A stored witness already fits: only w below it needs a solve
+            best_w, best_labeling = seed['upper_bound'], seed['labeling']
+            high_w = best_w - 1
+            print(f"   => Stored witness labeling has width {best_w}")
+    
+    print(f"   => Lower Bound (LB): {low_w} {lb_details}")
     print(f"   => Upper Bound (UB): {high_w}")
     print(f"   => Search strategy: Linear from {high_w} down to {low_w}, stop at first UNSAT")
     
-    best_w = None
+    if high_w >= low_w:
+        estimate = choose_encoding('ver_2_5', n, len(edges), low_w, high_w, memory_budget_mb,
+                                   [amo_encoding] if amo_encoding else None)
+        amo_encoding = estimate['amo_encoding']
+        print(f"   => Estimated largest probe: {estimate['clauses']} clauses, {estimate['variables']} variables, "
+              f"~{estimate['peak_mb']:.0f} MB (label AMO: {amo_encoding})")
+    
+    from pysat.solvers import Glucose4
     
     # Linear search from UB down to LB - when first UNSAT encountered, w+1 is optimal
     for w in range(high_w, low_w - 1, -1):  # Decreasing from high_w to low_w
         print(f"\n===== Testing with bandwidth w = {w} =====")
+        emit('probe_start', 'ver_2_5', w=w)
         
-        clauses, total_vars = generate_clauses_for_cbp(n, edges, w)
+        check_deadline()
+        families = {}
+        start_time = time.perf_counter()
+        clauses, total_vars = generate_clauses_for_cbp(n, edges, w, families, amo_encoding=amo_encoding)
+        encode_time = time.perf_counter() - start_time
+        emit('encode_done', 'ver_2_5', w=w, clauses=len(clauses), variables=total_vars,
+             encode_time=encode_time, families=families, amo_encoding=amo_encoding)
         print(f"   => Generated {len(clauses)} clauses with total {total_vars} variables.")
 
+        start_time = time.perf_counter()
         with Glucose4(bootstrap_with=clauses) as solver:
-            is_sat = solver.solve()
+            build_time = time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            is_sat = solve_within_deadline(solver)
+            solve_time, stats = time.perf_counter() - start_time, solver_stats(solver)
+            emit('solve_done', 'ver_2_5', w=w, result='SAT' if is_sat else 'UNSAT',
+                 build_time=build_time, solve_time=solve_time, stats=stats)
+            if profile is not None:
+                profile.add_probe(w, 'SAT' if is_sat else 'UNSAT', len(clauses), total_vars, encode_time,
+                                  families, build_time, solve_time, stats)
             print(f"   => Solver result: {'SAT' if is_sat else 'UNSAT'}")
             if is_sat:
                 print(f"   =>  Found solution with w = {w}")
                 best_w = w  # Update best_w but don't stop, continue searching for smaller w
+                best_labeling = extract_labeling(n, solver.get_model())
             else:
                 print(f"   => No solution with w = {w}")
                 print(f"   => First UNSAT encountered! Stopping search.")
@@ -178,21 +308,31 @@ def solve_cbp(n, edges):
     else:
         print(f"\n   =>  No solution found in range [{low_w}, {high_w}]")
         print(f"   => All w values might be UNSAT")
+    emit('answer', 'ver_2_5', bandwidth=best_w, lower_bound=low_w, upper_bound=n // 2, source='search')
+    
+    if result_cache is not None and best_w is not None:
+        result_cache.store(n, edges, best_w, low_w, n // 2, best_labeling,
+                           {'lower_bounds': lb_details}, solver='ver_2_5')
     
     return best_w
 
 if __name__ == '__main__':
+    import argparse
     import sys
     from dataset_loader import load_mtx_graph, load_mtx_graph_manual, print_graph_stats
+    from formula_estimate import AMO_ENCODINGS, FormulaTooLarge
     
-    # Check command line arguments
-    if len(sys.argv) < 2:
-        print(" Please provide path to .mtx or .mtx.gz data file")
-        print("Usage: python ver_2_5.py <path_to_file.mtx.gz>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Cyclic bandwidth of a graph, linear search with ver_2_5.")
+    parser.add_argument('file', help='path to .mtx or .mtx.gz data file')
+    parser.add_argument('result_cache', nargs='?', help='optional result_cache.sqlite')
+    parser.add_argument('--memory-budget', type=float, metavar='MB',
+                        help='refuse graphs whose formula needs more (default: available memory)')
+    parser.add_argument('--amo-encoding', choices=AMO_ENCODINGS,
+                        help='label at-most-one encoding (default: smallest estimated memory)')
+    args = parser.parse_args()
     
     # Read from .mtx.gz file
-    file_path = sys.argv[1]
+    file_path = args.file
     print(f"Reading data from file: {file_path}")
     
     # Try reading with scipy first
@@ -210,16 +350,24 @@ if __name__ == '__main__':
     # Print graph statistics
     print_graph_stats(n_vertices, graph_edges)
     
-    # Check graph size
-    if n_vertices > 50:
-        response = input(f"\n Graph has {n_vertices} vertices, might take long time. Continue? (y/n): ")
-        if response.lower() != 'y':
-            print("Stopping program.")
-            sys.exit(0)
+    # Check the formula size against the memory budget instead of asking
+    memory_budget_mb = args.memory_budget if args.memory_budget is not None else default_memory_budget_mb()
+    
+    # Optional persistent result cache
+    result_cache = None
+    if args.result_cache:
+        from result_cache import ResultCache
+        result_cache = ResultCache(args.result_cache)
     
     # Solve CBP
     print("\nStarting Cyclic Bandwidth Problem solving...")
-    final_w = solve_cbp(n_vertices, graph_edges)
+    try:
+        final_w = solve_cbp(n_vertices, graph_edges, result_cache, memory_budget_mb=memory_budget_mb,
+                            amo_encoding=args.amo_encoding)
+    except FormulaTooLarge as e:
+        print(f"   => Formula too large: {e}")
+        print("Stopping program.")
+        sys.exit(3)
     
     print("\n==================================================")
     if final_w is not None:
@@ -3,6 +3,7 @@ Verify assignment để kiểm tra xem có thực sự thỏa mãn bandwidth con
 """
 import sys
 sys.path.append('.')
+from cbp_graph import as_graph
 from dataset_loader import load_mtx_graph_manual
 
 def verify_assignment(n, edges, assignment, w):
@@ -12,7 +13,8 @@ def verify_assignment(n, edges, assignment, w):
     """
     print(f"\n=== VERIFY ASSIGNMENT với w={w} ===")
     
-    # Kiểm tra tất cả các cạnh
+    # Kiểm tra tất cả các cạnh (đồ thị CSR: cạnh chuẩn hóa, không trùng lặp)
+    edges = as_graph(n, edges)
     violations = 0
     for u, v in edges:
         label_u = assignment[u]